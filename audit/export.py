@@ -0,0 +1,188 @@
+# audit/export.py
+import json
+import zlib
+from datetime import datetime
+from typing import Iterator, Optional
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import AuditLog
+
+EXPORT_FORMATS = ('ndjson', 'parquet')
+EXPORT_COMPRESSIONS = ('gzip', 'zstd')
+
+# Rows fetched per server-side cursor round trip, and per Parquet row group
+EXPORT_CHUNK_SIZE = getattr(settings, 'AUDIT_EXPORT_CHUNK_SIZE', 5000)
+PARQUET_ROW_GROUP_SIZE = getattr(settings, 'AUDIT_EXPORT_ROW_GROUP_SIZE', 50000)
+
+EXPORT_FIELDS = (
+    'id', 'sequence', 'timestamp', 'user_id', 'user_email', 'action', 'entity_type',
+    'entity_id', 'details', 'ip_address', 'prev_hash', 'entry_hash',
+)
+
+
+def parse_bound(value: Optional[str]) -> Optional[datetime]:
+    """ISO date or datetime -> aware datetime (dates are midnight in the current timezone)."""
+    if not value:
+        return None
+    parsed = parse_datetime(value)
+    if parsed is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(f"Invalid date: {value!r}")
+        parsed = datetime(day.year, day.month, day.day)
+    return timezone.make_aware(parsed) if timezone.is_naive(parsed) else parsed
+
+
+def export_queryset(entity_type: str = None, entity_id=None,
+                    start: Optional[datetime] = None, end: Optional[datetime] = None):
+    """Audit rows to export, in chain order; the date bounds prune partitions."""
+    queryset = AuditLog.objects.all()
+    if entity_type:
+        queryset = queryset.filter(entity_type=entity_type)
+    if entity_id:
+        queryset = queryset.filter(entity_id=entity_id)
+    if start:
+        queryset = queryset.filter(timestamp__gte=start)
+    if end:
+        queryset = queryset.filter(timestamp__lt=end)
+    return queryset.order_by('sequence').values_list(*EXPORT_FIELDS)
+
+
+def _rows(queryset) -> Iterator[tuple]:
+    # Server-side cursor on PostgreSQL: only EXPORT_CHUNK_SIZE rows are held at a time
+    return queryset.iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+
+def content_type(export_format: str, compression: str) -> str:
+    if export_format == 'parquet':
+        return 'application/vnd.apache.parquet'
+    return 'application/gzip' if compression == 'gzip' else 'application/zstd'
+
+
+def file_extension(export_format: str, compression: str) -> str:
+    if export_format == 'parquet':
+        return 'parquet' # Compressed per column chunk inside the file
+    return f"ndjson.{'gz' if compression == 'gzip' else 'zst'}"
+
+
+def stream_export(queryset, export_format: str = 'ndjson', compression: str = 'gzip') -> Iterator[bytes]:
+    """
+    Yields the export as compressed byte chunks, in constant memory whatever
+    the number of rows.
+
+    NDJSON is compressed as a single gzip or zstd stream; Parquet is written
+    one row group at a time with gzip/zstd column compression. Raises
+    ImproperlyConfigured up front (before any byte is streamed) when the
+    optional dependency for the requested output is missing.
+    """
+    if export_format == 'parquet':
+        return _stream_parquet(queryset, compression, *_pyarrow())
+    return _stream_ndjson(queryset, _compressor(compression))
+
+
+# --- NDJSON ---
+
+def _compressor(compression: str):
+    if compression == 'zstd':
+        try:
+            import zstandard
+        except ImportError:
+            raise ImproperlyConfigured("zstd exports require the 'zstandard' package.")
+        return zstandard.ZstdCompressor(level=3).compressobj()
+    return zlib.compressobj(6, zlib.DEFLATED, 31) # wbits=31: gzip container
+
+
+def _stream_ndjson(queryset, compressor) -> Iterator[bytes]:
+    lines = []
+    for row in _rows(queryset):
+        record = dict(zip(EXPORT_FIELDS, row))
+        lines.append(json.dumps(record, separators=(',', ':'), default=str))
+        if len(lines) == EXPORT_CHUNK_SIZE:
+            chunk = compressor.compress(('\n'.join(lines) + '\n').encode('utf-8'))
+            lines = []
+            if chunk:
+                yield chunk
+    if lines:
+        chunk = compressor.compress(('\n'.join(lines) + '\n').encode('utf-8'))
+        if chunk:
+            yield chunk
+    yield compressor.flush()
+
+
+# --- Parquet ---
+
+class _DrainableSink:
+    """Write-only file object for pyarrow whose buffered bytes are handed out after each row group."""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data, self._chunks = b''.join(self._chunks), []
+        return data
+
+
+def _parquet_schema(pa):
+    return pa.schema([
+        ('id', pa.string()), ('sequence', pa.int64()), ('timestamp', pa.timestamp('us', tz='UTC')),
+        ('user_id', pa.int64()), ('user_email', pa.string()), ('action', pa.string()),
+        ('entity_type', pa.string()), ('entity_id', pa.string()), ('details', pa.string()),
+        ('ip_address', pa.string()), ('prev_hash', pa.string()), ('entry_hash', pa.string()),
+    ])
+
+
+def _pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImproperlyConfigured("Parquet exports require the 'pyarrow' package.")
+    return pa, pq
+
+
+def _stream_parquet(queryset, compression: str, pa, pq) -> Iterator[bytes]:
+    schema = _parquet_schema(pa)
+    sink = _DrainableSink()
+    writer = pq.ParquetWriter(pa.PythonFile(sink, mode='w'), schema, compression=compression)
+    columns = {name: [] for name in EXPORT_FIELDS}
+
+    def write_row_group():
+        writer.write_table(pa.table(columns, schema=schema))
+        for values in columns.values():
+            values.clear()
+        return sink.drain()
+
+    for row in _rows(queryset):
+        for name, value in zip(EXPORT_FIELDS, row):
+            if name in ('id', 'entity_id') and value is not None:
+                value = str(value)
+            elif name == 'details' and value is not None:
+                value = json.dumps(value, separators=(',', ':'), default=str)
+            columns[name].append(value)
+        if len(columns['id']) == PARQUET_ROW_GROUP_SIZE:
+            yield write_row_group()
+    if columns['id']:
+        yield write_row_group()
+    writer.close() # Writes the footer
+    yield sink.drain()
@@ -0,0 +1,125 @@
+# audit/ingest.py
+import atexit
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from .ledger import TrustLedger
+from .models import AuditLog
+
+logger = logging.getLogger(__name__)
+
+
+class AuditBuffer:
+    """
+    Per-process, bounded in-memory buffer of pending AuditLog entries.
+
+    `append` is a lock-protected deque push; a daemon thread drains the buffer
+    with one chained, multi-row INSERT (`bulk_create`) whenever FLUSH_SIZE entries are
+    pending or FLUSH_INTERVAL seconds have passed, so requests never wait on
+    the audit table. The buffer holds at most CAPACITY entries: a producer that
+    finds it full flushes inline instead of dropping entries (backpressure).
+    Remaining entries are flushed at interpreter exit.
+    """
+
+    CAPACITY = getattr(settings, 'AUDIT_BUFFER_CAPACITY', 10000)
+    FLUSH_SIZE = getattr(settings, 'AUDIT_FLUSH_SIZE', 500)
+    FLUSH_INTERVAL = getattr(settings, 'AUDIT_FLUSH_INTERVAL', 1.0)
+
+    def __init__(self):
+        self._entries = deque()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock() # One INSERT at a time, in append order
+        self._wakeup = threading.Event()
+        self._pid = None
+
+    def append(self, entry: AuditLog):
+        self._ensure_worker()
+        with self._lock:
+            self._entries.append(entry)
+            size = len(self._entries)
+        if size >= self.CAPACITY:
+            try:
+                self.flush()
+            except Exception:
+                # Logged and put back by flush(); the caller (often an on_commit callback) must not fail
+                self._wakeup.set()
+        elif size >= self.FLUSH_SIZE:
+            self._wakeup.set()
+
+    def flush(self) -> int:
+        """Writes every pending entry; returns the number written."""
+        with self._flush_lock:
+            with self._lock:
+                batch = list(self._entries)
+                self._entries.clear()
+            if not batch:
+                return 0
+            try:
+                with transaction.atomic():
+                    # Links the batch into the Trust Ledger hash chain, then inserts it
+                    TrustLedger.chain(batch)
+                    AuditLog.objects.bulk_create(batch, batch_size=self.FLUSH_SIZE)
+            except Exception as exc:
+                # Put the batch back in front so nothing is lost; the next flush retries it
+                logger.error(f"Audit flush of {len(batch)} entries failed: {exc}")
+                with self._lock:
+                    self._entries.extendleft(reversed(batch))
+                raise
+            return len(batch)
+
+    def _ensure_worker(self):
+        # Started lazily, and again in forked children (gunicorn/Celery workers)
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            if self._pid is not None:
+                self._entries.clear() # Forked child: the parent owns (and flushes) the inherited entries
+            self._pid = os.getpid()
+            threading.Thread(target=self._run, name='audit-flusher', daemon=True).start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.FLUSH_INTERVAL)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                time.sleep(self.FLUSH_INTERVAL) # Back off; entries stay buffered
+            finally:
+                connection.close_if_unusable_or_obsolete()
+
+
+audit_buffer = AuditBuffer()
+atexit.register(lambda: audit_buffer.flush())
+
+
+def audit_log(action: str, entity_type: str, entity_id=None, user=None, user_email: str = None,
+              details: dict = None, ip_address: str = None, on_commit: bool = True):
+    """
+    Records an audit entry without blocking the caller on the database.
+    Register writes are recorded by audit.signals; views call it for actions
+    that change no register row (analysis runs, exports).
+
+    Args:
+        on_commit: Queue the entry only once the current transaction commits,
+            so rolled-back writes leave no audit trail (default).
+    """
+    entry = AuditLog(
+        action=action, entity_type=entity_type, entity_id=entity_id,
+        user=user if getattr(user, 'is_authenticated', False) else None,
+        user_email=user_email or getattr(user, 'email', None),
+        details=details, ip_address=ip_address,
+    )
+    if on_commit:
+        transaction.on_commit(lambda: audit_buffer.append(entry))
+    else:
+        audit_buffer.append(entry)
+    return entry
@@ -0,0 +1,258 @@
+# audit/ledger.py
+import hashlib
+import json
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timezone as dt_timezone
+from typing import Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import connections
+from django.utils.ipv6 import clean_ipv6_address
+
+from .models import AuditLog, AuditChainHead, AuditCheckpoint
+
+logger = logging.getLogger(__name__)
+
+GENESIS_HASH = '0' * 64
+
+# Columns read back for verification, in `entry_hash` payload order
+LEDGER_FIELDS = (
+    'sequence', 'id', 'timestamp', 'user_email', 'action', 'entity_type',
+    'entity_id', 'details', 'ip_address', 'prev_hash', 'entry_hash',
+)
+
+
+class TrustLedger:
+    """
+    Local hash chain over AuditLog (the "Blockchain Trust Ledger").
+
+    Every entry gets a gap-free `sequence`, the `prev_hash` of its predecessor
+    and `entry_hash = sha256(prev_hash + canonical entry)`, so editing,
+    deleting or reordering any entry breaks every later hash. Entries are
+    grouped in fixed blocks of BLOCK_SIZE sequences; an AuditCheckpoint stores
+    each block's Merkle root and closing chain hash. Checkpoints let blocks be
+    verified independently (in parallel processes), and give O(log BLOCK_SIZE)
+    inclusion proofs for a single entry.
+
+    The `user` foreign key is not hashed (it is nulled when a user is deleted);
+    `user_email` records the actor instead.
+    """
+
+    BLOCK_SIZE = getattr(settings, 'AUDIT_LEDGER_BLOCK_SIZE', 4096)
+    VERIFY_CHUNK_SIZE = 10000
+
+    # --- Hashing ---
+
+    @staticmethod
+    def entry_payload(sequence, entry_id, timestamp, user_email, action, entity_type,
+                      entity_id, details, ip_address) -> bytes:
+        if ip_address and ':' in str(ip_address):
+            # The form GenericIPAddressField stores, so new entries hash like the rows read back
+            ip_address = clean_ipv6_address(str(ip_address))
+        return json.dumps(
+            [
+                sequence, str(entry_id), timestamp.astimezone(dt_timezone.utc).isoformat(), user_email,
+                action, entity_type, str(entity_id) if entity_id else None, details, ip_address,
+            ],
+            sort_keys=True, separators=(',', ':'), default=str,
+        ).encode('utf-8')
+
+    @classmethod
+    def entry_hash(cls, prev_hash: str, *fields) -> str:
+        return hashlib.sha256(prev_hash.encode('ascii') + cls.entry_payload(*fields)).hexdigest()
+
+    @staticmethod
+    def merkle_levels(leaf_hashes: List[str]) -> List[List[bytes]]:
+        """All tree levels, leaves first. Leaves and inner nodes are domain-separated;
+        an odd node is promoted unchanged (not duplicated)."""
+        level = [hashlib.sha256(b'\x00' + bytes.fromhex(h)).digest() for h in leaf_hashes]
+        levels = [level]
+        while len(level) > 1:
+            level = [
+                hashlib.sha256(b'\x01' + level[i] + level[i + 1]).digest() if i + 1 < len(level) else level[i]
+                for i in range(0, len(level), 2)
+            ]
+            levels.append(level)
+        return levels
+
+    @classmethod
+    def merkle_root(cls, leaf_hashes: List[str]) -> str:
+        return cls.merkle_levels(leaf_hashes)[-1][0].hex() if leaf_hashes else GENESIS_HASH
+
+    # --- Appending ---
+
+    @classmethod
+    def chain(cls, entries: List[AuditLog]):
+        """
+        Assigns sequence, prev_hash and entry_hash to unsaved entries, in order.
+        Must run in the transaction that inserts them: the chain head row stays
+        locked until commit, which serializes appends across processes.
+        """
+        head = AuditChainHead.objects.select_for_update().get(pk=AuditChainHead.SINGLETON_ID)
+        sequence, prev_hash = head.last_sequence, head.last_hash
+        for entry in entries:
+            sequence += 1
+            entry.sequence, entry.prev_hash = sequence, prev_hash
+            entry.entry_hash = prev_hash = cls.entry_hash(
+                prev_hash, sequence, entry.id, entry.timestamp, entry.user_email, entry.action,
+                entry.entity_type, entry.entity_id, entry.details, entry.ip_address,
+            )
+        head.last_sequence, head.last_hash = sequence, prev_hash
+        head.save(update_fields=['last_sequence', 'last_hash'])
+
+    # --- Checkpoints ---
+
+    @classmethod
+    def block_range(cls, block: int) -> Tuple[int, int]:
+        return block * cls.BLOCK_SIZE + 1, (block + 1) * cls.BLOCK_SIZE
+
+    @classmethod
+    def _block_hashes(cls, block: int) -> List[str]:
+        first, last = cls.block_range(block)
+        return list(
+            AuditLog.objects.filter(sequence__gte=first, sequence__lte=last)
+            .order_by('sequence').values_list('entry_hash', flat=True)
+        )
+
+    @classmethod
+    def checkpoint(cls) -> int:
+        """Writes the Merkle checkpoint of every complete block that has none; returns how many."""
+        head = AuditChainHead.objects.get(pk=AuditChainHead.SINGLETON_ID)
+        last_block = AuditCheckpoint.objects.order_by('-block').values_list('block', flat=True).first()
+        block = 0 if last_block is None else last_block + 1
+        created = 0
+        while cls.block_range(block)[1] <= head.last_sequence:
+            hashes = cls._block_hashes(block)
+            if len(hashes) != cls.BLOCK_SIZE:
+                # Never checkpoint over a gap; `verify` reports it
+                logger.error(f"Audit ledger block {block} has {len(hashes)}/{cls.BLOCK_SIZE} entries.")
+                break
+            first, last = cls.block_range(block)
+            AuditCheckpoint.objects.create(
+                block=block, first_sequence=first, last_sequence=last,
+                merkle_root=cls.merkle_root(hashes), last_entry_hash=hashes[-1],
+            )
+            created += 1
+            block += 1
+        return created
+
+    # --- Verification ---
+
+    @classmethod
+    def verify(cls, workers: int = None) -> dict:
+        """
+        Verifies the whole ledger: every block is re-hashed from its stored
+        predecessor hash, checked for gaps and, when checkpointed, against its
+        Merkle root. Blocks are independent, so they are verified in parallel
+        worker processes, each streaming its range in VERIFY_CHUNK_SIZE chunks.
+
+        Returns:
+            {'entries': n, 'blocks': n, 'errors': [...]} (errors empty when intact).
+        """
+        head = AuditChainHead.objects.get(pk=AuditChainHead.SINGLETON_ID)
+        checkpoints = {cp.block: cp for cp in AuditCheckpoint.objects.all()}
+        last_block = (head.last_sequence - 1) // cls.BLOCK_SIZE if head.last_sequence else -1
+
+        jobs = []
+        for block in range(last_block + 1):
+            first, last = cls.block_range(block)
+            checkpoint = checkpoints.get(block)
+            previous = checkpoints.get(block - 1)
+            jobs.append((
+                first, min(last, head.last_sequence),
+                # Start from the previous block's checkpointed closing hash when there is one
+                GENESIS_HASH if block == 0 else (previous.last_entry_hash if previous else None),
+                checkpoint.merkle_root if checkpoint else None,
+                checkpoint.last_entry_hash if checkpoint else (head.last_hash if block == last_block else None),
+            ))
+
+        # Children must not share the parent's database connections
+        connections.close_all()
+        context = multiprocessing.get_context('fork')
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            results = list(pool.map(_verify_block, jobs, chunksize=1))
+
+        report = {'entries': sum(r['entries'] for r in results), 'blocks': len(results), 'errors': []}
+        for result in results:
+            report['errors'].extend(result['errors'])
+        # Seams between blocks verified without a checkpoint on the left
+        for block in range(1, len(results)):
+            if jobs[block][2] is None and results[block]['first_prev_hash'] != results[block - 1]['last_hash']:
+                report['errors'].append(f"Chain broken between blocks {block - 1} and {block}.")
+        return report
+
+    @classmethod
+    def verify_range(cls, first: int, last: int, prev_hash: Optional[str],
+                     expected_root: Optional[str], expected_last_hash: Optional[str]) -> dict:
+        errors, hashes = [], []
+        expected_sequence, first_prev_hash = first, None
+        rows = (
+            AuditLog.objects.filter(sequence__gte=first, sequence__lte=last)
+            .order_by('sequence').values_list(*LEDGER_FIELDS).iterator(chunk_size=cls.VERIFY_CHUNK_SIZE)
+        )
+        for sequence, entry_id, timestamp, user_email, action, entity_type, entity_id, details, \
+                ip_address, stored_prev, stored_hash in rows:
+            if sequence != expected_sequence:
+                errors.append(f"Missing entries {expected_sequence}..{sequence - 1}.")
+            if first_prev_hash is None:
+                first_prev_hash = stored_prev
+            if prev_hash is not None and stored_prev != prev_hash:
+                errors.append(f"Entry {sequence}: prev_hash does not link to entry {sequence - 1}.")
+            computed = cls.entry_hash(
+                stored_prev, sequence, entry_id, timestamp, user_email, action, entity_type,
+                entity_id, details, ip_address,
+            )
+            if computed != stored_hash:
+                errors.append(f"Entry {sequence} ({entry_id}): content does not match its entry_hash.")
+            hashes.append(stored_hash)
+            prev_hash, expected_sequence = stored_hash, sequence + 1
+
+        if expected_sequence != last + 1:
+            errors.append(f"Missing entries {expected_sequence}..{last}.")
+        if expected_root is not None and cls.merkle_root(hashes) != expected_root:
+            errors.append(f"Block {(first - 1) // cls.BLOCK_SIZE}: Merkle root does not match its checkpoint.")
+        if expected_last_hash is not None and prev_hash != expected_last_hash:
+            errors.append(f"Entries {first}..{last}: closing hash does not match the checkpoint/chain head.")
+        return {'entries': len(hashes), 'errors': errors, 'first_prev_hash': first_prev_hash, 'last_hash': prev_hash}
+
+    # --- Inclusion proofs ---
+
+    @classmethod
+    def inclusion_proof(cls, entry_id) -> dict:
+        """
+        Proof that one entry is in its checkpointed block: the sibling hashes on
+        the path from its leaf to the block's Merkle root (O(log BLOCK_SIZE)).
+        """
+        sequence, entry_hash = AuditLog.objects.filter(id=entry_id).values_list('sequence', 'entry_hash').get()
+        block = (sequence - 1) // cls.BLOCK_SIZE
+        checkpoint = AuditCheckpoint.objects.get(block=block) # DoesNotExist until the block is complete
+        levels = cls.merkle_levels(cls._block_hashes(block))
+
+        path, index = [], sequence - checkpoint.first_sequence
+        for level in levels[:-1]:
+            sibling = index ^ 1
+            if sibling < len(level):
+                path.append(['left' if sibling < index else 'right', level[sibling].hex()])
+            index //= 2
+        return {
+            'entry_id': str(entry_id), 'sequence': sequence, 'entry_hash': entry_hash,
+            'block': block, 'merkle_root': checkpoint.merkle_root, 'path': path,
+        }
+
+    @staticmethod
+    def verify_proof(entry_hash: str, path: Iterable, merkle_root: str) -> bool:
+        node = hashlib.sha256(b'\x00' + bytes.fromhex(entry_hash)).digest()
+        for side, sibling in path:
+            sibling = bytes.fromhex(sibling)
+            node = hashlib.sha256(b'\x01' + (sibling + node if side == 'left' else node + sibling)).digest()
+        return node.hex() == merkle_root
+
+
+def _verify_block(job) -> dict:
+    # Runs in a worker process (module-level so it can be pickled)
+    try:
+        return TrustLedger.verify_range(*job)
+    finally:
+        connections.close_all()
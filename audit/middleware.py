@@ -0,0 +1,28 @@
+# audit/middleware.py
+from contextvars import ContextVar
+from typing import Optional
+
+# The request being served, for audit entries written by model signals (audit.signals)
+current_request: ContextVar = ContextVar('audit_current_request', default=None)
+
+
+def client_ip(request) -> Optional[str]:
+    return request.META.get('REMOTE_ADDR') if request is not None else None
+
+
+class AuditContextMiddleware:
+    """
+    Exposes the current request to the audit signals, which have no request
+    of their own. The actor is read from `request.user` when the entry is
+    recorded, so DRF authentication (which sets it inside the view) is seen too.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = current_request.set(request)
+        try:
+            return self.get_response(request)
+        finally:
+            current_request.reset(token)
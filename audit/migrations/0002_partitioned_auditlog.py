@@ -0,0 +1,119 @@
+# Generated by Django 5.2.7 on 2026-10-17 09:05
+
+import django.db.models.deletion
+import django.utils.timezone
+import uuid
+from datetime import date
+from django.conf import settings
+from django.db import migrations, models
+
+# Months created ahead of today; audit.tasks.ensure_audit_partitions keeps the window moving
+MONTHS_AHEAD = 3
+
+PARTITIONED_TABLE_SQL = """
+ALTER TABLE audit_auditlog RENAME TO audit_auditlog_unpartitioned;
+
+CREATE TABLE audit_auditlog (
+    id uuid NOT NULL,
+    user_email varchar(255) NULL,
+    action varchar(100) NOT NULL,
+    entity_type varchar(100) NOT NULL,
+    entity_id uuid NULL,
+    details jsonb NULL,
+    ip_address inet NULL,
+    timestamp timestamp with time zone NOT NULL,
+    user_id integer NULL REFERENCES auth_user (id) DEFERRABLE INITIALLY DEFERRED,
+    PRIMARY KEY (id, timestamp)
+) PARTITION BY RANGE (timestamp);
+
+CREATE TABLE audit_auditlog_default PARTITION OF audit_auditlog DEFAULT;
+
+CREATE INDEX audit_entity_trail_idx ON audit_auditlog (entity_type, entity_id, timestamp);
+CREATE INDEX audit_user_trail_idx ON audit_auditlog (user_id, timestamp);
+CREATE INDEX audit_timestamp_idx ON audit_auditlog (timestamp);
+"""
+
+COPY_AND_DROP_SQL = """
+INSERT INTO audit_auditlog (id, user_email, action, entity_type, entity_id, details, ip_address, timestamp, user_id)
+SELECT id, user_email, action, entity_type, entity_id, details, ip_address, timestamp, user_id
+FROM audit_auditlog_unpartitioned;
+
+DROP TABLE audit_auditlog_unpartitioned;
+"""
+
+
+def month_start(day, offset=0):
+    month_index = day.year * 12 + day.month - 1 + offset
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+
+def create_monthly_partitions(apps, schema_editor):
+    # One partition per month holding existing entries, through MONTHS_AHEAD months from now
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT MIN(timestamp) FROM audit_auditlog_unpartitioned")
+        oldest = cursor.fetchone()[0]
+        month = month_start(oldest.date() if oldest else date.today())
+        last = month_start(date.today(), MONTHS_AHEAD)
+        while month <= last:
+            following = month_start(month, 1)
+            cursor.execute(
+                f"CREATE TABLE audit_auditlog_y{month.year}m{month.month:02d} PARTITION OF audit_auditlog "
+                f"FOR VALUES FROM ('{month.isoformat()}') TO ('{following.isoformat()}')"
+            )
+            month = following
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("audit", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(PARTITIONED_TABLE_SQL),
+                migrations.RunPython(create_monthly_partitions),
+                migrations.RunSQL(COPY_AND_DROP_SQL),
+            ],
+            state_operations=[
+                migrations.DeleteModel(name="AuditLog"),
+                migrations.CreateModel(
+                    name="AuditLog",
+                    fields=[
+                        ("pk", models.CompositePrimaryKey("id", "timestamp", blank=True, editable=False, primary_key=True, serialize=False)),
+                        ("id", models.UUIDField(default=uuid.uuid4, editable=False)),
+                        ("user_email", models.CharField(blank=True, max_length=255, null=True)),
+                        ("action", models.CharField(max_length=100)),
+                        ("entity_type", models.CharField(max_length=100)),
+                        ("entity_id", models.UUIDField(blank=True, null=True)),
+                        ("details", models.JSONField(blank=True, null=True)),
+                        ("ip_address", models.GenericIPAddressField(blank=True, null=True)),
+                        ("timestamp", models.DateTimeField(default=django.utils.timezone.now)),
+                        (
+                            "user",
+                            models.ForeignKey(
+                                blank=True,
+                                null=True,
+                                on_delete=django.db.models.deletion.SET_NULL,
+                                related_name="audit_entries",
+                                to=settings.AUTH_USER_MODEL,
+                                verbose_name="System Actor",
+                            ),
+                        ),
+                    ],
+                    options={
+                        "verbose_name": "Audit Log Entry (Trust Ledger)",
+                        "verbose_name_plural": "Audit Log Entries (Trust Ledger)",
+                        "ordering": ["-timestamp"],
+                        "indexes": [
+                            models.Index(fields=["entity_type", "entity_id", "timestamp"], name="audit_entity_trail_idx"),
+                            models.Index(fields=["user", "timestamp"], name="audit_user_trail_idx"),
+                            models.Index(fields=["timestamp"], name="audit_timestamp_idx"),
+                        ],
+                    },
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,118 @@
+# Generated by Django 5.2.7 on 2026-10-17 09:52
+
+import hashlib
+import json
+from datetime import timezone as dt_timezone
+
+from django.db import migrations, models
+
+BACKFILL_BATCH = 5000
+GENESIS_HASH = "0" * 64
+
+
+# Frozen copy of audit.ledger.TrustLedger.entry_hash as of this migration
+def entry_hash(prev_hash, sequence, entry_id, timestamp, user_email, action, entity_type, entity_id, details,
+               ip_address):
+    payload = json.dumps(
+        [
+            sequence, str(entry_id), timestamp.astimezone(dt_timezone.utc).isoformat(), user_email,
+            action, entity_type, str(entity_id) if entity_id else None, details, ip_address,
+        ],
+        sort_keys=True, separators=(",", ":"), default=str,
+    ).encode("utf-8")
+    return hashlib.sha256(prev_hash.encode("ascii") + payload).hexdigest()
+
+
+def chain_existing_entries(apps, schema_editor):
+    """Links entries written before the ledger into the chain, oldest first, and seeds the head."""
+    sequence, prev_hash, after = 0, GENESIS_HASH, None
+    with schema_editor.connection.cursor() as cursor:
+        while True:
+            # Keyset page on (timestamp, id): one bounded read per batch, whatever the table size
+            cursor.execute(
+                "SELECT id, timestamp, user_email, action, entity_type, entity_id, details, ip_address "
+                "FROM audit_auditlog "
+                + ("WHERE (timestamp, id) > (%s, %s) " if after else "")
+                + "ORDER BY timestamp, id LIMIT %s",
+                [*(after or ()), BACKFILL_BATCH],
+            )
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            updates = []
+            for entry_id, timestamp, user_email, action, entity_type, entity_id, details, ip_address in rows:
+                sequence += 1
+                if isinstance(details, str):  # jsonb may arrive undecoded depending on the driver
+                    details = json.loads(details)
+                hashed = entry_hash(
+                    prev_hash, sequence, entry_id, timestamp, user_email, action,
+                    entity_type, entity_id, details, ip_address,
+                )
+                updates.append((sequence, prev_hash, hashed, entry_id, timestamp))
+                prev_hash = hashed
+            # The whole batch in one statement
+            cursor.execute(
+                "UPDATE audit_auditlog AS entry "
+                "SET sequence = batch.sequence, prev_hash = batch.prev_hash, entry_hash = batch.entry_hash "
+                "FROM (VALUES "
+                + ", ".join(["(%s::bigint, %s, %s, %s::uuid, %s::timestamptz)"] * len(updates))
+                + ") AS batch (sequence, prev_hash, entry_hash, id, timestamp) "
+                "WHERE entry.id = batch.id AND entry.timestamp = batch.timestamp",
+                [value for update in updates for value in update],
+            )
+            after = rows[-1][1], rows[-1][0]
+
+    AuditChainHead = apps.get_model("audit", "AuditChainHead")
+    AuditChainHead.objects.create(id=1, last_sequence=sequence, last_hash=prev_hash)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("audit", "0002_partitioned_auditlog"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AuditChainHead",
+            fields=[
+                ("id", models.PositiveSmallIntegerField(default=1, primary_key=True, serialize=False)),
+                ("last_sequence", models.BigIntegerField(default=0)),
+                ("last_hash", models.CharField(default="0000000000000000000000000000000000000000000000000000000000000000", max_length=64)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="AuditCheckpoint",
+            fields=[
+                ("block", models.BigIntegerField(primary_key=True, serialize=False)),
+                ("first_sequence", models.BigIntegerField()),
+                ("last_sequence", models.BigIntegerField()),
+                ("merkle_root", models.CharField(max_length=64)),
+                ("last_entry_hash", models.CharField(max_length=64)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name="auditlog",
+            name="sequence",
+            field=models.BigIntegerField(default=0, editable=False),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name="auditlog",
+            name="prev_hash",
+            field=models.CharField(default="", editable=False, max_length=64),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name="auditlog",
+            name="entry_hash",
+            field=models.CharField(default="", editable=False, max_length=64),
+            preserve_default=False,
+        ),
+        migrations.RunPython(chain_existing_entries, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="auditlog",
+            index=models.Index(fields=["sequence"], name="audit_sequence_idx"),
+        ),
+    ]
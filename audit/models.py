@@ -1,13 +1,31 @@
 # audit/models.py
 from django.db import models
 from django.contrib.auth.models import User
+from django.utils import timezone
 from uuid import uuid4
 
+
+class AuditLogQuerySet(models.QuerySet):
+    def for_entity(self, entity_type: str, entity_id):
+        """Audit trail of one entity, newest first (audit_entity_trail_idx)."""
+        return self.filter(entity_type=entity_type, entity_id=entity_id).order_by('-timestamp')
+
+    def for_user(self, user):
+        """Actions of one user, newest first (audit_user_trail_idx)."""
+        return self.filter(user=user).order_by('-timestamp')
+
+
 class AuditLog(models.Model):
     """
     Relational record of immutable actions, backed by the Blockchain Trust Ledger.
+
+    Append-only and range-partitioned by month on `timestamp` (see
+    audit.partitions), hence the (id, timestamp) primary key. Entries are
+    written through `audit.ingest.audit_log`, which buffers them off the
+    request path and inserts them in batches.
     """
-    id = models.UUIDField(primary_key=True, default=uuid4, editable=False)
+    pk = models.CompositePrimaryKey('id', 'timestamp') # Postgres: the partition key must be in the PK
+    id = models.UUIDField(default=uuid4, editable=False)
     
     # Link to the Profile, replacing the original user_id UUID foreign key
     user = models.ForeignKey(
@@ -26,8 +44,13 @@ class AuditLog(models.Model):
     
     details = models.JSONField(null=True, blank=True) # JSONB from SQL
     ip_address = models.GenericIPAddressField(null=True, blank=True)
-    timestamp = models.DateTimeField(auto_now_add=True)
+    timestamp = models.DateTimeField(default=timezone.now) # Time of the action, not of the (buffered) insert
     
+    # Trust Ledger hash chain (audit.ledger.TrustLedger), assigned when the entry is flushed
+    sequence = models.BigIntegerField(editable=False) # Gap-free position in the chain
+    prev_hash = models.CharField(max_length=64, editable=False)
+    entry_hash = models.CharField(max_length=64, editable=False) # sha256(prev_hash + canonical entry)
+
     # FUTURE: Field to store the Blockchain Transaction Hash
     # blockchain_tx_hash = models.CharField(max_length=66, unique=True, null=True, blank=True)
 
@@ -36,6 +59,40 @@ class AuditLog(models.Model):
         verbose_name_plural = "Audit Log Entries (Trust Ledger)"
         # Ensures latest actions are always first in the Audit Trail view
         ordering = ['-timestamp'] 
+        indexes = [
+            models.Index(fields=['entity_type', 'entity_id', 'timestamp'], name='audit_entity_trail_idx'),
+            models.Index(fields=['user', 'timestamp'], name='audit_user_trail_idx'),
+            models.Index(fields=['timestamp'], name='audit_timestamp_idx'),
+            # Ledger verification and proofs read the chain by sequence range
+            models.Index(fields=['sequence'], name='audit_sequence_idx'),
+        ]
+
+    objects = AuditLogQuerySet.as_manager()
+
+    def __str__(self):
+        return f"[{self.timestamp.strftime('%Y-%m-%d %H:%M')}] {self.action} on {self.entity_type}"
+
+
+class AuditChainHead(models.Model):
+    """Singleton row holding the tip of the Trust Ledger chain; locked by every append."""
+    SINGLETON_ID = 1
+
+    id = models.PositiveSmallIntegerField(primary_key=True, default=SINGLETON_ID)
+    last_sequence = models.BigIntegerField(default=0)
+    last_hash = models.CharField(max_length=64, default='0' * 64)
+
+    def __str__(self):
+        return f"Ledger head #{self.last_sequence} {self.last_hash[:12]}"
+
+
+class AuditCheckpoint(models.Model):
+    """Merkle root of one fixed-size block of the Trust Ledger (TrustLedger.BLOCK_SIZE entries)."""
+    block = models.BigIntegerField(primary_key=True)
+    first_sequence = models.BigIntegerField()
+    last_sequence = models.BigIntegerField()
+    merkle_root = models.CharField(max_length=64)
+    last_entry_hash = models.CharField(max_length=64) # Chain hash closing the block
+    created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
-        return f"[{self.timestamp.strftime('%Y-%m-%d %H:%M')}] {self.action} on {self.entity_type}"
\ No newline at end of file
+        return f"Block {self.block} ({self.first_sequence}-{self.last_sequence}) {self.merkle_root[:12]}"
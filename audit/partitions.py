@@ -0,0 +1,49 @@
+# audit/partitions.py
+import logging
+from datetime import date
+
+from django.conf import settings
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+AUDIT_TABLE = 'audit_auditlog'
+AUDIT_PARTITION_MONTHS_AHEAD = getattr(settings, 'AUDIT_PARTITION_MONTHS_AHEAD', 3)
+
+
+def month_start(day: date, offset: int = 0) -> date:
+    """First day of the month `offset` months after `day`'s month."""
+    month_index = day.year * 12 + day.month - 1 + offset
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{AUDIT_TABLE}_y{month.year}m{month.month:02d}"
+
+
+def create_partition_sql(month: date) -> str:
+    return (
+        f"CREATE TABLE IF NOT EXISTS {partition_name(month)} PARTITION OF {AUDIT_TABLE} "
+        f"FOR VALUES FROM ('{month.isoformat()}') TO ('{month_start(month, 1).isoformat()}')"
+    )
+
+
+def ensure_partitions(months_ahead: int = AUDIT_PARTITION_MONTHS_AHEAD, today: date = None) -> list:
+    """
+    Creates the monthly partitions from the current month up to `months_ahead`
+    months out. Rows landing outside them go to the DEFAULT partition, which
+    must stay empty for a partition covering them to be created later, so this
+    runs well ahead of time (daily task).
+
+    Returns:
+        Names of the partitions that now exist for the window.
+    """
+    today = today or date.today()
+    names = []
+    with connection.cursor() as cursor:
+        for offset in range(months_ahead + 1):
+            month = month_start(today, offset)
+            cursor.execute(create_partition_sql(month))
+            names.append(partition_name(month))
+    logger.info(f"Audit log partitions ensured: {', '.join(names)}")
+    return names
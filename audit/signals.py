@@ -0,0 +1,41 @@
+# audit/signals.py
+from django.db.models.signals import post_delete, post_save
+
+from compliance.models import ComplianceRequirement
+from governance.models import Control, CorporateObjective, Policy
+from risk.models import Risk
+from .ingest import audit_log
+from .middleware import client_ip, current_request
+
+# Registers whose writes are recorded in the Trust Ledger, with their AuditLog.entity_type
+AUDITED_MODELS = {
+    Risk: 'risk',
+    Policy: 'policy',
+    Control: 'control',
+    CorporateObjective: 'objective',
+    ComplianceRequirement: 'compliance_requirement',
+}
+
+
+def _record(action: str, instance, details: dict = None):
+    request = current_request.get()
+    audit_log(
+        action, AUDITED_MODELS[type(instance)], entity_id=instance.pk,
+        user=getattr(request, 'user', None), details=details, ip_address=client_ip(request),
+    )
+
+
+def record_save(sender, instance, created, update_fields=None, raw=False, **kwargs):
+    if raw: # Fixture loading
+        return
+    details = {'fields': sorted(update_fields)} if update_fields else None
+    _record('create' if created else 'update', instance, details)
+
+
+def record_delete(sender, instance, **kwargs):
+    _record('delete', instance, {'title': str(instance)})
+
+
+for model in AUDITED_MODELS:
+    post_save.connect(record_save, sender=model, dispatch_uid=f'audit_save_{model._meta.label}')
+    post_delete.connect(record_delete, sender=model, dispatch_uid=f'audit_delete_{model._meta.label}')
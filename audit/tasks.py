@@ -0,0 +1,15 @@
+from celery import shared_task
+
+
+@shared_task
+def ensure_audit_partitions():
+    """Creates upcoming monthly AuditLog partitions (see CELERY_BEAT_SCHEDULE)."""
+    from audit.partitions import ensure_partitions
+    return ensure_partitions()
+
+
+@shared_task
+def checkpoint_audit_ledger():
+    """Writes Merkle checkpoints for completed Trust Ledger blocks (see CELERY_BEAT_SCHEDULE)."""
+    from audit.ledger import TrustLedger
+    return TrustLedger.checkpoint()
@@ -1,3 +1,145 @@
-from django.test import TestCase
+import gzip
+import importlib
+import json
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+from django.apps import apps
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+
+from governance.models import CorporateObjective
+from .ingest import AuditBuffer, audit_buffer
+from .ledger import GENESIS_HASH, TrustLedger
+from .models import AuditChainHead, AuditLog
+
+
+def create_entries(count: int, **fields):
+    """Chained and inserted the way audit.ingest.AuditBuffer.flush writes them."""
+    entries = [
+        AuditLog(action='update', entity_type='risk', user_email='auditor@example.com', details={'n': i}, **fields)
+        for i in range(count)
+    ]
+    with transaction.atomic():
+        TrustLedger.chain(entries)
+        AuditLog.objects.bulk_create(entries)
+    return entries
+
+
+class AuditExportTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create(username='admin', is_staff=True)
+        create_entries(25)
+
+    async def test_asgi_export_streams_every_row(self):
+        await self.async_client.aforce_login(self.admin)
+        response = await self.async_client.get('/api/audit/export/', {'format': 'ndjson', 'compression': 'gzip'})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.is_async)
+        body = b''.join([chunk async for chunk in response.streaming_content])
+        rows = [json.loads(line) for line in gzip.decompress(body).splitlines()]
+        self.assertEqual([row['sequence'] for row in rows], list(range(1, 26)))
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class AuditIngestTests(TestCase):
+
+    def setUp(self):
+        # Flush explicitly: the background flusher would lock the chain head from another connection
+        patcher = mock.patch.object(audit_buffer, '_ensure_worker')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(audit_buffer._entries.clear)
+
+    def test_register_writes_are_audited_on_commit(self):
+        with mock.patch('risk.graph_sync.GraphSyncQueue.schedule_flush'), \
+                self.captureOnCommitCallbacks(execute=True):
+            objective = CorporateObjective.objects.create(title="Grow", department="Ops", fiscal_year="2026")
+        audit_buffer.flush()
+        entry = AuditLog.objects.get(entity_id=objective.pk)
+        self.assertEqual((entry.action, entry.entity_type, entry.sequence), ('create', 'objective', 1))
+
+    def test_failed_inline_flush_keeps_entries(self):
+        entry = AuditLog(action='update', entity_type='risk')
+        with mock.patch.object(AuditBuffer, 'CAPACITY', 1), \
+                mock.patch.object(TrustLedger, 'chain', side_effect=RuntimeError("database down")):
+            audit_buffer.append(entry) # Must not raise into the caller
+        self.assertEqual(list(audit_buffer._entries), [entry])
+
+
+@mock.patch.object(TrustLedger, 'BLOCK_SIZE', 4)
+class TrustLedgerTests(TestCase):
+    """Chaining, tamper detection and Merkle inclusion proofs (blocks of 4 entries)."""
+
+    def setUp(self):
+        self.entries = create_entries(10)
+
+    def verify_all(self) -> dict:
+        head = AuditChainHead.objects.get()
+        return TrustLedger.verify_range(1, head.last_sequence, GENESIS_HASH, None, head.last_hash)
+
+    def test_chain_links_entries(self):
+        self.assertEqual([entry.sequence for entry in self.entries], list(range(1, 11)))
+        self.assertEqual(self.entries[0].prev_hash, GENESIS_HASH)
+        for previous, entry in zip(self.entries, self.entries[1:]):
+            self.assertEqual(entry.prev_hash, previous.entry_hash)
+        self.assertEqual(AuditChainHead.objects.get().last_hash, self.entries[-1].entry_hash)
+        self.assertEqual(self.verify_all()['errors'], [])
+
+    def test_ipv6_address_is_hashed_as_stored(self):
+        # Stored compressed by the inet column; the hash must not depend on how the caller wrote it
+        create_entries(2, ip_address='2001:0DB8:0000:0000:0000:0000:0000:0001')
+        self.assertEqual(AuditLog.objects.get(sequence=11).ip_address, '2001:db8::1')
+        self.assertEqual(self.verify_all()['errors'], [])
+
+    def test_edited_entry_is_detected(self):
+        AuditLog.objects.filter(sequence=5).update(details={'n': 'forged'})
+        errors = self.verify_all()['errors']
+        self.assertEqual(len(errors), 1)
+        self.assertIn("Entry 5", errors[0])
+
+    def test_deleted_entry_is_detected(self):
+        AuditLog.objects.filter(sequence=5).delete()
+        errors = self.verify_all()['errors']
+        self.assertIn("Missing entries 5..5.", errors)
+        self.assertIn("Entry 6: prev_hash does not link to entry 5.", errors)
+
+    def test_inclusion_proof(self):
+        self.assertEqual(TrustLedger.checkpoint(), 2) # Blocks 1-4 and 5-8; 9-10 is incomplete
+        entry = self.entries[6]
+        proof = TrustLedger.inclusion_proof(entry.id)
+        self.assertEqual(proof['block'], 1)
+        self.assertTrue(TrustLedger.verify_proof(proof['entry_hash'], proof['path'], proof['merkle_root']))
+        self.assertFalse(TrustLedger.verify_proof(self.entries[0].entry_hash, proof['path'], proof['merkle_root']))
+
+    def test_backfill_migration_matches_ledger(self):
+        # Entries written before the ledger existed, re-chained by the migration
+        AuditLog.objects.update(sequence=0, prev_hash='', entry_hash='')
+        AuditChainHead.objects.all().delete()
+        migration = importlib.import_module('audit.migrations.0003_trust_ledger')
+        with mock.patch.object(migration, 'BACKFILL_BATCH', 3): # Several keyset pages
+            migration.chain_existing_entries(apps, SimpleNamespace(connection=connection))
+        self.assertEqual(AuditChainHead.objects.get().last_sequence, 10)
+        self.assertEqual(self.verify_all()['errors'], [])
+
+
+@mock.patch.object(TrustLedger, 'BLOCK_SIZE', 4)
+class TrustLedgerVerifyTests(TransactionTestCase):
+    """`verify` re-reads the committed chain from forked worker processes."""
+
+    def setUp(self):
+        AuditChainHead.objects.get_or_create(pk=AuditChainHead.SINGLETON_ID)
+        create_entries(10)
+        TrustLedger.checkpoint()
+
+    def test_verify(self):
+        report = TrustLedger.verify(workers=2)
+        self.assertEqual((report['entries'], report['blocks'], report['errors']), (10, 3, []))
+
+        AuditLog.objects.filter(sequence=2).update(action='delete')
+        errors = TrustLedger.verify(workers=2)['errors']
+        self.assertEqual(len(errors), 1)
+        self.assertIn("Entry 2", errors[0])
@@ -0,0 +1,7 @@
+from django.urls import path
+from .views import AuditExportAPI
+
+urlpatterns = [
+    # Matches /api/audit/export/?entity_type=Risk&start=2026-01-01&format=ndjson&compression=zstd
+    path('export/', AuditExportAPI.as_view(), name='audit-export'),
+]
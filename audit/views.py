@@ -1,3 +1,91 @@
-from django.shortcuts import render
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ImproperlyConfigured
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from rest_framework.negotiation import DefaultContentNegotiation
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.settings import APISettings
+from rest_framework.views import APIView
 
-# Create your views here.
+from .export import (
+    EXPORT_COMPRESSIONS, EXPORT_FORMATS, content_type, export_queryset, file_extension, parse_bound,
+    stream_export,
+)
+from .ingest import audit_log
+from .middleware import client_ip
+
+
+class ExportContentNegotiation(DefaultContentNegotiation):
+    """`?format=` picks the export file format here, not a DRF renderer (which would 404 on 'ndjson')."""
+    settings = APISettings({'URL_FORMAT_OVERRIDE': None})
+
+
+async def _async_chunks(chunks):
+    """
+    Pulls a sync chunk iterator one chunk at a time in the sync thread. Under
+    ASGI a sync iterator would be drained into a list before the first byte
+    is sent; thread_sensitive keeps every step on the thread that owns the
+    server-side cursor's connection.
+    """
+    next_chunk = sync_to_async(next)
+    done = object()
+    try:
+        while (chunk := await next_chunk(chunks, done)) is not done:
+            yield chunk
+    finally:
+        # Closes the cursor when the client disconnects mid-stream
+        await sync_to_async(chunks.close)()
+
+
+class AuditExportAPI(APIView):
+    """
+    Streams an audit trail extract (optionally filtered by entity and date
+    range) as gzip/zstd NDJSON or Parquet. Rows are read with a server-side
+    cursor and compressed chunk by chunk, so memory stays constant whatever
+    the range size (under ASGI too, where the chunks are pulled one at a time
+    through `_async_chunks`).
+
+    Query params: entity_type, entity_id, start, end (ISO date/datetime; end
+    exclusive), format=ndjson|parquet, compression=gzip|zstd.
+    """
+    permission_classes = [IsAdminUser]
+    content_negotiation_class = ExportContentNegotiation
+
+    def get(self, request, *args, **kwargs):
+        params = request.query_params
+        export_format = params.get('format', 'ndjson')
+        compression = params.get('compression', 'gzip')
+        if export_format not in EXPORT_FORMATS or compression not in EXPORT_COMPRESSIONS:
+            return Response(
+                {"error": f"format must be one of {EXPORT_FORMATS}, compression one of {EXPORT_COMPRESSIONS}."},
+                status=400,
+            )
+        try:
+            start, end = parse_bound(params.get('start')), parse_bound(params.get('end'))
+        except ValueError as exc:
+            return Response({"error": str(exc)}, status=400)
+
+        queryset = export_queryset(
+            entity_type=params.get('entity_type'), entity_id=params.get('entity_id'), start=start, end=end,
+        )
+        try:
+            chunks = stream_export(queryset, export_format, compression)
+        except ImproperlyConfigured as exc:
+            return Response({"error": str(exc)}, status=501)
+
+        audit_log(
+            'export', 'audit_log', user=request.user, ip_address=client_ip(request),
+            details={'format': export_format, 'compression': compression, **{
+                key: params[key] for key in ('entity_type', 'entity_id', 'start', 'end') if key in params
+            }},
+        )
+        filename = f"audit-{timezone.now():%Y%m%dT%H%M%S}.{file_extension(export_format, compression)}"
+        if isinstance(request._request, ASGIRequest):
+            chunks = _async_chunks(chunks)
+        response = StreamingHttpResponse(
+            chunks, content_type=content_type(export_format, compression),
+        )
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
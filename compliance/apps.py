@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class ComplianceConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "compliance"
+
+    def ready(self):
+        # Keeps ComplianceRequirement nodes and embeddings in sync with Neo4j
+        import compliance.signals
@@ -0,0 +1,148 @@
+# compliance/auto_mapping.py
+
+import logging
+import time
+from decimal import Decimal
+from typing import Tuple
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+
+from governance.models import Policy
+from risk.vector_index import load_embeddings
+from .models import ComplianceRequirement, RegulationMapping
+
+logger = logging.getLogger(__name__)
+
+AUTO_MAPPING_TOP_K = getattr(settings, 'AUTO_MAPPING_TOP_K', 5)
+AUTO_MAPPING_MIN_CONFIDENCE = getattr(settings, 'AUTO_MAPPING_MIN_CONFIDENCE', 0.5)
+
+# Upper bound on the similarity block held in memory (rows x columns), ~64 MB of float32
+MAX_BLOCK_ELEMENTS = 16 * 1024 * 1024
+
+
+def top_k_similarities(sources: np.ndarray, targets: np.ndarray, k: int,
+                       max_block_elements: int = MAX_BLOCK_ELEMENTS) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Finds the k most similar target rows for every source row.
+
+    Similarities are computed as blocked matrix products so that only one
+    (block_rows x len(targets)) score block is alive at a time.
+
+    Returns:
+        (indices, scores), both of shape (len(sources), k), best match first.
+    """
+    k = min(k, len(targets))
+    indices = np.empty((len(sources), k), dtype=np.int64)
+    scores = np.empty((len(sources), k), dtype=np.float32)
+    if not k:
+        return indices, scores
+
+    targets_t = np.ascontiguousarray(targets.T)
+    block_rows = max(1, max_block_elements // len(targets))
+    for start in range(0, len(sources), block_rows):
+        block = sources[start:start + block_rows] @ targets_t
+        # Unordered top-k per row in O(n), then sort just those k
+        top = np.argpartition(-block, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(block, top, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        indices[start:start + len(block)] = np.take_along_axis(top, order, axis=1)
+        scores[start:start + len(block)] = np.take_along_axis(top_scores, order, axis=1)
+    return indices, scores
+
+
+def auto_map_regulations(top_k: int = AUTO_MAPPING_TOP_K, min_confidence: float = AUTO_MAPPING_MIN_CONFIDENCE,
+                         batch_size: int = 5000) -> dict:
+    """
+    Scores every Policy against every ComplianceRequirement and upserts the
+    top-k matches per policy into RegulationMapping.
+
+    Mappings confirmed by a user (`mapped_by` set) are never overwritten.
+    Automatic mappings between the scored policies and requirements that are
+    no longer among the matches are deleted in the same transaction.
+
+    Returns:
+        A dict of counts and timings for logging/reporting.
+    """
+    started = time.perf_counter()
+
+    # 1. Load both embedding matrices (contiguous float32) and drop nodes without a relational row
+    policy_uids, policy_matrix = load_embeddings('Policy')
+    requirement_uids, requirement_matrix = load_embeddings('ComplianceRequirement')
+    known_policies = {str(pk) for pk in Policy.objects.filter(id__in=policy_uids).values_list('id', flat=True)}
+    known_requirements = {
+        str(pk) for pk in ComplianceRequirement.objects.filter(id__in=requirement_uids).values_list('id', flat=True)
+    }
+    policy_keep = [i for i, uid in enumerate(policy_uids) if uid in known_policies]
+    requirement_keep = [i for i, uid in enumerate(requirement_uids) if uid in known_requirements]
+    policy_uids = [policy_uids[i] for i in policy_keep]
+    requirement_uids = [requirement_uids[i] for i in requirement_keep]
+    policy_matrix = np.ascontiguousarray(policy_matrix[policy_keep])
+    requirement_matrix = np.ascontiguousarray(requirement_matrix[requirement_keep])
+    loaded = time.perf_counter()
+
+    # 2. Blocked similarity search
+    indices, scores = top_k_similarities(policy_matrix, requirement_matrix, top_k)
+    scored = time.perf_counter()
+
+    # 3. Upsert the confident matches, leaving manually confirmed mappings alone
+    manual = {
+        (str(policy_id), str(requirement_id))
+        for policy_id, requirement_id in RegulationMapping.objects.filter(
+            mapped_by__isnull=False
+        ).values_list('policy_id', 'requirement_id')
+    }
+    mappings = []
+    for row, policy_uid in enumerate(policy_uids):
+        for rank, (column, score) in enumerate(zip(indices[row], scores[row]), start=1):
+            if score < min_confidence:
+                break
+            requirement_uid = requirement_uids[column]
+            if (policy_uid, requirement_uid) in manual:
+                continue
+            confidence = min(max(float(score), 0.0), 1.0)
+            mappings.append(RegulationMapping(
+                policy_id=policy_uid,
+                requirement_id=requirement_uid,
+                mapping_confidence=Decimal(f"{confidence:.2f}"),
+                mapping_rationale=(
+                    f"Semantic similarity of {confidence:.2f} between the policy and requirement "
+                    f"embeddings (rank {rank} of top {top_k})."
+                ),
+            ))
+
+    # 4. Drop automatic mappings that fell out of the results (unscored policies/requirements are left alone)
+    matched = {(mapping.policy_id, mapping.requirement_id) for mapping in mappings}
+    scored_policies = set(policy_uids)
+    with transaction.atomic():
+        existing = RegulationMapping.objects.filter(
+            mapped_by__isnull=True, requirement_id__in=requirement_uids,
+        ).values_list('id', 'policy_id', 'requirement_id')
+        stale = [
+            mapping_id for mapping_id, policy_id, requirement_id in existing.iterator(chunk_size=batch_size)
+            if str(policy_id) in scored_policies and (str(policy_id), str(requirement_id)) not in matched
+        ]
+        for start in range(0, len(stale), batch_size):
+            RegulationMapping.objects.filter(id__in=stale[start:start + batch_size]).delete()
+
+        RegulationMapping.objects.bulk_create(
+            mappings,
+            batch_size=batch_size,
+            update_conflicts=True,
+            unique_fields=['policy', 'requirement'],
+            update_fields=['mapping_confidence', 'mapping_rationale'],
+        )
+    finished = time.perf_counter()
+
+    stats = {
+        'policies': len(policy_uids),
+        'requirements': len(requirement_uids),
+        'mappings': len(mappings),
+        'removed': len(stale),
+        'load_seconds': round(loaded - started, 3),
+        'score_seconds': round(scored - loaded, 3),
+        'write_seconds': round(finished - scored, 3),
+    }
+    logger.info(f"Regulation auto-mapping finished: {stats}")
+    return stats
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from compliance.auto_mapping import auto_map_regulations, AUTO_MAPPING_TOP_K, AUTO_MAPPING_MIN_CONFIDENCE
+
+
+class Command(BaseCommand):
+    help = "Scores every Policy against every ComplianceRequirement and fills RegulationMapping with the top matches."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top-k', type=int, default=AUTO_MAPPING_TOP_K,
+                            help="Requirements kept per policy.")
+        parser.add_argument('--min-confidence', type=float, default=AUTO_MAPPING_MIN_CONFIDENCE,
+                            help="Minimum cosine similarity for a mapping to be stored.")
+        parser.add_argument('--async', action='store_true', dest='run_async',
+                            help="Queue the Celery task instead of running in this process.")
+
+    def handle(self, *args, **options):
+        if options['run_async']:
+            from compliance.tasks import auto_map_regulations_task
+            task = auto_map_regulations_task.delay(options['top_k'], options['min_confidence'])
+            self.stdout.write(f"Queued auto-mapping task {task.id}")
+            return
+
+        stats = auto_map_regulations(top_k=options['top_k'], min_confidence=options['min_confidence'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Mapped {stats['policies']} policies x {stats['requirements']} requirements "
+            f"-> {stats['mappings']} mappings "
+            f"(load {stats['load_seconds']}s, score {stats['score_seconds']}s, write {stats['write_seconds']}s)"
+        ))
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.7 on 2026-10-17 07:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("compliance", "0002_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="compliancerequirement",
+            index=models.Index(fields=["created_at", "id"], name="compliance_req_created_idx"),
+        ),
+    ]
@@ -0,0 +1,106 @@
+# Generated by Django 5.2.7 on 2026-10-17 16:11
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("compliance", "0003_keyset_indexes"),
+        ("core", "0003_pg_trgm"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="compliancerequirement",
+            name="search_vector",
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=django.contrib.postgres.search.CombinedSearchVector(
+                    django.contrib.postgres.search.CombinedSearchVector(
+                        django.contrib.postgres.search.SearchVector(
+                            "requirement_code", config="english", weight="A"
+                        ),
+                        "||",
+                        django.contrib.postgres.search.SearchVector(
+                            "title", config="english", weight="B"
+                        ),
+                        django.contrib.postgres.search.SearchConfig("english"),
+                    ),
+                    "||",
+                    django.contrib.postgres.search.SearchVector(
+                        "description", config="english", weight="C"
+                    ),
+                    django.contrib.postgres.search.SearchConfig("english"),
+                ),
+                output_field=django.contrib.postgres.search.SearchVectorField(),
+            ),
+        ),
+        migrations.AddField(
+            model_name="compliancechecklist",
+            name="search_vector",
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=django.contrib.postgres.search.CombinedSearchVector(
+                    django.contrib.postgres.search.CombinedSearchVector(
+                        django.contrib.postgres.search.SearchVector(
+                            "requirement_code", config="english", weight="A"
+                        ),
+                        "||",
+                        django.contrib.postgres.search.SearchVector(
+                            "title", config="english", weight="B"
+                        ),
+                        django.contrib.postgres.search.SearchConfig("english"),
+                    ),
+                    "||",
+                    django.contrib.postgres.search.SearchVector(
+                        "description", config="english", weight="C"
+                    ),
+                    django.contrib.postgres.search.SearchConfig("english"),
+                ),
+                output_field=django.contrib.postgres.search.SearchVectorField(),
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="compliancerequirement",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="compliance_req_search_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="compliancechecklist",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="compliance_chk_search_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="compliancerequirement",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("requirement_code"), name="gin_trgm_ops"
+                ),
+                name="compliance_req_code_trgm",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="compliancerequirement",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("title"), name="gin_trgm_ops"
+                ),
+                name="compliance_req_title_trgm",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="compliancechecklist",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("requirement_code"), name="gin_trgm_ops"
+                ),
+                name="compliance_chk_code_trgm",
+            ),
+        ),
+    ]
@@ -1,8 +1,11 @@
 # compliance/models.py
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.db import models
+from django.db.models.functions import Upper
 from governance.models import Policy
 from core.models import Profile
 from uuid import uuid4
+from core.managers import GraphSyncSearchManager, SearchManager, search_vector_field
 
 class ComplianceRequirement(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid4, editable=False)
@@ -17,6 +20,22 @@ class ComplianceRequirement(models.Model):
     evidence_url = models.TextField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+
+    # Weighted tsvector maintained by the database (core.managers.SearchQuerySet)
+    search_vector = search_vector_field('requirement_code', 'title', 'description')
+    TRIGRAM_FIELDS = ('requirement_code', 'title') # Substring / fuzzy lookups, see Meta.indexes
+
+    objects = GraphSyncSearchManager() # bulk writes are synced to Neo4j too; .search() / .ranked()
+
+    class Meta:
+        indexes = [
+            # Keyset pagination of the register API (core.pagination.KeysetPagination)
+            models.Index(fields=['created_at', 'id'], name='compliance_req_created_idx'),
+            # Full-text search, and icontains / trigram similarity on UPPER(code), UPPER(title)
+            GinIndex(fields=['search_vector'], name='compliance_req_search_idx'),
+            GinIndex(OpClass(Upper('requirement_code'), name='gin_trgm_ops'), name='compliance_req_code_trgm'),
+            GinIndex(OpClass(Upper('title'), name='gin_trgm_ops'), name='compliance_req_title_trgm'),
+        ]
     
     def __str__(self):
         return self.requirement_code
@@ -34,6 +53,17 @@ class ComplianceChecklist(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    search_vector = search_vector_field('requirement_code', 'title', 'description')
+    TRIGRAM_FIELDS = ('requirement_code',)
+
+    objects = SearchManager()
+
+    class Meta:
+        indexes = [
+            GinIndex(fields=['search_vector'], name='compliance_chk_search_idx'),
+            GinIndex(OpClass(Upper('requirement_code'), name='gin_trgm_ops'), name='compliance_chk_code_trgm'),
+        ]
+
     def __str__(self):
         return self.title
 
@@ -0,0 +1,20 @@
+# compliance/serializers.py
+from rest_framework import serializers
+from core.serializers import ProfileSummarySerializer
+from .models import ComplianceRequirement
+
+
+class ComplianceRequirementListSerializer(serializers.ModelSerializer):
+    owner = ProfileSummarySerializer(read_only=True)
+
+    class Meta:
+        model = ComplianceRequirement
+        fields = [
+            'id', 'requirement_code', 'title', 'source', 'category', 'status', 'due_date',
+            'owner', 'created_at', 'updated_at',
+        ]
+
+
+class ComplianceRequirementDetailSerializer(ComplianceRequirementListSerializer):
+    class Meta(ComplianceRequirementListSerializer.Meta):
+        fields = ComplianceRequirementListSerializer.Meta.fields + ['description', 'evidence_url']
@@ -0,0 +1,21 @@
+# compliance/signals.py
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import ComplianceRequirement
+from risk.vector_index import VectorIndexRegistry
+from risk.graph_sync import GraphSyncQueue
+
+
+# --- ComplianceRequirement Signals ---
+@receiver(post_save, sender=ComplianceRequirement)
+def update_requirement_graph_and_embed(sender, instance, created, **kwargs):
+    """Queues the ComplianceRequirement node upsert for Neo4j and, if its text changed, its embedding."""
+    # Write-behind sync with Neo4j + AI embedding task (feeds the Policy <-> Requirement vector index)
+    GraphSyncQueue.enqueue_instance(instance)
+
+@receiver(post_delete, sender=ComplianceRequirement)
+def delete_requirement_graph(sender, instance, **kwargs):
+    """Queues deletion of the ComplianceRequirement node from Neo4j when the Django object is deleted."""
+    uid_str = str(instance.id)
+    VectorIndexRegistry.remove('requirement', [uid_str])
+    GraphSyncQueue.enqueue_delete('ComplianceRequirement', uid_str)
@@ -0,0 +1,20 @@
+from celery import shared_task
+import logging
+from .auto_mapping import auto_map_regulations, AUTO_MAPPING_TOP_K, AUTO_MAPPING_MIN_CONFIDENCE
+
+logger = logging.getLogger(__name__)
+
+@shared_task(bind=True, default_retry_delay=300, max_retries=3)
+def auto_map_regulations_task(self, top_k: int = AUTO_MAPPING_TOP_K, min_confidence: float = AUTO_MAPPING_MIN_CONFIDENCE):
+    """
+    Recomputes the Policy -> ComplianceRequirement RegulationMapping suggestions in one pass.
+
+    Args:
+        top_k (int): Number of requirements kept per policy.
+        min_confidence (float): Minimum cosine similarity for a mapping to be stored.
+    """
+    try:
+        return auto_map_regulations(top_k=top_k, min_confidence=min_confidence)
+    except Exception as exc:
+        logger.error(f"Error auto-mapping regulations: {exc}")
+        raise self.retry(exc=exc)
@@ -1,3 +1,84 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from core.models import Profile
+from governance.models import Policy
+from risk.vector_index import EMBEDDING_DIM
+from .auto_mapping import auto_map_regulations
+from .models import ComplianceRequirement, RegulationMapping
+
+# Graph-version bumps from the sync signals go to a local cache instead of Redis
+LOCMEM_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class ComplianceRequirementAPIQueryBudgetTests(APITestCase):
+    """The register API must cost a fixed number of queries per page, whatever the page holds."""
+
+    @classmethod
+    def setUpTestData(cls):
+        owner = Profile.objects.create(user=User.objects.create(username="owner"), full_name="Owner")
+        ComplianceRequirement.objects.bulk_create([
+            ComplianceRequirement(
+                requirement_code=f"REQ-{i}", title=f"Requirement {i}", source="ISO 27001", category="Access", owner=owner
+            )
+            for i in range(25)
+        ])
+
+    def test_list_query_budget(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('compliance-requirement-list'), {'page_size': 25})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), 25)
+        self.assertIsNone(response.data['next'])
+
+    def test_detail_query_budget(self):
+        requirement = ComplianceRequirement.objects.first()
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('compliance-requirement-detail', args=[requirement.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['requirement_code'], requirement.requirement_code)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class AutoMappingTests(TestCase):
+    """A rerun replaces stale automatic mappings but keeps confirmed ones and unscored requirements."""
+
+    def setUp(self):
+        self.owner = Profile.objects.create(user=User.objects.create(username="owner"), full_name="Owner")
+        self.policies = Policy.objects.bulk_create([Policy(title=f"Policy {i}", category="IT") for i in range(2)])
+        self.requirements = ComplianceRequirement.objects.bulk_create([
+            ComplianceRequirement(requirement_code=f"REQ-{i}", title=f"Requirement {i}", source="PenCom", category="IT")
+            for i in range(3)
+        ])
+
+    def embeddings(self, label):
+        # Policy i matches requirement i only; requirement 2 has no embedding yet
+        rows = self.policies if label == 'Policy' else self.requirements[:2]
+        return [str(row.pk) for row in rows], np.eye(len(rows), EMBEDDING_DIM, dtype=np.float32)
+
+    def mapping(self, policy, requirement, **fields):
+        return RegulationMapping.objects.create(policy=self.policies[policy], requirement=self.requirements[requirement],
+                                                **fields)
+
+    def test_stale_automatic_mappings_are_removed(self):
+        stale = self.mapping(0, 1)
+        confirmed = self.mapping(1, 0, mapped_by=self.owner)
+        unscored = self.mapping(0, 2)
+
+        with mock.patch('compliance.auto_mapping.load_embeddings', side_effect=self.embeddings):
+            stats = auto_map_regulations(top_k=2, min_confidence=0.5)
+
+        self.assertEqual((stats['mappings'], stats['removed']), (2, 1))
+        self.assertFalse(RegulationMapping.objects.filter(pk=stale.pk).exists())
+        self.assertEqual(RegulationMapping.objects.filter(pk__in=[confirmed.pk, unscored.pk]).count(), 2)
+        self.assertCountEqual(
+            RegulationMapping.objects.filter(mapped_by__isnull=True).values_list('policy_id', 'requirement_id'),
+            [(self.policies[0].pk, self.requirements[0].pk), (self.policies[1].pk, self.requirements[1].pk),
+             (self.policies[0].pk, self.requirements[2].pk)],
+        )
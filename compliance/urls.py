@@ -0,0 +1,8 @@
+from rest_framework.routers import SimpleRouter
+from .views import ComplianceRequirementViewSet
+
+router = SimpleRouter()
+# Matches /api/compliance/requirements/
+router.register('requirements', ComplianceRequirementViewSet, basename='compliance-requirement')
+
+urlpatterns = router.urls
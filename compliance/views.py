@@ -1,3 +1,28 @@
-from django.shortcuts import render
+from rest_framework import viewsets
+from core.pagination import KeysetPagination
+from core.serializers import ProfileSummarySerializer
+from .models import ComplianceRequirement
+from .serializers import ComplianceRequirementListSerializer, ComplianceRequirementDetailSerializer
 
-# Create your views here.
+
+class ComplianceRequirementViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Read API for compliance requirements: keyset-paginated list and detail, one query per page.
+    `?search=` matches full text, or a substring of the requirement code / title (trigram indexes).
+    """
+    pagination_class = KeysetPagination
+
+    LIST_FIELDS = (
+        'id', 'requirement_code', 'title', 'source', 'category', 'status', 'due_date',
+        'created_at', 'updated_at', *ProfileSummarySerializer.only('owner'),
+    )
+    DETAIL_FIELDS = LIST_FIELDS + ('description', 'evidence_url')
+
+    def get_queryset(self):
+        fields = self.DETAIL_FIELDS if self.action == 'retrieve' else self.LIST_FIELDS
+        queryset = ComplianceRequirement.objects.select_related('owner').only(*fields)
+        term = self.request.query_params.get('search')
+        return queryset.search(term) if term else queryset
+
+    def get_serializer_class(self):
+        return ComplianceRequirementDetailSerializer if self.action == 'retrieve' else ComplianceRequirementListSerializer
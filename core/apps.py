@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "core"
+
+    def ready(self):
+        # Dashboard rollups are maintained from the risk and compliance save/delete paths
+        from core.signals import connect_rollup_signals
+        connect_rollup_signals()
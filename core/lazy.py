@@ -0,0 +1,54 @@
+# core/lazy.py
+import importlib
+import sys
+import threading
+import types
+
+# Modules that must stay out of web processes until inference runs there
+HEAVY_MODULES = ('torch', 'dgl', 'sentence_transformers')
+
+
+class LazyModule(types.ModuleType):
+    """
+    Stand-in for a heavy module that is imported on first attribute access.
+
+    `torch = lazy_module('torch')` at the top of a module keeps the usual
+    `torch.tensor(...)` call sites, while importing that module costs nothing
+    until one of them actually runs in the process.
+    """
+
+    _lock = threading.Lock()
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__['_module'] = None
+
+    def _load(self) -> types.ModuleType:
+        module = self.__dict__['_module']
+        if module is None:
+            with self._lock:
+                module = self.__dict__['_module']
+                if module is None:
+                    module = importlib.import_module(self.__name__)
+                    self.__dict__['_module'] = module
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = 'loaded' if self.__dict__['_module'] is not None else 'not loaded'
+        return f"<lazy module '{self.__name__}' ({state})>"
+
+
+def lazy_module(name: str) -> types.ModuleType:
+    """The module itself if it is already imported, else a LazyModule proxy for it."""
+    return sys.modules.get(name) or LazyModule(name)
+
+
+def loaded_heavy_modules():
+    """Which of HEAVY_MODULES this process has actually imported."""
+    return [name for name in HEAVY_MODULES if name in sys.modules]
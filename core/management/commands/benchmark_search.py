@@ -0,0 +1,106 @@
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
+from urllib.request import urlopen
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+
+from core.search import SEARCH_CANDIDATES, SEARCH_TARGETS, hybrid_search
+from risk.vector_index import EMBEDDING_DIM, IVFIndex, VectorIndexRegistry
+
+SAMPLE_QUERIES = [
+    "multi-factor authentication for remote access",
+    "quarterly reconciliation of retirement savings accounts",
+    "vendor concentration risk in custody of pension assets",
+    "business continuity and disaster recovery testing",
+    "consent records for member personal data",
+    "segregation of duties in payment approvals",
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Load-tests search: the combined vector-index stage on synthetic embeddings (default), "
+        "hybrid_search in-process on the real data (--live), or a running /api/search/ (--url). "
+        "Reports p50/p95/p99 latency under concurrency; fails above --max-p95-ms."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--entities', type=int, default=500_000, help="Synthetic embeddings, split across labels.")
+        parser.add_argument('--queries', type=int, default=2000)
+        parser.add_argument('--concurrency', type=int, default=8, help="Concurrent clients.")
+        parser.add_argument('--k', type=int, default=10)
+        parser.add_argument('--live', action='store_true', help="Run hybrid_search on the database and model.")
+        parser.add_argument('--url', default=None, help="Base URL of a running server, e.g. http://localhost:8000")
+        parser.add_argument('--max-p95-ms', type=float, default=None, help="Fail above this p95 latency.")
+
+    def handle(self, *args, **options):
+        queries = [f"{SAMPLE_QUERIES[i % len(SAMPLE_QUERIES)]} {i}" for i in range(options['queries'])]
+        k = options['k']
+
+        if options['url']:
+            endpoint = f"{options['url'].rstrip('/')}/api/search/"
+
+            def run(query):
+                with urlopen(f"{endpoint}?{urlencode({'q': query, 'k': k})}") as response:
+                    json.load(response)
+            name = 'http'
+        elif options['live']:
+            def run(query):
+                hybrid_search(query, k=k)
+            name = 'hybrid_search'
+        else:
+            vectors = self._install_synthetic_indexes(options['entities'], options['queries'])
+
+            def run(query_vector):
+                VectorIndexRegistry.search(query_vector, SEARCH_TARGETS, max(k, SEARCH_CANDIDATES))
+            queries = vectors
+            name = 'vector_search'
+
+        run(queries[0]) # Warm-up (model load, index training, connections)
+        latencies, elapsed = self._load(run, queries, options['concurrency'])
+        p95 = self._report(name, latencies, elapsed, options['concurrency'])
+        if options['max_p95_ms'] is not None and p95 > options['max_p95_ms']:
+            raise CommandError(f"p95 latency {p95:.1f} ms exceeds {options['max_p95_ms']} ms.")
+
+    def _install_synthetic_indexes(self, entities: int, num_queries: int) -> np.ndarray:
+        """Clustered unit vectors (topics plus noise) loaded straight into the registry; returns query vectors."""
+        rng = np.random.default_rng(0)
+        topics = rng.standard_normal((256, EMBEDDING_DIM), dtype=np.float32)
+        per_label = max(1, entities // len(SEARCH_TARGETS))
+        for label in SEARCH_TARGETS:
+            started = time.perf_counter()
+            vectors = topics[rng.integers(0, len(topics), per_label)]
+            vectors += 0.5 * rng.standard_normal(vectors.shape, dtype=np.float32)
+            vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+            index = IVFIndex()
+            index.build([f"{label}-{i}" for i in range(per_label)], vectors)
+            # Never refreshed from Neo4j during the run
+            VectorIndexRegistry._indexes[label] = index
+            VectorIndexRegistry._loaded_at[label] = float('inf')
+            self.stdout.write(f"{label}: {per_label} vectors indexed in {time.perf_counter() - started:.1f}s")
+
+        queries = topics[rng.integers(0, len(topics), num_queries)]
+        queries += rng.standard_normal(queries.shape, dtype=np.float32)
+        return queries / np.linalg.norm(queries, axis=1, keepdims=True)
+
+    def _load(self, run, queries, concurrency: int):
+        def timed(query):
+            started = time.perf_counter()
+            run(query)
+            return time.perf_counter() - started
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            latencies = list(pool.map(timed, queries))
+        return np.array(latencies) * 1000, time.perf_counter() - started
+
+    def _report(self, name, latencies, elapsed, concurrency) -> float:
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+        self.stdout.write(
+            f"{name}: queries={len(latencies)} concurrency={concurrency} p50_ms={p50:.1f} p95_ms={p95:.1f} "
+            f"p99_ms={p99:.1f} queries_per_second={len(latencies) / max(elapsed, 1e-9):,.0f}"
+        )
+        return p95
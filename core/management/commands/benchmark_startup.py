@@ -0,0 +1,43 @@
+import statistics
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.startup import measure_startup
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures web-process startup (django.setup() + URLconf) in fresh interpreters: import "
+        "time, peak RSS, and whether torch/DGL/SentenceTransformers got imported. Fails on regressions."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeats', type=int, default=3, help="Fresh processes measured (median reported).")
+        parser.add_argument('--max-seconds', type=float, default=None, help="Fail above this median import time.")
+        parser.add_argument('--max-rss-mb', type=float, default=None, help="Fail above this median peak RSS.")
+        parser.add_argument('--allow-heavy', action='store_true', help="Do not fail when heavy ML modules load.")
+        parser.add_argument('--top', type=int, default=0, help="Print the N slowest imports (-X importtime).")
+
+    def handle(self, *args, **options):
+        reports = [measure_startup() for _ in range(options['repeats'])]
+        seconds = statistics.median(report['seconds'] for report in reports)
+        rss = statistics.median(report['max_rss_mb'] for report in reports)
+        self.stdout.write(
+            f"startup_seconds={seconds:.2f} max_rss_mb={rss:.1f} modules={reports[-1]['modules']} "
+            f"heavy_modules={','.join(reports[-1]['heavy_modules']) or 'none'}"
+        )
+
+        if options['top']:
+            for cumulative_us, name in measure_startup(importtime=True)['imports'][:options['top']]:
+                self.stdout.write(f"  {cumulative_us / 1000:8.1f} ms  {name}")
+
+        failures = []
+        if reports[-1]['heavy_modules'] and not options['allow_heavy']:
+            failures.append(f"web startup imported {', '.join(reports[-1]['heavy_modules'])}")
+        if options['max_seconds'] is not None and seconds > options['max_seconds']:
+            failures.append(f"startup took {seconds:.2f}s (max {options['max_seconds']}s)")
+        if options['max_rss_mb'] is not None and rss > options['max_rss_mb']:
+            failures.append(f"peak RSS {rss:.1f} MB (max {options['max_rss_mb']} MB)")
+        if failures:
+            raise CommandError("Startup regression: " + "; ".join(failures))
+        self.stdout.write(self.style.SUCCESS("Startup within budget."))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from core.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = "Recomputes the dashboard rollup counters from the risk and compliance tables."
+
+    def handle(self, *args, **options):
+        counters = rebuild_rollups()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {counters} dashboard rollup counters."))
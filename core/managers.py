@@ -0,0 +1,151 @@
+# core/managers.py
+from django.contrib.postgres.search import (
+    SearchQuery, SearchRank, SearchVector, SearchVectorField, TrigramWordSimilarity,
+)
+from django.db import models
+from django.db.models import F, Q
+from django.db.models.functions import Upper
+from django.utils import timezone
+
+# Text search configuration of the generated `search_vector` columns (see search_vector_field)
+SEARCH_CONFIG = 'english'
+
+
+class GraphSyncQuerySet(models.QuerySet):
+    """
+    QuerySet for models mirrored in Neo4j (see risk.graph_sync.GRAPH_SYNC_SPECS).
+
+    `bulk_create` and `update` skip the post_save signals, so they hand the
+    written rows to `risk.graph_sync` themselves: one queued change per row,
+    flushed to Neo4j in UNWIND batches, plus one embedding job. `bulk_update`
+    needs no hook of its own: Django runs it as `filter(pk__in=...).update()`
+    per batch, which syncs through `update`.
+
+    Both also maintain `auto_now` fields (`updated_at`), which Django leaves
+    alone on `update()` and conflict merges, so `graph_reconcile --since`
+    sees these rows.
+    """
+
+    def _auto_now_fields(self) -> list:
+        return [field.name for field in self.model._meta.concrete_fields if getattr(field, 'auto_now', False)]
+
+    def bulk_create(self, objs, *args, **kwargs):
+        from risk.graph_sync import sync_graph, sync_graph_pks
+        if kwargs.get('update_conflicts') and kwargs.get('update_fields'):
+            update_fields = list(kwargs['update_fields'])
+            kwargs['update_fields'] = update_fields + [
+                name for name in self._auto_now_fields() if name not in update_fields
+            ]
+        created = super().bulk_create(objs, *args, **kwargs)
+        if kwargs.get('update_conflicts'):
+            # Merged rows keep their stored pk, not the one generated on the instance: find them by key
+            sync_graph_pks(self.model, self._conflict_pks(created, kwargs['unique_fields']))
+        elif kwargs.get('ignore_conflicts'):
+            # Skipped instances keep a pk that was never stored, so only the inserted rows are found
+            sync_graph_pks(self.model, [obj.pk for obj in created if obj.pk is not None])
+        else:
+            sync_graph(created)
+        return created
+
+    def _conflict_pks(self, objs, unique_fields) -> list:
+        """Stored pks of the rows matching each instance's `unique_fields` values."""
+        from risk.graph_sync import GraphSyncQueue, _chunks
+        opts = self.model._meta
+        attnames = [opts.pk.attname if name == 'pk' else opts.get_field(name).attname for name in unique_fields]
+        pks = []
+        for chunk in _chunks(objs, GraphSyncQueue.FLUSH_BATCH_SIZE):
+            condition = Q()
+            for obj in chunk:
+                condition |= Q(**{attname: getattr(obj, attname) for attname in attnames})
+            pks.extend(self.model._base_manager.filter(condition).values_list('pk', flat=True))
+        return pks
+
+    def update(self, **kwargs):
+        from risk.graph_sync import sync_graph_pks
+        # The matching rows may no longer match the filter once updated
+        pks = list(self.values_list('pk', flat=True))
+        now = timezone.now()
+        for name in self._auto_now_fields():
+            kwargs.setdefault(name, now)
+        updated = super().update(**kwargs)
+        sync_graph_pks(self.model, pks)
+        return updated
+
+    def sync_graph(self) -> int:
+        """Queues every row of this QuerySet for Neo4j (e.g. after a raw SQL import)."""
+        from risk.graph_sync import sync_graph
+        return sync_graph(self)
+
+
+GraphSyncManager = models.Manager.from_queryset(GraphSyncQuerySet)
+
+
+def search_vector_field(*fields: str) -> models.GeneratedField:
+    """
+    Stored tsvector of `fields`, weighted A, B, C, D in the order given
+    (GENERATED ALWAYS AS (setweight(to_tsvector('english', coalesce(title, '')), 'A') || ...) STORED).
+    Pair it with a GinIndex and a SearchQuerySet manager.
+    """
+    vectors = [SearchVector(field, weight=weight, config=SEARCH_CONFIG) for field, weight in zip(fields, 'ABCD')]
+    expression = vectors[0]
+    for vector in vectors[1:]:
+        expression = expression + vector
+    return models.GeneratedField(expression=expression, output_field=SearchVectorField(), db_persist=True)
+
+
+class SearchQuerySet(models.QuerySet):
+    """
+    Index-backed lookups for registers with a generated `search_vector`
+    column (weighted tsvector, GIN-indexed) and, optionally, `TRIGRAM_FIELDS`
+    (codes and titles with a gin_trgm_ops index on UPPER(field)).
+
+    Every method compiles to an indexed predicate, so searching stays off
+    sequential scans however large the table grows.
+    """
+
+    def _query(self, term: str) -> SearchQuery:
+        return SearchQuery(term, search_type='websearch', config=SEARCH_CONFIG)
+
+    def search(self, term: str):
+        """Rows matching `term` by full text, or containing it in one of TRIGRAM_FIELDS (case-insensitive)."""
+        condition = Q(search_vector=self._query(term))
+        for field in getattr(self.model, 'TRIGRAM_FIELDS', ()):
+            # UPPER(field) LIKE UPPER('%term%'): served by the trigram index
+            condition |= Q(**{f'{field}__icontains': term})
+        return self.filter(condition)
+
+    def ranked(self, term: str):
+        """Full-text matches best first, with their rank in [0, 1) annotated as `rank`."""
+        query = self._query(term)
+        return (
+            self.filter(search_vector=query)
+            # normalization=32 maps the rank to rank / (rank + 1)
+            .annotate(rank=SearchRank(F('search_vector'), query, normalization=32))
+            .order_by('-rank')
+        )
+
+    def similar(self, field: str, term: str):
+        """
+        Typo-tolerant match on one of TRIGRAM_FIELDS (e.g. 'ISO27001-A.9' for 'ISO 27001 A9'),
+        best first, with the word similarity annotated as `similarity`. The cut-off is
+        Postgres' pg_trgm.word_similarity_threshold.
+        """
+        if field not in getattr(self.model, 'TRIGRAM_FIELDS', ()):
+            raise ValueError(f"{self.model.__name__}.{field} has no trigram index.")
+        term = term.upper()
+        return (
+            self.annotate(_upper=Upper(field))
+            .filter(_upper__trigram_word_similar=term)
+            .annotate(similarity=TrigramWordSimilarity(term, '_upper'))
+            .order_by('-similarity')
+        )
+
+
+SearchManager = models.Manager.from_queryset(SearchQuerySet)
+
+
+class GraphSyncSearchQuerySet(GraphSyncQuerySet, SearchQuerySet):
+    """Registers that are both mirrored in Neo4j and searched."""
+
+
+GraphSyncSearchManager = models.Manager.from_queryset(GraphSyncSearchQuerySet)
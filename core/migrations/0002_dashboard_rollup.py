@@ -0,0 +1,30 @@
+# Generated by Django 5.2.7 on 2026-10-17 08:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DashboardRollup",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                ("dimension", models.CharField(max_length=50)),
+                ("key", models.CharField(max_length=255)),
+                ("count", models.IntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("dimension", "key"), name="core_rollup_dimension_key_uniq"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,15 @@
+# Generated by Django 5.2.7 on 2026-10-17 16:10
+
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0002_dashboard_rollup"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+    ]
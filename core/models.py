@@ -43,4 +43,27 @@ class UserRole(models.Model):
         unique_together = ('user', 'role') # Unique constraint on user_id, role
         
     def __str__(self):
-        return f"{self.user.username} - {self.role}"
\ No newline at end of file
+        return f"{self.user.username} - {self.role}"
+
+class DashboardRollup(models.Model):
+    """
+    Pre-aggregated dashboard counter: one row per (dimension, key), e.g.
+    ('risk_cell', '4x5') or ('checklist_framework_status', 'ISO 27001|completed').
+
+    Maintained incrementally by the save/delete signals (core.rollups) and
+    rebuilt periodically from the source tables to absorb bulk writes.
+    """
+    id = models.BigAutoField(primary_key=True)
+    dimension = models.CharField(max_length=50)
+    key = models.CharField(max_length=255)
+    count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            # Also the index every dashboard read and upsert goes through
+            models.UniqueConstraint(fields=['dimension', 'key'], name='core_rollup_dimension_key_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.dimension}[{self.key}] = {self.count}"
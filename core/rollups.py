@@ -0,0 +1,137 @@
+# core/rollups.py
+import logging
+from collections import Counter
+from typing import Callable, Dict, NamedTuple, Optional, Tuple
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Count
+
+from .models import DashboardRollup
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_CACHE_KEY = 'grc:dashboard-rollups'
+ROLLUP_CACHE_TTL = getattr(settings, 'DASHBOARD_ROLLUP_CACHE_TTL', 300)
+
+
+class RollupSpec(NamedTuple):
+    """Which counters one row of a source table contributes to."""
+    fields: Tuple[str, ...]         # values() read from the table (joins allowed)
+    keys: Callable                  # row dict -> list of (dimension, key)
+
+
+def _risk_keys(row):
+    return [
+        ('risk_cell', f"{row['likelihood']}x{row['impact']}"),
+        ('risk_category', row['category']),
+        ('risk_department', row['owner__department'] or 'Unassigned'),
+        ('risk_status', row['status']),
+    ]
+
+
+# Keyed by Django model label
+ROLLUP_SPECS: Dict[str, RollupSpec] = {
+    'risk.Risk': RollupSpec(('likelihood', 'impact', 'category', 'owner__department', 'status'), _risk_keys),
+    'compliance.ComplianceChecklist': RollupSpec(
+        ('framework', 'status'),
+        lambda row: [('checklist_framework_status', f"{row['framework']}|{row['status']}")],
+    ),
+    'compliance.ComplianceRequirement': RollupSpec(
+        ('source', 'status'),
+        lambda row: [
+            ('requirement_status', row['status']),
+            ('requirement_source_status', f"{row['source']}|{row['status']}"),
+        ],
+    ),
+}
+
+UPSERT_SQL = """
+INSERT INTO core_dashboardrollup (dimension, key, count, updated_at)
+VALUES {values}
+ON CONFLICT (dimension, key) DO UPDATE
+SET count = core_dashboardrollup.count + EXCLUDED.count, updated_at = EXCLUDED.updated_at
+"""
+
+
+# --- Incremental maintenance (called by the save/delete signals) ---
+
+def read_row(instance) -> Optional[dict]:
+    """The instance's row as currently stored, restricted to its rollup fields."""
+    spec = ROLLUP_SPECS[instance._meta.label]
+    return type(instance)._base_manager.filter(pk=instance.pk).values(*spec.fields).first()
+
+
+def apply_change(model, old_row: Optional[dict], new_row: Optional[dict]):
+    """
+    Moves one row's contribution from `old_row`'s counters to `new_row`'s
+    (either may be None for creates and deletes) in a single upsert, inside the
+    caller's transaction so the counters commit or roll back with the row.
+    """
+    spec = ROLLUP_SPECS[model._meta.label]
+    deltas = Counter()
+    if old_row is not None:
+        deltas.subtract(spec.keys(old_row))
+    if new_row is not None:
+        deltas.update(spec.keys(new_row))
+    # Sorted, so concurrent writers lock counter rows in the same order (no deadlocks)
+    deltas = sorted((key, delta) for key, delta in deltas.items() if delta)
+    if not deltas:
+        return
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            UPSERT_SQL.format(values=', '.join(['(%s, %s, %s, NOW())'] * len(deltas))),
+            [param for (dimension, key), delta in deltas for param in (dimension, key, delta)],
+        )
+    transaction.on_commit(lambda: cache.delete(ROLLUP_CACHE_KEY))
+
+
+# --- Full rebuild (periodic job) ---
+
+def rebuild_rollups() -> int:
+    """
+    Recomputes every counter with one GROUP BY per source table and swaps the
+    table contents atomically. Absorbs writes that bypass the signals
+    (bulk_create, QuerySet.update, raw SQL).
+
+    Returns:
+        Number of counters written.
+    """
+    with transaction.atomic():
+        # Blocks the incremental path (but not readers) until the new counters commit, so
+        # no delta lands between the GROUP BY and the swap
+        with connection.cursor() as cursor:
+            cursor.execute("LOCK TABLE core_dashboardrollup IN EXCLUSIVE MODE")
+
+        totals = Counter()
+        for model_label, spec in ROLLUP_SPECS.items():
+            model = apps.get_model(model_label)
+            for row in model._base_manager.values(*spec.fields).annotate(_rows=Count('pk')).order_by():
+                for counter_key in spec.keys(row):
+                    totals[counter_key] += row['_rows']
+
+        DashboardRollup.objects.all().delete()
+        DashboardRollup.objects.bulk_create([
+            DashboardRollup(dimension=dimension, key=key, count=count)
+            for (dimension, key), count in totals.items() if count
+        ])
+        transaction.on_commit(lambda: cache.delete(ROLLUP_CACHE_KEY))
+    logger.info(f"Rebuilt {len(totals)} dashboard rollup counters.")
+    return len(totals)
+
+
+# --- Read path ---
+
+def get_rollups() -> Dict[str, Dict[str, int]]:
+    """All counters as {dimension: {key: count}}; a cache hit, else one indexed read."""
+    rollups = cache.get(ROLLUP_CACHE_KEY)
+    if rollups is None:
+        rollups = {}
+        for dimension, key, count in DashboardRollup.objects.filter(count__gt=0) \
+                .order_by('dimension', 'key').values_list('dimension', 'key', 'count'):
+            rollups.setdefault(dimension, {})[key] = count
+        cache.set(ROLLUP_CACHE_KEY, rollups, ROLLUP_CACHE_TTL)
+    return rollups
@@ -0,0 +1,142 @@
+# core/search.py
+import logging
+import time
+from functools import lru_cache
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+from django.apps import apps
+from django.conf import settings
+
+from risk.embedding_cache import EmbeddingCache
+from risk.nlp_service import NLPEmbeddingService
+from risk.vector_index import INDEXED_LABELS, VectorIndexRegistry
+
+logger = logging.getLogger(__name__)
+
+SEMANTIC_WEIGHT = getattr(settings, 'SEARCH_SEMANTIC_WEIGHT', 0.7) # Hybrid score = w * cosine + (1 - w) * text rank
+SEARCH_CANDIDATES = getattr(settings, 'SEARCH_CANDIDATES', 50)     # Hits fetched from each source before merging
+SEARCH_MAX_RESULTS = getattr(settings, 'SEARCH_MAX_RESULTS', 50)
+QUERY_CACHE_SIZE = getattr(settings, 'SEARCH_QUERY_CACHE_SIZE', 1024) # Query embeddings kept per process
+
+
+class SearchTarget(NamedTuple):
+    """How one embedded entity type is searched and displayed."""
+    model: str                      # Django model label (with a SearchQuerySet manager)
+    fields: Tuple[str, ...]         # values() returned with each hit
+
+
+# Keyed by Neo4j label (the VectorIndexRegistry index names)
+SEARCH_TARGETS: Dict[str, SearchTarget] = {
+    'Policy': SearchTarget('governance.Policy', ('title', 'category', 'status')),
+    'Risk': SearchTarget('risk.Risk', ('title', 'category', 'status')),
+    'Control': SearchTarget('governance.Control', ('control_code', 'title', 'status')),
+    'ComplianceRequirement': SearchTarget('compliance.ComplianceRequirement', ('requirement_code', 'title', 'source')),
+}
+
+
+@lru_cache(maxsize=QUERY_CACHE_SIZE)
+def _query_embedding(normalized_query: str) -> np.ndarray:
+    vector = NLPEmbeddingService.get_embeddings([normalized_query])[0]
+    vector.flags.writeable = False # Shared by every caller of the cached entry
+    return vector
+
+
+def embed_query(query: str) -> np.ndarray:
+    """
+    The query's normalized embedding. Repeated queries skip the model through a
+    bounded in-process LRU; unlike entity texts they are not persisted to the
+    EmbeddingCache table (which would grow with every distinct query).
+    """
+    return _query_embedding(EmbeddingCache.normalize_text(query))
+
+
+def text_search(label: str, query: str, limit: int = SEARCH_CANDIDATES) -> Dict[str, float]:
+    """
+    Postgres full-text matches of one entity type (GIN index on its generated
+    `search_vector`, see core.managers.SearchQuerySet).
+
+    Returns:
+        {uid: rank} for the best `limit` matches; ranks are in [0, 1).
+    """
+    model = apps.get_model(SEARCH_TARGETS[label].model)
+    rows = model.objects.ranked(query).values_list('pk', 'rank')[:limit]
+    return {str(pk): rank for pk, rank in rows}
+
+
+def hybrid_search(query: str, k: int = 10, labels: Optional[Iterable[str]] = None,
+                  semantic_weight: float = SEMANTIC_WEIGHT) -> dict:
+    """
+    Searches Policies, Risks, Controls and ComplianceRequirements at once.
+
+    The query is embedded once and matched against the in-process vector
+    indexes of all labels; Postgres full-text matches are merged in, each hit
+    scoring `semantic_weight * cosine + (1 - semantic_weight) * text rank`.
+
+    Returns:
+        {'results': [{'type', 'id', 'score', 'semantic_score', 'text_score', ...fields}],
+         'timings_ms': {'embed', 'vector', 'text', 'hydrate'}}
+    """
+    labels = list(labels or SEARCH_TARGETS)
+    k = min(k, SEARCH_MAX_RESULTS)
+    candidates = max(k, SEARCH_CANDIDATES)
+    timings = {}
+
+    # 1. Embed the query (cached) and search every label's vector index
+    started = time.perf_counter()
+    vector = embed_query(query)
+    timings['embed'] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    semantic = {
+        (label, uid): max(score, 0.0) for label, uid, score in VectorIndexRegistry.search(vector, labels, candidates)
+    }
+    timings['vector'] = time.perf_counter() - started
+
+    # 2. Full-text matches per label
+    started = time.perf_counter()
+    lexical = {}
+    for label in labels:
+        lexical.update(((label, uid), rank) for uid, rank in text_search(label, query, candidates).items())
+    timings['text'] = time.perf_counter() - started
+
+    # 3. Hybrid score; a hit missing from one source scores 0 there
+    scored = sorted(
+        (
+            (semantic_weight * semantic.get(key, 0.0) + (1 - semantic_weight) * lexical.get(key, 0.0), key)
+            for key in semantic.keys() | lexical.keys()
+        ),
+        reverse=True,
+    )[:k]
+
+    # 4. One query per label for the display fields (deleted rows are dropped)
+    started = time.perf_counter()
+    rows = {}
+    for label in {label for _, (label, _) in scored}:
+        target = SEARCH_TARGETS[label]
+        uids = [uid for _, (hit_label, uid) in scored if hit_label == label]
+        for row in apps.get_model(target.model).objects.filter(pk__in=uids).values('pk', *target.fields):
+            rows[(label, str(row.pop('pk')))] = row
+    timings['hydrate'] = time.perf_counter() - started
+
+    results = [
+        {
+            'type': label, 'id': uid, 'score': round(score, 4),
+            'semantic_score': round(semantic.get((label, uid), 0.0), 4),
+            'text_score': round(lexical.get((label, uid), 0.0), 4),
+            **rows[(label, uid)],
+        }
+        for score, (label, uid) in scored if (label, uid) in rows
+    ]
+    return {'results': results, 'timings_ms': {stage: round(seconds * 1000, 2) for stage, seconds in timings.items()}}
+
+
+def resolve_labels(types: Iterable[str]) -> List[str]:
+    """Neo4j labels for entity type names ('policy', 'risk', 'control', 'requirement'); raises ValueError."""
+    labels = []
+    for entity_type in types:
+        label = INDEXED_LABELS.get(entity_type)
+        if label not in SEARCH_TARGETS:
+            raise ValueError(f"Unknown type {entity_type!r}; expected one of {sorted(INDEXED_LABELS)}.")
+        labels.append(label)
+    return labels
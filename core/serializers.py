@@ -0,0 +1,19 @@
+# core/serializers.py
+from rest_framework import serializers
+from .models import Profile
+
+
+class ProfileSummarySerializer(serializers.ModelSerializer):
+    """Owner/champion/approver summary nested in register rows (select_related, no extra queries)."""
+    id = serializers.IntegerField(source='pk', read_only=True)
+
+    class Meta:
+        model = Profile
+        fields = ['id', 'full_name']
+
+    # Field projection for `.only()` on the relation that uses this serializer
+    ONLY_FIELDS = ('user', 'full_name')
+
+    @classmethod
+    def only(cls, relation: str):
+        return [f"{relation}__{field}" for field in cls.ONLY_FIELDS]
@@ -0,0 +1,34 @@
+# core/signals.py
+from django.apps import apps
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete
+
+from .rollups import ROLLUP_SPECS, read_row, apply_change
+
+# Dashboard rollups (core.rollups): each save/delete of a source row moves its
+# contribution between counters. pre_* reads the stored row before it changes.
+
+
+def capture_rollup_row(sender, instance, raw=False, **kwargs):
+    if raw:
+        return # loaddata: the periodic rebuild picks fixtures up
+    instance._rollup_old_row = None if instance._state.adding else read_row(instance)
+
+
+def update_rollups_on_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    apply_change(sender, getattr(instance, '_rollup_old_row', None), read_row(instance))
+
+
+def update_rollups_on_delete(sender, instance, **kwargs):
+    apply_change(sender, getattr(instance, '_rollup_old_row', None), None)
+
+
+def connect_rollup_signals():
+    for model_label in ROLLUP_SPECS:
+        model = apps.get_model(model_label)
+        uid = f"dashboard-rollup:{model_label}"
+        pre_save.connect(capture_rollup_row, sender=model, dispatch_uid=uid)
+        post_save.connect(update_rollups_on_save, sender=model, dispatch_uid=uid)
+        pre_delete.connect(capture_rollup_row, sender=model, dispatch_uid=uid)
+        post_delete.connect(update_rollups_on_delete, sender=model, dispatch_uid=uid)
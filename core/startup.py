@@ -0,0 +1,56 @@
+# core/startup.py
+import json
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+
+# Runs in a fresh interpreter: what a gunicorn worker does before serving its first request
+PROBE_SCRIPT = """
+import json, resource, sys, time
+started = time.perf_counter()
+import django
+django.setup()
+from django.urls import get_resolver
+get_resolver().url_patterns  # imports every view module (and the task modules they use)
+elapsed = time.perf_counter() - started
+from core.lazy import loaded_heavy_modules
+print(json.dumps({
+    'seconds': elapsed,
+    'max_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    'modules': len(sys.modules),
+    'heavy_modules': loaded_heavy_modules(),
+}))
+"""
+
+
+def measure_startup(importtime: bool = False) -> dict:
+    """
+    Starts a fresh Python process that sets Django up and loads the URLconf,
+    and returns its import time, peak RSS and the heavy ML modules it loaded.
+
+    Args:
+        importtime: Also return the `-X importtime` report as (cumulative_us, module) pairs.
+    """
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE=os.environ.get('DJANGO_SETTINGS_MODULE', 'grc_pfa.settings'))
+    command = [sys.executable] + (['-X', 'importtime'] if importtime else []) + ['-c', PROBE_SCRIPT]
+    completed = subprocess.run(
+        command, cwd=settings.BASE_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+    report = json.loads(completed.stdout.strip().splitlines()[-1])
+    if importtime:
+        report['imports'] = _parse_importtime(completed.stderr)
+    return report
+
+
+def _parse_importtime(stderr: str) -> list:
+    # Lines look like "import time:      1234 |       5678 | package.module"
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        imports.append((int(cumulative), name.strip()))
+    return sorted(imports, reverse=True)
+
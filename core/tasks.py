@@ -0,0 +1,8 @@
+from celery import shared_task
+
+
+@shared_task
+def rebuild_dashboard_rollups():
+    """Periodic full rebuild of the dashboard counters (see CELERY_BEAT_SCHEDULE)."""
+    from core.rollups import rebuild_rollups
+    return rebuild_rollups()
@@ -1,3 +1,116 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from core.startup import measure_startup
+
+
+class WebStartupTests(SimpleTestCase):
+    """Web processes must not pay for the ML stack until inference runs in them."""
+
+    def test_startup_does_not_import_ml_stack(self):
+        report = measure_startup()
+        self.assertEqual(report['heavy_modules'], [])
+
+
+class SearchAPIValidationTests(SimpleTestCase):
+    """Bad search requests are rejected before any embedding or database work."""
+
+    def test_query_is_required(self):
+        response = self.client.get('/api/search/')
+        self.assertEqual(response.status_code, 400)
+
+    def test_unknown_type_is_rejected(self):
+        response = self.client.get('/api/search/', {'q': 'remote access', 'type': 'objective'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_k_is_bounded(self):
+        response = self.client.get('/api/search/', {'q': 'remote access', 'k': 0})
+        self.assertEqual(response.status_code, 400)
+
+
+class QueryEmbeddingCacheTests(SimpleTestCase):
+    """Query embeddings are memoized in-process only (SimpleTestCase fails on any database query)."""
+
+    def test_repeated_query_skips_model(self):
+        from core.search import _query_embedding, embed_query
+        _query_embedding.cache_clear()
+        self.addCleanup(_query_embedding.cache_clear)
+        with mock.patch('core.search.NLPEmbeddingService.get_embeddings',
+                        return_value=np.ones((1, 4), dtype=np.float32)) as get_embeddings:
+            first = embed_query("Remote access")
+            second = embed_query("Remote access")
+        self.assertIs(first, second)
+        get_embeddings.assert_called_once()
+
+
+class SearchQuerySetTests(SimpleTestCase):
+    """Fuzzy lookups are limited to the trigram-indexed columns."""
+
+    def test_similar_rejects_unindexed_field(self):
+        from governance.models import Control
+        with self.assertRaises(ValueError):
+            Control.objects.similar('description', 'access control')
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class GraphSyncQuerySetTests(TestCase):
+    """Bulk writes queue exactly one graph change per row they actually wrote."""
+
+    def setUp(self):
+        from compliance.models import ComplianceRequirement
+        self.Requirement = ComplianceRequirement
+        ComplianceRequirement.objects.bulk_create([
+            ComplianceRequirement(requirement_code=f"REQ-{i}", title=f"Requirement {i}", source="PenCom", category="Ops")
+            for i in range(3)
+        ])
+
+    def changes(self):
+        from risk.models import GraphChange
+        return list(GraphChange.objects.order_by('id').values_list('uid', flat=True))
+
+    def test_bulk_update_syncs_each_row_once(self):
+        before = len(self.changes())
+        requirements = list(self.Requirement.objects.all())
+        for requirement in requirements:
+            requirement.category = "Risk"
+        self.Requirement.objects.bulk_update(requirements, ['category'])
+        self.assertEqual(len(self.changes()) - before, len(requirements))
+
+    def test_update_conflicts_syncs_stored_rows(self):
+        stored = dict(self.Requirement.objects.values_list('requirement_code', 'pk'))
+        before = len(self.changes())
+        self.Requirement.objects.bulk_create(
+            [
+                self.Requirement(requirement_code="REQ-0", title="Renamed", source="PenCom", category="Ops"),
+                self.Requirement(requirement_code="REQ-9", title="New", source="PenCom", category="Ops"),
+            ],
+            update_conflicts=True, unique_fields=['requirement_code'], update_fields=['title'],
+        )
+        new_pk = self.Requirement.objects.get(requirement_code="REQ-9").pk
+        self.assertCountEqual(self.changes()[before:], [str(stored["REQ-0"]), str(new_pk)])
+
+    def test_bulk_writes_touch_updated_at(self):
+        before = self.Requirement.objects.get(requirement_code="REQ-0").updated_at
+        self.Requirement.objects.filter(requirement_code="REQ-0").update(category="Risk")
+        updated = self.Requirement.objects.get(requirement_code="REQ-0").updated_at
+        self.assertGreater(updated, before)
+
+        self.Requirement.objects.bulk_create(
+            [self.Requirement(requirement_code="REQ-0", title="Renamed", source="PenCom", category="Ops")],
+            update_conflicts=True, unique_fields=['requirement_code'], update_fields=['title'],
+        )
+        self.assertGreater(self.Requirement.objects.get(requirement_code="REQ-0").updated_at, updated)
+
+    def test_ignore_conflicts_syncs_inserted_rows(self):
+        before = len(self.changes())
+        self.Requirement.objects.bulk_create(
+            [
+                self.Requirement(requirement_code="REQ-0", title="Duplicate", source="PenCom", category="Ops"),
+                self.Requirement(requirement_code="REQ-9", title="New", source="PenCom", category="Ops"),
+            ],
+            ignore_conflicts=True,
+        )
+        new_pk = self.Requirement.objects.get(requirement_code="REQ-9").pk
+        self.assertEqual(self.changes()[before:], [str(new_pk)])
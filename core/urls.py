@@ -0,0 +1,7 @@
+from django.urls import path
+from .views import DashboardRollupAPI
+
+urlpatterns = [
+    # Matches /api/dashboard/rollups/ (optionally ?dimension=risk_cell&dimension=risk_status)
+    path('rollups/', DashboardRollupAPI.as_view(), name='dashboard-rollups'),
+]
@@ -1,3 +1,46 @@
-from django.shortcuts import render
+import time
 
-# Create your views here.
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from .rollups import get_rollups
+from .search import SEARCH_MAX_RESULTS, hybrid_search, resolve_labels
+
+
+class DashboardRollupAPI(APIView):
+    """
+    Dashboard counters (risk heat-map cells, risks by category/department/status,
+    compliance status by framework) from the pre-aggregated rollup table.
+    Served from the cache, or one indexed read of the rollup table.
+    """
+    def get(self, request, *args, **kwargs):
+        rollups = get_rollups()
+        dimensions = request.query_params.getlist('dimension')
+        if dimensions:
+            rollups = {dimension: rollups.get(dimension, {}) for dimension in dimensions}
+        return Response(rollups)
+
+
+class SearchAPI(APIView):
+    """
+    Hybrid semantic + full-text search across Policies, Risks, Controls and
+    ComplianceRequirements (core.search.hybrid_search).
+
+    Query params: q (required), k (default 10), type (repeatable or comma-separated:
+    policy, risk, control, requirement; default all).
+    """
+    def get(self, request, *args, **kwargs):
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return Response({"error": "The q parameter is required."}, status=400)
+        types = [t for value in request.query_params.getlist('type') for t in value.split(',') if t]
+        try:
+            k = int(request.query_params.get('k', 10))
+            labels = resolve_labels(types) if types else None
+        except ValueError as exc:
+            return Response({"error": str(exc)}, status=400)
+        if not 1 <= k <= SEARCH_MAX_RESULTS:
+            return Response({"error": f"k must be between 1 and {SEARCH_MAX_RESULTS}."}, status=400)
+
+        started = time.perf_counter()
+        payload = hybrid_search(query, k=k, labels=labels)
+        return Response({'query': query, 'took_ms': round((time.perf_counter() - started) * 1000, 2), **payload})
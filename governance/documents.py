@@ -0,0 +1,305 @@
+# governance/documents.py
+
+import hashlib
+import heapq
+import logging
+import multiprocessing
+import os
+import pickle
+import tempfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import unquote, urlparse
+
+import numpy as np
+from django.conf import settings
+from django.db import connections, transaction
+
+from .models import Policy, PolicyDocument, PolicyDocumentChunk
+
+logger = logging.getLogger(__name__)
+
+DOCUMENT_ROOT = str(getattr(settings, 'POLICY_DOCUMENT_ROOT', os.path.join(settings.BASE_DIR, 'var', 'documents')))
+CHUNK_TOKENS = getattr(settings, 'DOCUMENT_CHUNK_TOKENS', 256)          # Tokens per window (capped by the model)
+CHUNK_OVERLAP = getattr(settings, 'DOCUMENT_CHUNK_OVERLAP', 32)         # Tokens shared by consecutive windows
+EMBED_BATCH_SIZE = getattr(settings, 'DOCUMENT_EMBED_BATCH_SIZE', 32)   # Windows encoded per forward pass
+READ_BLOCK_SIZE = 64 * 1024                                              # Characters read per text-file block
+
+
+class DocumentError(Exception):
+    """The document cannot be read (missing, outside DOCUMENT_ROOT, unsupported format)."""
+
+
+# --- Reading ---
+
+def resolve_document_path(document_url: str) -> str:
+    """
+    Local path of a `Policy.document_url` (a path relative to DOCUMENT_ROOT,
+    or a file:// URL / absolute path inside it). Remote URLs are not fetched.
+    """
+    parsed = urlparse(document_url)
+    if parsed.scheme not in ('', 'file'):
+        raise DocumentError(f"Only local documents are embedded, not {parsed.scheme}:// URLs.")
+    path = unquote(parsed.path) if parsed.scheme == 'file' else document_url
+    root = os.path.realpath(DOCUMENT_ROOT)
+    path = os.path.realpath(os.path.join(root, path))
+    if os.path.commonpath([root, path]) != root:
+        raise DocumentError(f"{document_url} is outside POLICY_DOCUMENT_ROOT.")
+    if not os.path.isfile(path):
+        raise DocumentError(f"{document_url} does not exist.")
+    return path
+
+
+def file_hash(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def iter_text(path: str) -> Iterator[Tuple[Optional[int], str]]:
+    """
+    Streams (page number, text) pieces: one page at a time for PDFs (needs
+    `pypdf`), READ_BLOCK_SIZE blocks cut at whitespace for text files.
+    """
+    if path.lower().endswith('.pdf'):
+        try:
+            from pypdf import PdfReader
+        except ImportError:
+            raise DocumentError("PDF documents require the 'pypdf' package.")
+        # Pages are parsed on access, so only the current page's text is held
+        for number, page in enumerate(PdfReader(path).pages, start=1):
+            yield number, page.extract_text() or ''
+        return
+
+    carry = ''
+    with open(path, encoding='utf-8', errors='replace') as f:
+        for block in iter(lambda: f.read(READ_BLOCK_SIZE), ''):
+            block = carry + block
+            # Don't split a word across two tokenizer calls
+            cut = max(block.rfind(' '), block.rfind('\n'))
+            if cut <= 0:
+                carry = block if len(block) < 4 * READ_BLOCK_SIZE else ''
+                if not carry:
+                    yield None, block
+                continue
+            carry = block[cut:]
+            yield None, block[:cut]
+    if carry:
+        yield None, carry
+
+
+# --- Chunking ---
+
+def iter_windows(pieces: Iterable[Tuple[Optional[int], str]], tokenizer, window: int,
+                 overlap: int = CHUNK_OVERLAP) -> Iterator[dict]:
+    """
+    Splits streamed text into windows of `window` tokens, consecutive windows
+    sharing `overlap` tokens. Only the tokens of the current window (plus the
+    piece being tokenized) are held, so memory does not grow with the document.
+
+    Yields:
+        {'start_token', 'num_tokens', 'page', 'text'} per window; the text is the
+        original characters the window's tokens cover.
+
+    Raises:
+        ValueError: unless 0 < overlap < window.
+    """
+    if not 0 < overlap < window:
+        raise ValueError(f"Chunk overlap must be between 1 and {window - 1} tokens, not {overlap}.")
+    step = window - overlap
+    buffer = deque() # (piece number, char start, char end, page) per token
+    texts = {}       # piece number -> text, while a buffered token still points into it
+    consumed = 0     # Tokens dropped from the front of the buffer so far
+
+    def emit(count):
+        tokens = list(buffer)[:count]
+        parts, run_piece, run_start, run_end = [], tokens[0][0], tokens[0][1], tokens[0][2]
+        for piece, start, end, _ in tokens[1:]:
+            if piece != run_piece:
+                parts.append(texts[run_piece][run_start:run_end])
+                run_piece, run_start = piece, start
+            run_end = end
+        parts.append(texts[run_piece][run_start:run_end])
+        return {'start_token': consumed, 'num_tokens': count, 'page': tokens[0][3], 'text': '\n'.join(parts)}
+
+    emitted = False
+    for piece, (page, text) in enumerate(pieces):
+        encoding = tokenizer(text, add_special_tokens=False, return_offsets_mapping=True, verbose=False)
+        if not encoding['input_ids']:
+            continue
+        texts[piece] = text
+        buffer.extend((piece, start, end, page) for start, end in encoding['offset_mapping'])
+
+        while len(buffer) >= window:
+            yield emit(window)
+            emitted = True
+            for _ in range(step):
+                buffer.popleft()
+            consumed += step
+            for stale in [p for p in texts if p < buffer[0][0]]:
+                del texts[stale]
+
+    # The tail, unless it is only the overlap of the last window
+    if buffer and (not emitted or len(buffer) > overlap):
+        yield emit(len(buffer))
+
+
+# --- Embedding ---
+
+def embed_document(policy_id, force: bool = False) -> dict:
+    """
+    Embeds one policy's document: streams it into overlapping token windows,
+    encodes them EMBED_BATCH_SIZE at a time, stores every window as a
+    PolicyDocumentChunk and their token-weighted mean as the PolicyDocument
+    vector. Skipped when the file and model are unchanged since the last run.
+
+    Returns:
+        {'policy', 'status': 'embedded' | 'unchanged' | 'skipped', 'chunks', 'tokens'}
+    """
+    from risk.nlp_service import NLPEmbeddingService
+
+    policy = Policy.objects.only('id', 'document_url').get(pk=policy_id)
+    result = {'policy': str(policy_id), 'status': 'skipped', 'chunks': 0, 'tokens': 0}
+    if not policy.document_url:
+        return result
+    try:
+        path = resolve_document_path(policy.document_url)
+    except DocumentError as exc:
+        logger.warning(f"Policy {policy_id}: {exc}")
+        return {**result, 'error': str(exc)}
+
+    content_hash = file_hash(path)
+    model_id = NLPEmbeddingService.model_id()
+    if not force and PolicyDocument.objects.filter(
+            policy_id=policy.pk, content_hash=content_hash, model_name=model_id).exists():
+        return {**result, 'status': 'unchanged'}
+
+    backend = NLPEmbeddingService.initialize_model()
+    window = min(CHUNK_TOKENS, backend.max_seq_length - 2) # Room for [CLS] and [SEP]
+    pooled = np.zeros(backend.dimension, dtype=np.float64)
+    chunk_index = total_tokens = 0
+
+    with tempfile.TemporaryFile() as spool:
+        # 1. Encode outside any transaction, spooling the encoded batches to disk (memory stays bounded)
+        def encode_batch(batch: List[dict]):
+            nonlocal chunk_index, total_tokens
+            vectors = NLPEmbeddingService.get_embeddings([chunk['text'] for chunk in batch], batch_size=len(batch))
+            weights = np.array([chunk['num_tokens'] for chunk in batch], dtype=np.float64)
+            pooled[:] += weights @ vectors
+            pickle.dump((chunk_index, batch, vectors), spool)
+            chunk_index += len(batch)
+            total_tokens += int(weights.sum())
+
+        try:
+            batch = []
+            for chunk in iter_windows(iter_text(path), backend.tokenizer, window):
+                batch.append(chunk)
+                if len(batch) == EMBED_BATCH_SIZE:
+                    encode_batch(batch)
+                    batch = []
+            if batch:
+                encode_batch(batch)
+        except DocumentError as exc:
+            logger.warning(f"Policy {policy_id}: {exc}")
+            return {**result, 'error': str(exc)}
+
+        # 2. Swap the new chunk set in with one short transaction; readers see the old set until it commits
+        spool.seek(0)
+        with transaction.atomic():
+            PolicyDocumentChunk.objects.filter(policy_id=policy.pk).delete()
+            while True:
+                try:
+                    start, batch, vectors = pickle.load(spool)
+                except EOFError:
+                    break
+                PolicyDocumentChunk.objects.bulk_create([
+                    PolicyDocumentChunk(policy_id=policy.pk, chunk_index=start + i, vector=vector.tobytes(), **chunk)
+                    for i, (chunk, vector) in enumerate(zip(batch, vectors))
+                ])
+
+            norm = np.linalg.norm(pooled)
+            PolicyDocument.objects.update_or_create(policy_id=policy.pk, defaults={
+                'source': policy.document_url, 'content_hash': content_hash, 'model_name': model_id,
+                'vector': (pooled / norm if norm else pooled).astype(np.float32).tobytes(),
+                'num_chunks': chunk_index, 'num_tokens': total_tokens,
+            })
+
+    logger.info(f"Embedded document of policy {policy_id}: {chunk_index} chunks, {total_tokens} tokens.")
+    return {**result, 'status': 'embedded', 'chunks': chunk_index, 'tokens': total_tokens}
+
+
+def _init_worker(threads: int):
+    # Each worker loads its own model, with few threads so the workers don't oversubscribe the CPUs
+    from risk.embedding_backends import load_backend
+    from risk.nlp_service import NLPEmbeddingService
+    NLPEmbeddingService.MODEL = load_backend(model_name=NLPEmbeddingService.MODEL_NAME, threads=threads)
+
+
+def _embed_in_worker(args) -> dict:
+    policy_id, force = args
+    try:
+        return embed_document(policy_id, force=force)
+    except Exception as exc:
+        logger.error(f"Embedding the document of policy {policy_id} failed: {exc}")
+        return {'policy': str(policy_id), 'status': 'failed', 'error': str(exc), 'chunks': 0, 'tokens': 0}
+    finally:
+        connections.close_all()
+
+
+def embed_documents(policy_ids: Iterable, workers: int = None, threads_per_worker: int = 1,
+                    force: bool = False) -> List[dict]:
+    """Embeds many documents in parallel, one document per worker process at a time."""
+    policy_ids = list(policy_ids)
+    workers = min(workers or os.cpu_count() or 1, len(policy_ids)) or 1
+    # Children must not share the parent's database connections
+    connections.close_all()
+    context = multiprocessing.get_context('fork')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                             initializer=_init_worker, initargs=(threads_per_worker,)) as pool:
+        return list(pool.map(_embed_in_worker, [(policy_id, force) for policy_id in policy_ids], chunksize=1))
+
+
+# --- Passage retrieval ---
+
+def search_passages(query: str, top_k: int = 10, policy_ids: Iterable = None,
+                    block_size: int = 5000) -> List[Tuple[float, PolicyDocumentChunk]]:
+    """
+    Best-matching document passages for a query by cosine similarity,
+    scanning the chunk vectors block by block (bounded memory).
+
+    Returns:
+        [(score, chunk)] best first.
+    """
+    from risk.nlp_service import NLPEmbeddingService
+
+    query_vector = NLPEmbeddingService.get_embeddings([query])[0]
+    queryset = PolicyDocumentChunk.objects.order_by('pk')
+    if policy_ids is not None:
+        queryset = queryset.filter(policy_id__in=list(policy_ids))
+
+    best = [] # Min-heap of (score, chunk pk)
+    pks, vectors = [], []
+
+    def score_block():
+        scores = np.frombuffer(b''.join(vectors), dtype=np.float32).reshape(len(vectors), -1) @ query_vector
+        for score, pk in zip(scores.tolist(), pks):
+            if len(best) < top_k:
+                heapq.heappush(best, (score, pk))
+            elif score > best[0][0]:
+                heapq.heapreplace(best, (score, pk))
+        pks.clear()
+        vectors.clear()
+
+    for pk, vector in queryset.values_list('pk', 'vector').iterator(chunk_size=block_size):
+        pks.append(pk)
+        vectors.append(bytes(vector))
+        if len(pks) == block_size:
+            score_block()
+    if pks:
+        score_block()
+
+    chunks = PolicyDocumentChunk.objects.in_bulk([pk for _, pk in best])
+    return [(score, chunks[pk]) for score, pk in sorted(best, reverse=True)]
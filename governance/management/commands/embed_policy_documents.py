@@ -0,0 +1,44 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from governance.documents import embed_document, embed_documents
+from governance.models import Policy
+
+
+class Command(BaseCommand):
+    help = (
+        "Embeds full policy documents (Policy.document_url) as overlapping token windows plus a "
+        "pooled document vector. Documents are processed in parallel worker processes; "
+        "unchanged files are skipped unless --force is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--policy', action='append', default=[], help="Policy id (repeatable).")
+        parser.add_argument('--all', action='store_true', help="Every policy with a document_url.")
+        parser.add_argument('--workers', type=int, default=getattr(settings, 'DOCUMENT_EMBED_WORKERS', None),
+                            help="Worker processes (1 runs in this process).")
+        parser.add_argument('--threads', type=int, default=1, help="Intra-op threads per worker.")
+        parser.add_argument('--force', action='store_true', help="Re-embed unchanged documents too.")
+
+    def handle(self, *args, **options):
+        if options['all']:
+            policy_ids = list(
+                Policy.objects.exclude(document_url__isnull=True).exclude(document_url='')
+                .values_list('id', flat=True)
+            )
+        elif options['policy']:
+            policy_ids = options['policy']
+        else:
+            raise CommandError("Pass --policy <id> or --all.")
+
+        if options['workers'] == 1 or len(policy_ids) == 1:
+            results = [embed_document(policy_id, force=options['force']) for policy_id in policy_ids]
+        else:
+            results = embed_documents(policy_ids, workers=options['workers'],
+                                      threads_per_worker=options['threads'], force=options['force'])
+
+        for result in results:
+            line = f"{result['policy']}: {result['status']} chunks={result['chunks']} tokens={result['tokens']}"
+            self.stdout.write(f"{line} ({result['error']})" if 'error' in result else line)
+        embedded = sum(result['status'] == 'embedded' for result in results)
+        self.stdout.write(self.style.SUCCESS(f"Embedded {embedded} of {len(results)} documents."))
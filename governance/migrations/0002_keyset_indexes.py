@@ -0,0 +1,21 @@
+# Generated by Django 5.2.7 on 2026-10-17 07:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("governance", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="policy",
+            index=models.Index(fields=["created_at", "id"], name="governance_policy_created_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="control",
+            index=models.Index(fields=["created_at", "id"], name="governance_control_created_idx"),
+        ),
+    ]
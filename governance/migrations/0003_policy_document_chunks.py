@@ -0,0 +1,72 @@
+# Generated by Django 5.2.7 on 2026-10-17 15:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("governance", "0002_keyset_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PolicyDocument",
+            fields=[
+                (
+                    "policy",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="document",
+                        serialize=False,
+                        to="governance.policy",
+                    ),
+                ),
+                ("source", models.TextField()),
+                ("content_hash", models.CharField(max_length=64)),
+                ("model_name", models.CharField(max_length=255)),
+                ("vector", models.BinaryField()),
+                ("num_chunks", models.IntegerField(default=0)),
+                ("num_tokens", models.IntegerField(default=0)),
+                ("embedded_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="PolicyDocumentChunk",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("chunk_index", models.IntegerField()),
+                ("start_token", models.IntegerField()),
+                ("num_tokens", models.IntegerField()),
+                ("page", models.IntegerField(blank=True, null=True)),
+                ("text", models.TextField()),
+                ("vector", models.BinaryField()),
+                (
+                    "policy",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="document_chunks",
+                        to="governance.policy",
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("policy", "chunk_index"),
+                        name="governance_chunk_policy_index_uniq",
+                    )
+                ],
+            },
+        ),
+    ]
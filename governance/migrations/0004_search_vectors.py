@@ -0,0 +1,90 @@
+# Generated by Django 5.2.7 on 2026-10-17 16:11
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0003_pg_trgm"),
+        ("governance", "0003_policy_document_chunks"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="policy",
+            name="search_vector",
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=django.contrib.postgres.search.CombinedSearchVector(
+                    django.contrib.postgres.search.SearchVector(
+                        "title", config="english", weight="A"
+                    ),
+                    "||",
+                    django.contrib.postgres.search.SearchVector(
+                        "description", config="english", weight="B"
+                    ),
+                    django.contrib.postgres.search.SearchConfig("english"),
+                ),
+                output_field=django.contrib.postgres.search.SearchVectorField(),
+            ),
+        ),
+        migrations.AddField(
+            model_name="control",
+            name="search_vector",
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=django.contrib.postgres.search.CombinedSearchVector(
+                    django.contrib.postgres.search.CombinedSearchVector(
+                        django.contrib.postgres.search.SearchVector(
+                            "control_code", config="english", weight="A"
+                        ),
+                        "||",
+                        django.contrib.postgres.search.SearchVector(
+                            "title", config="english", weight="B"
+                        ),
+                        django.contrib.postgres.search.SearchConfig("english"),
+                    ),
+                    "||",
+                    django.contrib.postgres.search.SearchVector(
+                        "description", config="english", weight="C"
+                    ),
+                    django.contrib.postgres.search.SearchConfig("english"),
+                ),
+                output_field=django.contrib.postgres.search.SearchVectorField(),
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="policy",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="governance_policy_search_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="control",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="governance_control_search_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="control",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("control_code"), name="gin_trgm_ops"
+                ),
+                name="governance_control_code_trgm",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="control",
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper("title"), name="gin_trgm_ops"
+                ),
+                name="governance_control_title_trgm",
+            ),
+        ),
+    ]
@@ -1,7 +1,10 @@
 # governance/models.py
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.db import models
+from django.db.models.functions import Upper
 from core.models import Profile # Import Profile from core app
 from uuid import uuid4
+from core.managers import GraphSyncManager, GraphSyncSearchManager, search_vector_field
 
 class CorporateObjective(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid4, editable=False)
@@ -14,6 +17,8 @@ class CorporateObjective(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = GraphSyncManager() # bulk writes are synced to Neo4j too
+
     def __str__(self):
         return self.title
 
@@ -31,6 +36,19 @@ class Policy(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Weighted tsvector maintained by the database (core.managers.SearchQuerySet)
+    search_vector = search_vector_field('title', 'description')
+
+    objects = GraphSyncSearchManager() # bulk writes are synced to Neo4j too; .search() / .ranked()
+
+    class Meta:
+        indexes = [
+            # Keyset pagination of the register API (core.pagination.KeysetPagination)
+            models.Index(fields=['created_at', 'id'], name='governance_policy_created_idx'),
+            # Full-text search
+            GinIndex(fields=['search_vector'], name='governance_policy_search_idx'),
+        ]
+
     def __str__(self):
         return self.title
 
@@ -45,6 +63,22 @@ class Control(models.Model):
     owner = models.ForeignKey(Profile, on_delete=models.SET_NULL, null=True, related_name='controls_owned')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+
+    # Weighted tsvector maintained by the database (core.managers.SearchQuerySet)
+    search_vector = search_vector_field('control_code', 'title', 'description')
+    TRIGRAM_FIELDS = ('control_code', 'title') # Substring / fuzzy lookups, see Meta.indexes
+
+    objects = GraphSyncSearchManager() # bulk writes are synced to Neo4j too; .search() / .ranked()
+
+    class Meta:
+        indexes = [
+            # Keyset pagination of the register API (core.pagination.KeysetPagination)
+            models.Index(fields=['created_at', 'id'], name='governance_control_created_idx'),
+            # Full-text search, and icontains / trigram similarity on UPPER(code), UPPER(title)
+            GinIndex(fields=['search_vector'], name='governance_control_search_idx'),
+            GinIndex(OpClass(Upper('control_code'), name='gin_trgm_ops'), name='governance_control_code_trgm'),
+            GinIndex(OpClass(Upper('title'), name='gin_trgm_ops'), name='governance_control_title_trgm'),
+        ]
     
     def __str__(self):
         return self.control_code
@@ -57,4 +91,35 @@ class PolicyControlMapping(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
-        unique_together = ('policy', 'control') # Unique constraint
\ No newline at end of file
+        unique_together = ('policy', 'control') # Unique constraint
+
+# Full-document embeddings of Policy.document_url (governance.documents)
+class PolicyDocument(models.Model):
+    policy = models.OneToOneField(Policy, on_delete=models.CASCADE, primary_key=True, related_name='document')
+    source = models.TextField() # The document_url that was embedded
+    content_hash = models.CharField(max_length=64) # sha256 of the file bytes; unchanged files are skipped
+    model_name = models.CharField(max_length=255)
+    vector = models.BinaryField() # Pooled document vector: float32 bytes, L2-normalized
+    num_chunks = models.IntegerField(default=0)
+    num_tokens = models.IntegerField(default=0)
+    embedded_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Document of {self.policy_id}"
+
+class PolicyDocumentChunk(models.Model):
+    policy = models.ForeignKey(Policy, on_delete=models.CASCADE, related_name='document_chunks')
+    chunk_index = models.IntegerField()
+    start_token = models.IntegerField() # Offset of the window in the document's token stream
+    num_tokens = models.IntegerField()
+    page = models.IntegerField(null=True, blank=True) # First page of the window (PDFs)
+    text = models.TextField()
+    vector = models.BinaryField() # float32 bytes, L2-normalized
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['policy', 'chunk_index'], name='governance_chunk_policy_index_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.policy_id}#{self.chunk_index}"
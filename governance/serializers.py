@@ -0,0 +1,41 @@
+# governance/serializers.py
+from rest_framework import serializers
+from core.serializers import ProfileSummarySerializer
+from .models import Policy, Control
+
+
+class PolicyListSerializer(serializers.ModelSerializer):
+    owner = ProfileSummarySerializer(read_only=True)
+    control_ids = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Policy
+        fields = [
+            'id', 'title', 'category', 'version', 'status', 'review_date', 'approval_date',
+            'owner', 'control_ids', 'created_at', 'updated_at',
+        ]
+
+    def get_control_ids(self, policy):
+        # Served from the prefetched mappings (one query per page, not per row)
+        return [str(mapping.control_id) for mapping in policy.policycontrolmapping_set.all()]
+
+
+class PolicyDetailSerializer(PolicyListSerializer):
+    class Meta(PolicyListSerializer.Meta):
+        fields = PolicyListSerializer.Meta.fields + ['description', 'document_url']
+
+
+class ControlListSerializer(serializers.ModelSerializer):
+    owner = ProfileSummarySerializer(read_only=True)
+
+    class Meta:
+        model = Control
+        fields = [
+            'id', 'control_code', 'title', 'category', 'control_type', 'status',
+            'owner', 'created_at', 'updated_at',
+        ]
+
+
+class ControlDetailSerializer(ControlListSerializer):
+    class Meta(ControlListSerializer.Meta):
+        fields = ControlListSerializer.Meta.fields + ['description']
@@ -1,69 +1,59 @@
 # governance/signals.py
-from django.db.models.signals import post_save, post_delete
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.db import transaction
 from django.dispatch import receiver
 from .models import Policy, Control, CorporateObjective # Import relational models
-from .graph_models import PolicyNode, ControlNode, CorporateObjectiveNode
-from risk.tasks import process_text_embedding 
+from risk.vector_index import VectorIndexRegistry
+from risk.graph_sync import GraphSyncQueue
 
+# Node properties and embedding texts are declared once in risk.graph_sync.GRAPH_SYNC_SPECS,
+# shared with the bulk paths (core.managers.GraphSyncQuerySet)
 
-# Signal to handle Policy creation/update
-@receiver(post_save, sender=Policy)
-def update_policy_graph(sender, instance, created, **kwargs):
-    """Creates or updates a Policy node in Neo4j."""
-    uid_str = str(instance.id)
-    if created:
-        PolicyNode.create(uid=uid_str, title=instance.title, category=instance.category, status=instance.status)
-    else:
-        policy_node = PolicyNode.nodes.get(uid=uid_str)
-        policy_node.title = instance.title
-        policy_node.category = instance.category
-        policy_node.status = instance.status
-        policy_node.save()
-
-@receiver(post_delete, sender=Policy)
-def delete_policy_graph(sender, instance, **kwargs):
-    """Deletes the Policy node from Neo4j when the Django object is deleted."""
-    try:
-        PolicyNode.nodes.get(uid=str(instance.id)).delete()
-    except PolicyNode.DoesNotExist:
-        pass
 
 # --- Policy Signals ---
+@receiver(pre_save, sender=Policy)
+def capture_policy_document_url(sender, instance, update_fields=None, **kwargs):
+    """Remembers the stored document_url, so post_save only re-embeds when it changes."""
+    if instance._state.adding or (update_fields is not None and 'document_url' not in update_fields):
+        instance._stored_document_url = instance.document_url
+    else:
+        instance._stored_document_url = (
+            Policy.objects.filter(pk=instance.pk).values_list('document_url', flat=True).first()
+        )
+
 @receiver(post_save, sender=Policy)
 def update_policy_graph_and_embed(sender, instance, created, **kwargs):
-    uid_str = str(instance.id)
-    text_content = f"Title: {instance.title}. Description: {instance.description or ''}"
-    
-    # 1. Synchronize basic data with Neo4j (immediate operation)
-    if created:
-        PolicyNode.create(uid=uid_str, title=instance.title, category=instance.category, status=instance.status)
-    else:
-        # Optimization: only fetch node if fields changed, though for simplicity here we update all fields
-        policy_node = PolicyNode.nodes.get(uid=uid_str)
-        policy_node.title = instance.title
-        policy_node.category = instance.category
-        policy_node.status = instance.status
-        policy_node.save()
+    """Queues the Policy node upsert for Neo4j and, if its document changed, its embedding."""
+    # Write-behind sync with Neo4j (flushed in batches after commit) + AI embedding task
+    GraphSyncQueue.enqueue_instance(instance)
+    stored_url = getattr(instance, '_stored_document_url', None)
+    if instance.document_url and (created or instance.document_url != stored_url):
+        # Chunked full-document embedding; edits to the file behind an unchanged URL are
+        # picked up by `manage.py embed_policy_documents` (skips files whose hash is unchanged)
+        from governance.tasks import embed_policy_document
+        transaction.on_commit(lambda: embed_policy_document.delay(str(instance.id)))
 
-    # 2. Queue AI Embedding Task (asynchronous operation)
-    # The delay prevents blocking the user request and uses Celery for heavy lifting.
-    process_text_embedding.apply_async(
-        args=['policy', uid_str, text_content],
-        countdown=5 # Start embedding after a small delay (5 seconds)
-    )
+@receiver(post_delete, sender=Policy)
+def delete_policy_graph(sender, instance, **kwargs):
+    """Queues deletion of the Policy node from Neo4j when the Django object is deleted."""
+    VectorIndexRegistry.remove('policy', [str(instance.id)])
+    GraphSyncQueue.enqueue_delete('Policy', instance.id)
 
 # Signal to handle CorporateObjective creation/update
 @receiver(post_save, sender=CorporateObjective)
 def update_objective_graph(sender, instance, created, **kwargs):
-    uid_str = str(instance.id)
-    if created:
-        CorporateObjectiveNode.create(uid=uid_str, title=instance.title, fiscal_year=instance.fiscal_year, department=instance.department)
-    else:
-        objective_node = CorporateObjectiveNode.nodes.get(uid=uid_str)
-        objective_node.title = instance.title
-        objective_node.fiscal_year = instance.fiscal_year
-        objective_node.department = instance.department
-        objective_node.save()
+    GraphSyncQueue.enqueue_instance(instance)
+
+@receiver(post_delete, sender=CorporateObjective)
+def delete_objective_graph(sender, instance, **kwargs):
+    GraphSyncQueue.enqueue_delete('Objective', instance.id)
+
+# --- Control Signals ---
+@receiver(post_save, sender=Control)
+def update_control_graph(sender, instance, created, **kwargs):
+    GraphSyncQueue.enqueue_instance(instance)
 
-# TODO: Create similar post_save and post_delete signals for Control, 
-#       ComplianceRequirement (in the compliance app), and Risk (in the risk app).
\ No newline at end of file
+@receiver(post_delete, sender=Control)
+def delete_control_graph(sender, instance, **kwargs):
+    VectorIndexRegistry.remove('control', [str(instance.id)])
+    GraphSyncQueue.enqueue_delete('Control', instance.id)
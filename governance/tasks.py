@@ -0,0 +1,15 @@
+# governance/tasks.py
+
+import logging
+
+from celery import shared_task
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(ignore_result=True)
+def embed_policy_document(policy_id: str, force: bool = False):
+    """Re-embeds a policy's document (chunks + pooled vector); a no-op if the file is unchanged."""
+    from governance.documents import embed_document
+    result = embed_document(policy_id, force=force)
+    logger.info(f"Policy document embedding: {result}")
@@ -1,3 +1,137 @@
-from django.test import TestCase
+import re
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from core.models import Profile
+from .documents import iter_windows
+from .models import Policy, Control, PolicyControlMapping
+
+# Graph-version bumps from the sync signals go to a local cache instead of Redis
+LOCMEM_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class GovernanceAPIQueryBudgetTests(APITestCase):
+    """The register APIs must cost a fixed number of queries per page, whatever the page holds."""
+
+    @classmethod
+    def setUpTestData(cls):
+        owner = Profile.objects.create(user=User.objects.create(username="owner"), full_name="Owner")
+        controls = Control.objects.bulk_create([
+            Control(control_code=f"C-{i}", title=f"Control {i}", category="IT", control_type="preventive", owner=owner)
+            for i in range(20)
+        ])
+        policies = Policy.objects.bulk_create([
+            Policy(title=f"Policy {i}", category="IT", owner=owner) for i in range(20)
+        ])
+        PolicyControlMapping.objects.bulk_create([
+            PolicyControlMapping(policy=policy, control=control)
+            for policy in policies for control in controls[:3]
+        ])
+
+    def test_policy_list_query_budget(self):
+        # Policies joined with their owner + one prefetch of the control mappings
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('policy-list'), {'page_size': 20})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), 20)
+        self.assertEqual(len(response.data['results'][0]['control_ids']), 3)
+
+    def test_policy_detail_query_budget(self):
+        pk = Policy.objects.first().pk
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('policy-detail', args=[pk]))
+        self.assertEqual(response.status_code, 200)
+
+    def test_control_list_query_budget(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('control-list'), {'page_size': 20})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['results'][0]['owner']['full_name'], "Owner")
+
+    def test_control_detail_query_budget(self):
+        pk = Control.objects.first().pk
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('control-detail', args=[pk]))
+        self.assertEqual(response.status_code, 200)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class PolicyEmbedSignalTests(TestCase):
+    """Saving a policy only queues a document embedding when it is new or its document_url changed."""
+
+    def setUp(self):
+        for target in ('risk.tasks.collect_text_embeddings.delay', 'risk.graph_sync.GraphSyncQueue.schedule_flush',
+                       'audit.signals.audit_log'):
+            patcher = mock.patch(target)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        patcher = mock.patch('governance.tasks.embed_policy_document.delay')
+        self.embed_document = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def save(self, policy, **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            policy.save(**kwargs)
+
+    def test_embeds_on_create_and_document_change_only(self):
+        policy = Policy(title="Access", category="IT", document_url="/docs/access-v1.pdf")
+        self.save(policy)
+        policy.title = "Access control"
+        self.save(policy)
+        self.save(policy, update_fields=['title'])
+        policy.document_url = "/docs/access-v2.pdf"
+        self.save(policy)
+
+        self.assertEqual(self.embed_document.call_args_list, [mock.call(str(policy.id))] * 2)
+
+    def test_policy_without_document_is_not_embedded(self):
+        self.save(Policy(title="Travel", category="HR"))
+        self.embed_document.assert_not_called()
+
+
+def whitespace_tokenizer(text, **kwargs):
+    """Stands in for the model's fast tokenizer: one token per word, with character offsets."""
+    offsets = [match.span() for match in re.finditer(r'\S+', text)]
+    return {'input_ids': list(range(len(offsets))), 'offset_mapping': offsets}
+
+
+class DocumentWindowTests(SimpleTestCase):
+    """Token windows of streamed document text (governance.documents.iter_windows)."""
+
+    def windows(self, pieces, window=4, overlap=1):
+        return list(iter_windows(pieces, whitespace_tokenizer, window, overlap))
+
+    def test_windows_overlap(self):
+        windows = self.windows([(1, "w0 w1 w2 w3 w4 w5 w6")])
+        self.assertEqual([w['start_token'] for w in windows], [0, 3])
+        self.assertEqual([w['text'] for w in windows], ["w0 w1 w2 w3", "w3 w4 w5 w6"])
+        self.assertEqual([w['num_tokens'] for w in windows], [4, 4])
+
+    def test_tail_window(self):
+        windows = self.windows([(None, "w0 w1 w2 w3 w4 w5")])
+        self.assertEqual([(w['start_token'], w['num_tokens']) for w in windows], [(0, 4), (3, 3)])
+        self.assertEqual(windows[-1]['text'], "w3 w4 w5")
+
+    def test_tail_that_is_only_overlap_is_dropped(self):
+        windows = self.windows([(None, "w0 w1 w2 w3")])
+        self.assertEqual([w['text'] for w in windows], ["w0 w1 w2 w3"])
+
+    def test_short_document_is_one_window(self):
+        self.assertEqual(self.windows([(None, "w0 w1")]),
+                         [{'start_token': 0, 'num_tokens': 2, 'page': None, 'text': "w0 w1"}])
+
+    def test_window_spans_pieces(self):
+        windows = self.windows([(1, "w0 w1 w2"), (2, ""), (3, "w3 w4")])
+        self.assertEqual(windows[0]['text'], "w0 w1 w2\nw3")
+        self.assertEqual(windows[0]['page'], 1)
+        self.assertEqual((windows[1]['text'], windows[1]['page']), ("w3 w4", 3))
+
+    def test_overlap_must_be_inside_window(self):
+        for overlap in (0, 4, 5):
+            with self.assertRaises(ValueError):
+                self.windows([(None, "w0 w1 w2 w3 w4")], overlap=overlap)
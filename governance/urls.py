@@ -0,0 +1,9 @@
+from rest_framework.routers import SimpleRouter
+from .views import PolicyViewSet, ControlViewSet
+
+router = SimpleRouter()
+# Matches /api/governance/policies/ and /api/governance/controls/
+router.register('policies', PolicyViewSet, basename='policy')
+router.register('controls', ControlViewSet, basename='control')
+
+urlpatterns = router.urls
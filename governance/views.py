@@ -1,3 +1,57 @@
-from django.shortcuts import render
+from django.db.models import Prefetch
+from rest_framework import viewsets
+from core.pagination import KeysetPagination
+from core.serializers import ProfileSummarySerializer
+from .models import Policy, Control, PolicyControlMapping
+from .serializers import PolicyListSerializer, PolicyDetailSerializer, ControlListSerializer, ControlDetailSerializer
 
-# Create your views here.
+
+class PolicyViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Read API for the policy register: keyset-paginated list and detail.
+    Two queries per page: the joined policy rows, and their control mappings.
+    `?search=` narrows the list through the full-text index.
+    """
+    pagination_class = KeysetPagination
+
+    LIST_FIELDS = (
+        'id', 'title', 'category', 'version', 'status', 'review_date', 'approval_date',
+        'created_at', 'updated_at', *ProfileSummarySerializer.only('owner'),
+    )
+    DETAIL_FIELDS = LIST_FIELDS + ('description', 'document_url')
+
+    def get_queryset(self):
+        fields = self.DETAIL_FIELDS if self.action == 'retrieve' else self.LIST_FIELDS
+        mappings = PolicyControlMapping.objects.only('id', 'policy_id', 'control_id')
+        queryset = (
+            Policy.objects.select_related('owner').only(*fields)
+            .prefetch_related(Prefetch('policycontrolmapping_set', queryset=mappings))
+        )
+        term = self.request.query_params.get('search')
+        return queryset.search(term) if term else queryset
+
+    def get_serializer_class(self):
+        return PolicyDetailSerializer if self.action == 'retrieve' else PolicyListSerializer
+
+
+class ControlViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Read API for the control library: keyset-paginated list and detail, one query per page.
+    `?search=` matches full text, or a substring of the control code / title (trigram indexes).
+    """
+    pagination_class = KeysetPagination
+
+    LIST_FIELDS = (
+        'id', 'control_code', 'title', 'category', 'control_type', 'status',
+        'created_at', 'updated_at', *ProfileSummarySerializer.only('owner'),
+    )
+    DETAIL_FIELDS = LIST_FIELDS + ('description',)
+
+    def get_queryset(self):
+        fields = self.DETAIL_FIELDS if self.action == 'retrieve' else self.LIST_FIELDS
+        queryset = Control.objects.select_related('owner').only(*fields)
+        term = self.request.query_params.get('search')
+        return queryset.search(term) if term else queryset
+
+    def get_serializer_class(self):
+        return ControlDetailSerializer if self.action == 'retrieve' else ControlListSerializer
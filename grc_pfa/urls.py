@@ -1,12 +1,18 @@
 from django.contrib import admin
 from django.urls import path, include
+from core.views import SearchAPI
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     
     # API endpoints
     path('api/risk/', include('risk.urls')), 
-    # Add other apps later: path('api/governance/', include('governance.urls')), etc.
+    path('api/governance/', include('governance.urls')),
+    path('api/compliance/', include('compliance.urls')),
+    path('api/dashboard/', include('core.urls')),
+    path('api/audit/', include('audit.urls')),
+    # Hybrid semantic + full-text search across all GRC registers
+    path('api/search/', SearchAPI.as_view(), name='search'),
     
     # Frontend will be served from the root later, but for development API is separate
 ]
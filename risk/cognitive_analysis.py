@@ -0,0 +1,84 @@
+from datetime import timedelta
+
+from django.db.models import Count
+from django.utils import timezone
+
+from risk.models import Risk
+
+
+class CognitiveAnalysisService:
+    """
+    Builds the Cognitive Risk Radar payloads from the risk register.
+    Each analysis type returns a JSON-serializable dict for the frontend.
+    """
+
+    HIGH_RISK_SCORE = 15  # Risks with score >= 15 (likelihood x impact, max 25)
+    EMERGING_WINDOW_DAYS = 30
+    TOP_N = 10
+
+    @classmethod
+    def run(cls, analysis_type: str, on_progress=None) -> dict:
+        """
+        Args:
+            analysis_type: 'comprehensive', 'patterns' or 'emerging'.
+            on_progress: Optional callable(stage, fraction) invoked as the analysis advances.
+        """
+        report = on_progress or (lambda stage, fraction: None)
+        handlers = {
+            'comprehensive': cls._comprehensive,
+            'patterns': cls._patterns,
+            'emerging': cls._emerging,
+        }
+        report('querying', 0.1)
+        payload = handlers[analysis_type]()
+        report('serializing', 0.9)
+        return {
+            'analysis_type': analysis_type,
+            'generated_at': timezone.now().isoformat(),
+            **payload,
+        }
+
+    @classmethod
+    def _top_risks(cls, queryset):
+        # Served by the (risk_score, created_at) index instead of sorting the register
+        return [
+            {'id': str(row['id']), 'title': row['title'], 'category': row['category'], 'risk_score': row['risk_score']}
+            for row in queryset.order_by('-risk_score', '-created_at').values('id', 'title', 'category', 'risk_score')[:cls.TOP_N]
+        ]
+
+    @classmethod
+    def _comprehensive(cls) -> dict:
+        """Heat map of the whole register plus its highest scored risks."""
+        heat_map = list(
+            Risk.objects.values('likelihood', 'impact').annotate(count=Count('id')).order_by('likelihood', 'impact')
+        )
+        risks = Risk.objects.all()
+        return {
+            'heat_map': heat_map,
+            'high_risk_count': risks.filter(risk_score__gte=cls.HIGH_RISK_SCORE).count(),
+            'top_risks': cls._top_risks(risks),
+        }
+
+    @classmethod
+    def _patterns(cls) -> dict:
+        """Where high risks concentrate: by category and by corporate objective."""
+        high = Risk.objects.filter(risk_score__gte=cls.HIGH_RISK_SCORE)
+        return {
+            'categories': list(high.values('category').annotate(count=Count('id')).order_by('-count')[:cls.TOP_N]),
+            'objectives': [
+                {'objective_id': str(row['objective']), 'title': row['objective__title'], 'count': row['count']}
+                for row in high.filter(objective__isnull=False)
+                .values('objective', 'objective__title').annotate(count=Count('id')).order_by('-count')[:cls.TOP_N]
+            ],
+        }
+
+    @classmethod
+    def _emerging(cls) -> dict:
+        """Recently registered risks, highest score first."""
+        since = timezone.now() - timedelta(days=cls.EMERGING_WINDOW_DAYS)
+        recent = Risk.objects.filter(created_at__gte=since)
+        return {
+            'window_days': cls.EMERGING_WINDOW_DAYS,
+            'new_risk_count': recent.count(),
+            'top_risks': cls._top_risks(recent),
+        }
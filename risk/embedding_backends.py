@@ -0,0 +1,221 @@
+# risk/embedding_backends.py
+
+import logging
+import os
+from typing import List, Optional
+
+import numpy as np
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.module_loading import import_string
+
+from core.lazy import lazy_module
+
+logger = logging.getLogger(__name__)
+
+torch = lazy_module('torch')
+sentence_transformers = lazy_module('sentence_transformers')
+
+
+class BaseEmbeddingBackend:
+    """
+    Runs a sentence-embedding model for NLPEmbeddingService.
+
+    `encode` returns raw float32 rows; normalization is the service's job. A
+    backend's `model_id` goes into the embedding cache key, so switching
+    backends never mixes vectors from different numerics.
+    """
+
+    # Appended to the model name in `model_id` ('' for the fp32 reference)
+    VARIANT = ''
+
+    def __init__(self, model_name: str, threads: Optional[int] = None, **options):
+        self.model_name = model_name
+        self.threads = threads
+
+    @property
+    def model_id(self) -> str:
+        return f"{self.model_name}+{self.VARIANT}" if self.VARIANT else self.model_name
+
+    @property
+    def dimension(self) -> int:
+        raise NotImplementedError
+
+    @property
+    def tokenizer(self):
+        """The model's (Hugging Face) tokenizer, e.g. to split long documents into token windows."""
+        raise NotImplementedError
+
+    @property
+    def max_seq_length(self) -> int:
+        """Tokens the model reads per text (special tokens included); the rest is truncated."""
+        raise NotImplementedError
+
+    def encode(self, texts: List[str], batch_size: int = 64) -> np.ndarray:
+        raise NotImplementedError
+
+
+class TorchBackend(BaseEmbeddingBackend):
+    """The fp32 SentenceTransformer on CPU (reference numerics)."""
+
+    def __init__(self, model_name: str, threads: Optional[int] = None, **options):
+        super().__init__(model_name, threads, **options)
+        if threads:
+            torch.set_num_threads(threads)
+        logger.info(f"Loading SentenceTransformer model: {model_name} ({type(self).__name__})")
+        self.model = sentence_transformers.SentenceTransformer(model_name, device='cpu')
+        # Set model to evaluation mode (important for production efficiency)
+        self.model.eval()
+
+    @property
+    def dimension(self) -> int:
+        return self.model.get_sentence_embedding_dimension()
+
+    @property
+    def tokenizer(self):
+        return self.model.tokenizer
+
+    @property
+    def max_seq_length(self) -> int:
+        return self.model.max_seq_length
+
+    def encode(self, texts: List[str], batch_size: int = 64) -> np.ndarray:
+        with torch.inference_mode():
+            return self.model.encode(
+                list(texts), batch_size=batch_size, convert_to_numpy=True, show_progress_bar=False
+            ).astype(np.float32, copy=False)
+
+
+class QuantizedTorchBackend(TorchBackend):
+    """
+    The same model with every nn.Linear dynamically quantized to int8: weights
+    are stored as int8 and activations quantized per batch, which speeds up the
+    matmul-bound transformer layers on CPU. Close to, not identical with, fp32.
+    """
+
+    VARIANT = 'int8'
+
+    def __init__(self, model_name: str, threads: Optional[int] = None, **options):
+        super().__init__(model_name, threads, **options)
+        torch.ao.quantization.quantize_dynamic(self.model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+
+
+class OnnxBackend(BaseEmbeddingBackend):
+    """
+    The transformer exported to ONNX and run by ONNX Runtime, with the
+    SentenceTransformer's mean pooling done in NumPy. Needs `onnxruntime` and
+    `transformers` (the tokenizer); the model is exported with `export()`
+    (see `manage.py benchmark_embedding_backends --export`).
+    """
+
+    VARIANT = 'onnx'
+
+    def __init__(self, model_name: str, threads: Optional[int] = None, model_path: str = None,
+                 max_seq_length: int = 256, **options):
+        super().__init__(model_name, threads, **options)
+        try:
+            import onnxruntime
+            from transformers import AutoTokenizer
+        except ImportError:
+            raise ImproperlyConfigured("The ONNX embedding backend requires 'onnxruntime' and 'transformers'.")
+
+        self.model_path = str(model_path or self.default_path(model_name))
+        if not os.path.exists(self.model_path):
+            raise ImproperlyConfigured(
+                f"No ONNX model at {self.model_path}; export it with "
+                f"`manage.py benchmark_embedding_backends --export`."
+            )
+        session_options = onnxruntime.SessionOptions()
+        if threads:
+            session_options.intra_op_num_threads = threads
+        session_options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = onnxruntime.InferenceSession(
+            self.model_path, session_options, providers=['CPUExecutionProvider']
+        )
+        self.input_names = {node.name for node in self.session.get_inputs()}
+        self._tokenizer = AutoTokenizer.from_pretrained(os.path.dirname(self.model_path))
+        self._max_seq_length = max_seq_length
+        self._dimension = self.session.get_outputs()[0].shape[-1]
+
+    @staticmethod
+    def default_path(model_name: str) -> str:
+        return os.path.join(settings.BASE_DIR, 'var', 'onnx', model_name.replace('/', '__'), 'model.onnx')
+
+    @classmethod
+    def export(cls, model_name: str, model_path: str = None) -> str:
+        """Exports the SentenceTransformer's transformer (and tokenizer) for this backend; returns the path."""
+        model_path = str(model_path or cls.default_path(model_name))
+        model = sentence_transformers.SentenceTransformer(model_name, device='cpu')
+        pooling = model[1]
+        if pooling.get_pooling_mode_str() != 'mean':
+            raise ImproperlyConfigured(f"{model_name} uses {pooling.get_pooling_mode_str()} pooling; only mean is supported.")
+
+        transformer = model[0].auto_model.eval()
+        tokenizer = model.tokenizer
+        os.makedirs(os.path.dirname(model_path), exist_ok=True)
+        tokenizer.save_pretrained(os.path.dirname(model_path))
+
+        sample = tokenizer(["export sample"], return_tensors='pt')
+        input_names = [name for name in ('input_ids', 'attention_mask', 'token_type_ids') if name in sample]
+        dynamic_axes = {name: {0: 'batch', 1: 'sequence'} for name in input_names}
+        dynamic_axes['last_hidden_state'] = {0: 'batch', 1: 'sequence'}
+        with torch.inference_mode():
+            torch.onnx.export(
+                transformer, tuple(sample[name] for name in input_names), model_path,
+                input_names=input_names, output_names=['last_hidden_state'],
+                dynamic_axes=dynamic_axes, opset_version=14,
+            )
+        logger.info(f"Exported {model_name} to {model_path}.")
+        return model_path
+
+    @property
+    def dimension(self) -> int:
+        return self._dimension
+
+    @property
+    def tokenizer(self):
+        return self._tokenizer
+
+    @property
+    def max_seq_length(self) -> int:
+        return self._max_seq_length
+
+    def encode(self, texts: List[str], batch_size: int = 64) -> np.ndarray:
+        output = np.empty((len(texts), self.dimension), dtype=np.float32)
+        for start in range(0, len(texts), batch_size):
+            tokens = self.tokenizer(
+                list(texts[start:start + batch_size]), padding=True, truncation=True,
+                max_length=self.max_seq_length, return_tensors='np',
+            )
+            inputs = {name: tokens[name].astype(np.int64) for name in self.input_names}
+            hidden = self.session.run(None, inputs)[0]
+            # Mean pooling over real tokens (what the SentenceTransformer's Pooling module does)
+            mask = tokens['attention_mask'][..., None].astype(np.float32)
+            output[start:start + len(hidden)] = (hidden * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+        return output
+
+
+# Short names accepted by settings.NLP_EMBEDDING_BACKEND['BACKEND']
+BACKEND_ALIASES = {
+    'torch': 'risk.embedding_backends.TorchBackend',
+    'torch-int8': 'risk.embedding_backends.QuantizedTorchBackend',
+    'onnx': 'risk.embedding_backends.OnnxBackend',
+}
+
+
+def get_backend_class(backend: str = None):
+    """The backend class named by `backend` (alias or dotted path), else the configured one."""
+    backend = backend or getattr(settings, 'NLP_EMBEDDING_BACKEND', {}).get('BACKEND', 'torch')
+    return import_string(BACKEND_ALIASES.get(backend, backend))
+
+
+def load_backend(backend: str = None, model_name: str = None, **options) -> BaseEmbeddingBackend:
+    """
+    Instantiates an embedding backend: the one configured in
+    settings.NLP_EMBEDDING_BACKEND by default, or `backend` (alias or dotted path).
+    """
+    config = getattr(settings, 'NLP_EMBEDDING_BACKEND', {})
+    backend_class = get_backend_class(backend)
+    configured = {key.lower(): value for key, value in config.get('OPTIONS', {}).items()}
+    configured.update(options)
+    return backend_class(model_name or config.get('MODEL_NAME', 'all-MiniLM-L6-v2'), **configured)
@@ -0,0 +1,131 @@
+# risk/embedding_cache.py
+
+import hashlib
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, Iterable, Tuple
+
+import numpy as np
+from django.conf import settings
+
+from risk.models import CachedEmbedding, EntityEmbedding
+from risk.nlp_service import NLPEmbeddingService
+
+
+class EmbeddingCache:
+    """
+    Two-tier cache of text embeddings keyed by a hash of the normalized text
+    and the embedding model name.
+
+    The first tier is a bounded in-process LRU, the second the `CachedEmbedding`
+    table. `EntityEmbedding` tracks which hash is currently stored on each
+    Neo4j node, so unchanged text is never re-encoded or re-written.
+    """
+
+    LRU_SIZE = getattr(settings, 'EMBEDDING_CACHE_LRU_SIZE', 10000)
+
+    _lru: "OrderedDict[str, np.ndarray]" = OrderedDict()
+    _lock = threading.Lock()
+
+    @staticmethod
+    def normalize_text(text: str) -> str:
+        """Normalizes unicode and whitespace so cosmetic edits do not change the hash."""
+        return ' '.join(unicodedata.normalize('NFC', text or '').split())
+
+    @classmethod
+    def content_hash(cls, text: str) -> str:
+        """Returns the sha256 hex digest of the normalized text and the model (and backend variant)."""
+        payload = f"{NLPEmbeddingService.model_id()}\x00{cls.normalize_text(text)}"
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    # --- Vector tiers ---
+
+    @classmethod
+    def get_many(cls, hashes: Iterable[str]) -> Dict[str, np.ndarray]:
+        """Looks up vectors in the LRU first, then in PostgreSQL (promoting hits into the LRU)."""
+        found = {}
+        pending = []
+        with cls._lock:
+            for content_hash in set(hashes):
+                vector = cls._lru.get(content_hash)
+                if vector is None:
+                    pending.append(content_hash)
+                else:
+                    cls._lru.move_to_end(content_hash)
+                    found[content_hash] = vector
+
+        if pending:
+            rows = CachedEmbedding.objects.filter(
+                content_hash__in=pending, model_name=NLPEmbeddingService.model_id()
+            ).values_list('content_hash', 'vector')
+            from_db = {content_hash: np.frombuffer(bytes(vector), dtype=np.float32) for content_hash, vector in rows}
+            cls._remember(from_db)
+            found.update(from_db)
+        return found
+
+    @classmethod
+    def set_many(cls, vectors: Dict[str, np.ndarray]):
+        """Stores freshly computed vectors in both tiers."""
+        if not vectors:
+            return
+        vectors = {content_hash: np.asarray(vector, dtype=np.float32) for content_hash, vector in vectors.items()}
+        CachedEmbedding.objects.bulk_create(
+            [
+                CachedEmbedding(
+                    content_hash=content_hash,
+                    model_name=NLPEmbeddingService.model_id(),
+                    vector=vector.tobytes(),
+                )
+                for content_hash, vector in vectors.items()
+            ],
+            ignore_conflicts=True,
+        )
+        cls._remember(vectors)
+
+    @classmethod
+    def _remember(cls, vectors: Dict[str, np.ndarray]):
+        with cls._lock:
+            for content_hash, vector in vectors.items():
+                cls._lru[content_hash] = vector
+                cls._lru.move_to_end(content_hash)
+            while len(cls._lru) > cls.LRU_SIZE:
+                cls._lru.popitem(last=False)
+
+    # --- Entity state ---
+
+    @classmethod
+    def is_current(cls, entity_type: str, entity_pk: str, text: str) -> bool:
+        """True when the entity's Neo4j node already holds the embedding of this text."""
+        return EntityEmbedding.objects.filter(
+            entity_type=entity_type, entity_id=entity_pk, content_hash=cls.content_hash(text)
+        ).exists()
+
+    @classmethod
+    def current_hashes(cls, keys: Iterable[Tuple[str, str]]) -> Dict[Tuple[str, str], str]:
+        """Returns the stored content hash for each (entity_type, entity_pk) key that has one."""
+        keys = set(keys)
+        rows = EntityEmbedding.objects.filter(
+            entity_type__in={entity_type for entity_type, _ in keys},
+            entity_id__in={entity_pk for _, entity_pk in keys},
+        ).values_list('entity_type', 'entity_id', 'content_hash')
+        return {
+            (entity_type, str(entity_id)): content_hash
+            for entity_type, entity_id, content_hash in rows
+            if (entity_type, str(entity_id)) in keys
+        }
+
+    @classmethod
+    def mark_current(cls, entries: Dict[Tuple[str, str], str]):
+        """Records the content hash now stored on each (entity_type, entity_pk) node."""
+        if not entries:
+            return
+        EntityEmbedding.objects.bulk_create(
+            [
+                EntityEmbedding(entity_type=entity_type, entity_id=entity_pk, content_hash=content_hash)
+                for (entity_type, entity_pk), content_hash in entries.items()
+            ],
+            update_conflicts=True,
+            unique_fields=['entity_type', 'entity_id'],
+            update_fields=['content_hash', 'updated_at'],
+        )
@@ -0,0 +1,183 @@
+# risk/gnn_inference.py
+
+import logging
+import os
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from django.conf import settings
+
+from core.lazy import lazy_module
+from risk.graph_snapshot import GraphSnapshot, GraphSnapshotStore
+
+dgl = lazy_module('dgl')
+torch = lazy_module('torch')
+
+logger = logging.getLogger(__name__)
+
+# Link-prediction candidates per source label: (candidate label, canonical etype of the existing links)
+LINK_TARGETS = {
+    'Policy': ('Control', ('Policy', 'COVERS', 'Control')),
+    'ComplianceRequirement': ('Policy', ('Policy', 'MAPS_TO', 'ComplianceRequirement')),
+}
+
+
+class GNNInferenceEngine:
+    """
+    Per-process GNN inference for the recommendation service.
+
+    The model is built and its trained weights loaded once per process (or
+    once in the Celery parent via `warm()`: `share_memory()` keeps the weights
+    in shared pages that every forked pool process maps instead of copying).
+    Inference runs under `torch.inference_mode()`.
+
+    One forward pass over the graph snapshot yields the link embeddings of
+    every node; they are reused until the snapshot changes, and a batch of
+    requests is scored with one matrix product per source label. Requests
+    reach a worker through the micro-batching `risk.tasks.generate_recommendations`
+    task, so concurrent requests share the forward pass.
+    """
+
+    WEIGHTS_PATH = getattr(settings, 'GNN_WEIGHTS_PATH', os.path.join(settings.BASE_DIR, 'var', 'gnn', 'grc_gnn.pt'))
+    TOP_K = getattr(settings, 'GNN_RECOMMENDATION_TOP_K', 3)
+    NUM_THREADS = getattr(settings, 'GNN_INFERENCE_THREADS', 1)
+
+    _model = None
+    _trained = False
+    _lock = threading.Lock()
+
+    # Link embeddings of the last snapshot seen: (snapshot, {ntype: Tensor[N, D]})
+    _embedded: Optional[Tuple[GraphSnapshot, Dict[str, "torch.Tensor"]]] = None
+
+    # --- Model lifecycle ---
+
+    @classmethod
+    def has_trained_weights(cls) -> bool:
+        return os.path.exists(cls.WEIGHTS_PATH)
+
+    @classmethod
+    def get_model(cls):
+        if cls._model is None:
+            with cls._lock:
+                if cls._model is None:
+                    cls._model = cls._load_model()
+        return cls._model
+
+    @classmethod
+    def _load_model(cls):
+        # Defines nn.Module subclasses, so it imports torch and DGL for real
+        from risk.gnn_model import build_model
+
+        model = build_model()
+        if cls.has_trained_weights():
+            checkpoint = torch.load(cls.WEIGHTS_PATH, map_location='cpu', weights_only=True)
+            # A `train_gnn` checkpoint, or a bare state dict
+            model.load_state_dict(checkpoint.get('model_state', checkpoint))
+            cls._trained = True
+        else:
+            logger.warning(f"No GNN weights at {cls.WEIGHTS_PATH}; using an untrained model.")
+        model.eval()
+        for parameter in model.parameters():
+            parameter.requires_grad_(False)
+        model.share_memory()
+        return model
+
+    @classmethod
+    def warm(cls):
+        """Loads the model before the worker forks its pool processes."""
+        model = cls.get_model()
+        size = sum(parameter.numel() for parameter in model.parameters())
+        logger.info(f"GNN model warmed ({size:,} parameters, trained={cls._trained}).")
+
+    @classmethod
+    def after_fork(cls):
+        """Pool process setup: one intra-op thread each, so N processes don't oversubscribe the CPUs."""
+        torch.set_num_threads(cls.NUM_THREADS)
+
+    @classmethod
+    def invalidate(cls):
+        """Forgets the cached embeddings (the next request runs a forward pass)."""
+        cls._embedded = None
+
+    # --- Inference ---
+
+    @classmethod
+    def link_embeddings(cls, snapshot: GraphSnapshot) -> Dict[str, "torch.Tensor"]:
+        """Link embeddings of every node of the snapshot, from one forward pass per snapshot."""
+        embedded = cls._embedded
+        if embedded is not None and embedded[0] is snapshot:
+            return embedded[1]
+
+        model = cls.get_model()
+        # Reverse relations ('rev_COVERS', ...) so messages flow both ways
+        graph = dgl.AddReverse(copy_edata=False)(snapshot.graph)
+        features = {ntype: graph.nodes[ntype].data['feat'] for ntype in graph.ntypes}
+        with torch.inference_mode():
+            h = model(graph, features)
+            embeddings = model.get_link_embeddings(h)
+        cls._embedded = (snapshot, embeddings)
+        return embeddings
+
+    @classmethod
+    def predict_links(cls, requests: Sequence[Tuple[str, str]], top_k: int = None,
+                      snapshot: GraphSnapshot = None) -> List[List[Tuple[str, str, float]]]:
+        """
+        Scores the missing links of a batch of entities.
+
+        Args:
+            requests: (graph label, uid) pairs, e.g. ('Policy', '<uuid>').
+            top_k: Candidates returned per request (default TOP_K).
+            snapshot: Graph to score against (default: the current snapshot).
+
+        Returns:
+            Per request, [(candidate label, candidate uid, probability)] best first,
+            excluding existing links; empty for unknown nodes or labels without a link head.
+        """
+        top_k = top_k or cls.TOP_K
+        snapshot = snapshot or GraphSnapshotStore.load()
+        embeddings = cls.link_embeddings(snapshot)
+        results: List[List[Tuple[str, str, float]]] = [[] for _ in requests]
+
+        # 1. Group the requests per source label
+        by_label: Dict[str, List[Tuple[int, int]]] = {}
+        for position, (label, uid) in enumerate(requests):
+            row = snapshot.index_of(label, uid)
+            if label in LINK_TARGETS and row is not None:
+                by_label.setdefault(label, []).append((position, row))
+
+        # 2. One [B, D] x [D, N] product per label
+        graph = snapshot.graph
+        for label, entries in by_label.items():
+            target_label, etype = LINK_TARGETS[label]
+            candidates = embeddings[target_label]
+            if not len(candidates):
+                continue
+            # The same entity may be requested more than once in a batch
+            unique_rows = list(dict.fromkeys(row for _, row in entries))
+            batch_index = {row: i for i, row in enumerate(unique_rows)}
+            rows = torch.tensor(unique_rows, dtype=torch.int64)
+            with torch.inference_mode():
+                scores = torch.sigmoid(embeddings[label][rows] @ candidates.T)
+
+                # Existing links and tombstoned candidates are not recommendations
+                alive = torch.tensor([uid is not None for uid in snapshot.uids[target_label]], dtype=torch.bool)
+                scores[:, ~alive] = -1.0
+                if etype[0] == label:
+                    src, dst = graph.out_edges(rows, etype=etype)
+                    linked = (src, dst)
+                else:
+                    src, dst = graph.in_edges(rows, etype=etype)
+                    linked = (dst, src)
+                if len(linked[0]):
+                    scores[[batch_index[int(r)] for r in linked[0]], linked[1]] = -1.0
+
+                k = min(top_k, scores.shape[1])
+                best_scores, best_rows = torch.topk(scores, k, dim=1)
+
+            for position, row in entries:
+                i = batch_index[row]
+                results[position] = [
+                    (target_label, snapshot.uid_of(target_label, candidate), score)
+                    for score, candidate in zip(best_scores[i].tolist(), best_rows[i].tolist()) if score >= 0
+                ]
+        return results
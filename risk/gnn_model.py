@@ -21,8 +21,9 @@ class HeteroGNNLayer(nn.Module):
     def __init__(self, in_size, out_size, canonical_etypes):
         super().__init__()
         # Use DGL's HeteroGraphConv for message passing
+        # (nodes without incoming edges of a relation, e.g. an unmapped Control, are valid input)
         self.conv = dglnn.HeteroGraphConv({
-            etype[1]: dglnn.GraphConv(in_size, out_size)
+            etype[1]: dglnn.GraphConv(in_size, out_size, allow_zero_in_degree=True)
             for etype in canonical_etypes
         }, aggregate='sum')
 
@@ -86,16 +87,36 @@ class GRCGNN(nn.Module):
         
         return h
 
+    def forward_blocks(self, blocks, features):
+        """
+        Mini-batch forward pass over sampled message flow graphs (one block per
+        layer, e.g. from dgl.dataloading.MultiLayerNeighborSampler). Features
+        are the input nodes' `{node_type: Tensor}`; the result holds the output
+        (seed) nodes of the last block.
+        """
+        h = {}
+        for ntype, feat in features.items():
+            h[ntype] = F.relu(self.input_projections[ntype](feat))
+
+        for layer, block in zip((self.layer1, self.layer2), blocks):
+            h = {k: F.relu(v) for k, v in layer(block, h).items()}
+            # Types whose sampled nodes received no edges are dropped by HeteroGraphConv; they aggregate to zero
+            for ntype in block.dsttypes:
+                if ntype not in h:
+                    h[ntype] = torch.zeros(block.num_dst_nodes(ntype), HIDDEN_DIM)
+        return h
+
     def classify_risks(self, h_risks):
         """Performs the Node Classification task on Risk nodes."""
         return self.risk_classifier(h_risks)
     
-    def get_link_embeddings(self):
-        """Generates task-specific embeddings for Link Prediction."""
+    def get_link_embeddings(self, h=None):
+        """Generates task-specific embeddings for Link Prediction (from `h`, or the last forward pass)."""
+        h = self.final_embeddings if h is None else h
         link_embeds = {}
         for ntype in self.link_embed_proj.keys():
-            if ntype in self.final_embeddings:
-                link_embeds[ntype] = self.link_embed_proj[ntype](self.final_embeddings[ntype])
+            if ntype in h:
+                link_embeds[ntype] = self.link_embed_proj[ntype](h[ntype])
         return link_embeds
 
 # ----------------- Link Prediction Scoring Module -----------------
@@ -110,7 +131,7 @@ class LinkPredictor(nn.Module):
         score = (h_src * h_dst).sum(dim=1)
         return score
 
-# --- Example Initialisation ---
+# --- Graph schema ---
 
 # The full list of canonical edge types from the graph loader (Step 3.3.2)
 CANONICAL_ETYPES = [
@@ -120,5 +141,20 @@ CANONICAL_ETYPES = [
 ]
 NODE_TYPES = ['Policy', 'Risk', 'Control', 'ComplianceRequirement', 'Objective']
 
-grc_gnn_model = GRCGNN(CANONICAL_ETYPES, NODE_TYPES)
-link_predictor = LinkPredictor()
+# Prefix `dgl.AddReverse` gives the reverse of each relation
+REVERSE_PREFIX = 'rev_'
+
+
+def with_reverse_etypes(canonical_etypes):
+    """
+    The edge types plus their reverses. Without them messages only flow
+    Policy -> Control/Requirement and Risk -> Objective, and Policy/Risk nodes
+    never see their neighbours.
+    """
+    return list(canonical_etypes) + [(dst, f"{REVERSE_PREFIX}{rel}", src) for src, rel, dst in canonical_etypes]
+
+
+def build_model() -> GRCGNN:
+    """The GNN for the loader's graph schema (with reverse edges). Models are built
+    on demand (see risk.gnn_inference), never at import time."""
+    return GRCGNN(with_reverse_etypes(CANONICAL_ETYPES), NODE_TYPES)
@@ -0,0 +1,225 @@
+# risk/gnn_training.py
+
+import logging
+import os
+import resource
+import time
+from itertools import zip_longest
+from typing import Dict, List
+
+import dgl
+import torch
+import torch.nn.functional as F
+
+from risk.gnn_inference import GNNInferenceEngine
+from risk.gnn_model import CANONICAL_ETYPES, REVERSE_PREFIX, LinkPredictor, build_model
+from risk.graph_loader import GRCGraphLoader
+from risk.graph_snapshot import GraphSnapshot
+
+logger = logging.getLogger(__name__)
+
+# Relations the link-prediction head is trained on (positive edges)
+LINK_ETYPES = [
+    ('Policy', 'COVERS', 'Control'),
+    ('Policy', 'MAPS_TO', 'ComplianceRequirement'),
+]
+
+# Risk classes for `classify_risks`: score bands Low (1-6), Medium (7-14), High (15-25)
+RISK_CLASS_BOUNDS = (7, 15)
+
+
+def risk_labels(risk_features: torch.Tensor) -> torch.Tensor:
+    """Class of each Risk node from its normalized score feature (score / 25)."""
+    scores = torch.round(risk_features[:, GRCGraphLoader.EMB_DIM] * 25)
+    return torch.bucketize(scores, torch.tensor(RISK_CLASS_BOUNDS, dtype=scores.dtype), right=True)
+
+
+def without_risk_score(features: Dict[str, torch.Tensor]) -> Dict[str, torch.Tensor]:
+    """
+    Block input features with the Risk score column zeroed. The classification
+    labels are derived from that column, so the model must not see it.
+    """
+    if 'Risk' not in features:
+        return features
+    risk_features = features['Risk'].clone() # The snapshot's rows are memory-mapped; never write to them
+    risk_features[:, GRCGraphLoader.EMB_DIM] = 0
+    return {**features, 'Risk': risk_features}
+
+
+def peak_rss_mb() -> float:
+    """Peak RSS of this process plus that of its largest finished DataLoader worker (ru_maxrss is KiB on Linux)."""
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return (own + children) / 1024
+
+
+class GNNTrainer:
+    """
+    CPU-only mini-batch training of GRCGNN.
+
+    Instead of full-graph forward passes, each step runs on the message flow
+    graphs (blocks) that `MultiLayerNeighborSampler` samples around a batch of
+    seed nodes, so memory is bounded by batch size x fanouts, not graph size.
+    Sampling runs in DataLoader worker processes.
+
+    Two objectives alternate step by step:
+      - node classification of Risk nodes through `classify_risks` (the
+        score band the labels come from is hidden from the inputs);
+      - link prediction on LINK_ETYPES through `LinkPredictor`, against
+        uniformly sampled negative edges (the positive edge and its reverse are
+        excluded from the sampled neighbourhood, so the model cannot read the
+        answer off the graph).
+
+    After every epoch the weights (and optimizer state) are checkpointed
+    atomically to GNN_WEIGHTS_PATH, where GNNInferenceEngine loads them.
+    """
+
+    def __init__(self, snapshot: GraphSnapshot, fanouts=(10, 10), batch_size: int = 1024,
+                 negatives: int = 5, num_workers: int = 4, lr: float = 1e-3,
+                 checkpoint_path: str = None, val_fraction: float = 0.1, seed: int = 0):
+        torch.manual_seed(seed)
+        self.checkpoint_path = str(checkpoint_path or GNNInferenceEngine.WEIGHTS_PATH)
+        self.batch_size = batch_size
+        self.num_workers = num_workers
+
+        # 1. Graph with reverse relations (the model's schema); features stay memory-mapped
+        self.graph = dgl.AddReverse(copy_edata=False)(snapshot.graph)
+        self.model = build_model()
+        self.link_predictor = LinkPredictor()
+        self.optimizer = torch.optim.Adam(self.model.parameters(), lr=lr)
+        self.sampler = dgl.dataloading.MultiLayerNeighborSampler(list(fanouts), prefetch_node_feats=['feat'])
+        self.negatives = negatives
+        self.epoch = 0
+
+        # 2. Risk nodes (tombstones excluded) split into train / validation
+        live = torch.tensor([uid is not None for uid in snapshot.uids['Risk']], dtype=torch.bool)
+        risk_ids = torch.nonzero(live, as_tuple=True)[0]
+        risk_ids = risk_ids[torch.randperm(len(risk_ids))]
+        val_size = int(len(risk_ids) * val_fraction)
+        self.val_risks, self.train_risks = risk_ids[:val_size], risk_ids[val_size:]
+        self.labels = risk_labels(self.graph.nodes['Risk'].data['feat'])
+
+        # 3. Positive edges per link relation
+        self.train_edges = {
+            etype: torch.arange(self.graph.num_edges(etype)) for etype in LINK_ETYPES if self.graph.num_edges(etype)
+        }
+
+    # --- Data loaders ---
+
+    def _node_loader(self, seeds: torch.Tensor, shuffle: bool):
+        return dgl.dataloading.DataLoader(
+            self.graph, {'Risk': seeds}, self.sampler, batch_size=self.batch_size,
+            shuffle=shuffle, drop_last=False, num_workers=self.num_workers, device='cpu',
+        )
+
+    def _link_loader(self):
+        reverse_etypes = {}
+        for src, rel, dst in CANONICAL_ETYPES:
+            reverse_etypes[rel] = f"{REVERSE_PREFIX}{rel}"
+            reverse_etypes[f"{REVERSE_PREFIX}{rel}"] = rel
+        sampler = dgl.dataloading.as_edge_prediction_sampler(
+            self.sampler, exclude='reverse_types', reverse_etypes=reverse_etypes,
+            negative_sampler=dgl.dataloading.negative_sampler.Uniform(self.negatives),
+        )
+        return dgl.dataloading.DataLoader(
+            self.graph, self.train_edges, sampler, batch_size=self.batch_size,
+            shuffle=True, drop_last=False, num_workers=self.num_workers, device='cpu',
+        )
+
+    # --- Steps ---
+
+    def _node_step(self, output_nodes, blocks) -> torch.Tensor:
+        h = self.model.forward_blocks(blocks, without_risk_score(blocks[0].srcdata['feat']))
+        logits = self.model.classify_risks(h['Risk'])
+        return F.cross_entropy(logits, self.labels[output_nodes['Risk']])
+
+    def _link_step(self, pair_graph, neg_pair_graph, blocks) -> torch.Tensor:
+        h = self.model.forward_blocks(blocks, blocks[0].srcdata['feat'])
+        link_h = self.model.get_link_embeddings(h)
+        scores, targets = [], []
+        for graph, target in ((pair_graph, 1.0), (neg_pair_graph, 0.0)):
+            for etype in LINK_ETYPES:
+                if not graph.num_edges(etype):
+                    continue
+                src, dst = graph.edges(etype=etype)
+                score = self.link_predictor(link_h[etype[0]][src], link_h[etype[2]][dst])
+                scores.append(score)
+                targets.append(torch.full_like(score, target))
+        return F.binary_cross_entropy_with_logits(torch.cat(scores), torch.cat(targets))
+
+    # --- Loop ---
+
+    def train_epoch(self) -> dict:
+        self.model.train()
+        started = time.perf_counter()
+        totals = {'node_loss': 0.0, 'node_steps': 0, 'link_loss': 0.0, 'link_steps': 0}
+
+        node_batches = self._node_loader(self.train_risks, shuffle=True) if len(self.train_risks) else []
+        link_batches = self._link_loader() if self.train_edges else []
+        # Alternate the two objectives so neither dominates the end of the epoch
+        for node_batch, link_batch in zip_longest(node_batches, link_batches):
+            for kind, batch in (('node', node_batch), ('link', link_batch)):
+                if batch is None:
+                    continue
+                if kind == 'node':
+                    loss = self._node_step(*batch[1:])
+                else:
+                    loss = self._link_step(*batch[1:])
+                self.optimizer.zero_grad()
+                loss.backward()
+                self.optimizer.step()
+                totals[f'{kind}_loss'] += loss.item()
+                totals[f'{kind}_steps'] += 1
+
+        self.epoch += 1
+        metrics = {
+            'epoch': self.epoch,
+            'node_loss': totals['node_loss'] / max(totals['node_steps'], 1),
+            'link_loss': totals['link_loss'] / max(totals['link_steps'], 1),
+            'val_accuracy': self.evaluate(),
+            'epoch_seconds': time.perf_counter() - started,
+            'peak_rss_mb': peak_rss_mb(),
+        }
+        self.save_checkpoint(metrics)
+        logger.info(f"GNN epoch {self.epoch}: {metrics}")
+        return metrics
+
+    def evaluate(self) -> float:
+        """Risk classification accuracy on the validation nodes (sampled neighbourhoods)."""
+        if not len(self.val_risks):
+            return float('nan')
+        self.model.eval()
+        correct = 0
+        with torch.inference_mode():
+            for _, output_nodes, blocks in self._node_loader(self.val_risks, shuffle=False):
+                h = self.model.forward_blocks(blocks, without_risk_score(blocks[0].srcdata['feat']))
+                predicted = self.model.classify_risks(h['Risk']).argmax(dim=1)
+                correct += (predicted == self.labels[output_nodes['Risk']]).sum().item()
+        return correct / len(self.val_risks)
+
+    def fit(self, epochs: int) -> List[Dict]:
+        return [self.train_epoch() for _ in range(epochs)]
+
+    # --- Checkpoints ---
+
+    def save_checkpoint(self, metrics: dict):
+        os.makedirs(os.path.dirname(self.checkpoint_path), exist_ok=True)
+        tmp_path = f"{self.checkpoint_path}.tmp"
+        torch.save({
+            'model_state': self.model.state_dict(),
+            'optimizer_state': self.optimizer.state_dict(),
+            'epoch': self.epoch,
+            'metrics': metrics,
+        }, tmp_path)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def resume(self):
+        """Continues from the checkpoint at `checkpoint_path`, if there is one."""
+        if not os.path.exists(self.checkpoint_path):
+            return
+        checkpoint = torch.load(self.checkpoint_path, map_location='cpu', weights_only=True)
+        self.model.load_state_dict(checkpoint['model_state'])
+        if 'optimizer_state' in checkpoint:
+            self.optimizer.load_state_dict(checkpoint['optimizer_state'])
+        self.epoch = checkpoint.get('epoch', 0)
+        logger.info(f"Resumed GNN training from epoch {self.epoch}.")
@@ -1,26 +1,39 @@
 import numpy as np
-import dgl # Deep Graph Library (DGL)
-import torch
+from array import array
 from neo4j import GraphDatabase, Driver
 from django.conf import settings
-from typing import Dict, Tuple, List, Any
+from typing import Dict, Tuple, List, Iterable
+
+from core.lazy import lazy_module
+
+# Deep Graph Library (DGL) and torch are imported on first use, not with this module
+dgl = lazy_module('dgl')
+torch = lazy_module('torch')
 
 class GRCGraphLoader:
     """
     Loads the Neo4j GRC Graph into a DGL Heterogeneous Graph object
     ready for GNN training, including node features (embeddings/scores).
+
+    Bolt records are streamed in FETCH_SIZE chunks straight into preallocated
+    per-type NumPy arrays, which are handed to DGL without copying through
+    `torch.from_numpy`, so peak memory stays close to one copy of the features.
     """
     # Define Node Types and Features needed for the GNN
     NODE_TYPES = ['Policy', 'Risk', 'Control', 'ComplianceRequirement', 'Objective']
-    
+
     # Define Edge Types (Heterogeneous Relationships)
     EDGE_TYPES = [
-        ('Policy', 'COVERS', 'Control'), 
-        ('Policy', 'MAPS_TO', 'ComplianceRequirement'), 
+        ('Policy', 'COVERS', 'Control'),
+        ('Policy', 'MAPS_TO', 'ComplianceRequirement'),
         ('Risk', 'LINKED_TO', 'Objective'),
         # Add bidirectional edges or other complex relationships as needed for GNN
     ]
 
+    EMB_DIM = 384 # From 'all-MiniLM-L6-v2'
+    FEATURE_DIM = EMB_DIM + 1 # Embedding + normalized risk score
+    FETCH_SIZE = getattr(settings, 'GRAPH_LOADER_FETCH_SIZE', 10000)
+
     def __init__(self):
         # Use settings from Django configuration
         uri = settings.NEOMODEL_NEO4J_BOLT_URL
@@ -30,124 +43,123 @@ class GRCGraphLoader:
         auth_part = parts[0].split('//')[1]
         user, password = auth_part.split(':')
         host_port = parts[1]
-        
+
         self.driver: Driver = GraphDatabase.driver(f"bolt://{host_port}", auth=(user, password))
 
+        # Per node type, the Neo4j `uid` of each DGL node index (filled by the last load)
+        self.node_uids: Dict[str, List[str]] = {}
+
     def close(self):
         self.driver.close()
 
-    def _fetch_graph_data(self, tx) -> Tuple[Dict[str, Any], Dict[Tuple[str, str, str], List[Tuple[int, int]]]]:
-        """Executes Cypher queries to retrieve nodes and relationships."""
-        
-        # --- 1. Fetch Nodes and Features ---
-        # Fetch node IDs, their UID (Django FK), and critical features (embeddings, scores)
-        node_query = """
-        MATCH (n)
-        WHERE n:Policy OR n:Risk OR n:Control OR n:ComplianceRequirement OR n:Objective
-        RETURN 
-            ID(n) AS node_id, 
-            LABELS(n)[0] AS node_type, 
-            n.uid AS uid, 
-            n.risk_score AS risk_score,
-            n.description_embedding AS embedding
+    # --- Node streaming ---
+
+    @classmethod
+    def fill_node_arrays(cls, records: Iterable, capacity: int) -> Tuple[np.ndarray, List[str], np.ndarray]:
         """
-        nodes_result = tx.run(node_query).data()
-
-        # --- 2. Fetch Relationships ---
-        # Returns triplet: (source_type, edge_type, destination_type) and the node IDs
-        rel_query = """
-        MATCH (u)-[r]->(v)
-        WHERE TYPE(r) IN ['COVERS', 'MAPS_TO', 'LINKED_TO']
-        RETURN 
-            ID(u) AS source_id, 
-            LABELS(u)[0] AS source_type, 
-            TYPE(r) AS rel_type, 
-            ID(v) AS dest_id, 
-            LABELS(v)[0] AS dest_type
+        Consumes (node_id, uid, risk_score, embedding) records into preallocated arrays.
+
+        Args:
+            records: Iterable of records in DGL index order (e.g. a streaming Bolt result).
+            capacity: Expected number of records; the arrays grow if more arrive.
+
+        Returns:
+            (neo4j_ids int64[N], uids, features float32[N, FEATURE_DIM])
         """
-        rels_result = tx.run(rel_query).data()
-        
-        return nodes_result, rels_result
+        neo4j_ids = np.empty(capacity, dtype=np.int64)
+        features = np.zeros((capacity, cls.FEATURE_DIM), dtype=np.float32)
+        uids = []
+
+        i = 0
+        for node_id, uid, risk_score, embedding in records:
+            if i == len(neo4j_ids):
+                # Nodes were created after the count; grow instead of failing
+                new_cap = max(1, 2 * i)
+                neo4j_ids = np.resize(neo4j_ids, new_cap)
+                features = np.concatenate([features, np.zeros((new_cap - i, cls.FEATURE_DIM), features.dtype)])
+            neo4j_ids[i] = node_id
+            uids.append(uid)
+            # A) BERT Embedding Feature (missing embeddings stay zero)
+            # (Python floats convert to float64 natively; the float32 downcast then runs in C)
+            if embedding is not None and len(embedding) == cls.EMB_DIM:
+                features[i, :cls.EMB_DIM] = np.array(embedding, dtype=np.float64)
+            # B) Numerical Features (Risk Score normalized by the max score 5x5=25)
+            features[i, cls.EMB_DIM] = (risk_score or 0) / 25.0
+            i += 1
+
+        return neo4j_ids[:i], uids, features[:i]
+
+    def _count_nodes(self, session, ntype: str) -> int:
+        # Label counts are served from the count store, not a scan
+        return session.run(f"MATCH (n:{ntype}) RETURN count(n) AS c").single()['c']
+
+    def _stream_nodes(self, session, ntype: str):
+        query = f"""
+        MATCH (n:{ntype})
+        RETURN ID(n) AS node_id, n.uid AS uid, n.risk_score AS risk_score, n.description_embedding AS embedding
+        """
+        return (record.values() for record in session.run(query))
+
+    # --- Edge streaming ---
 
-    def load_dgl_heterogeneous_graph(self) -> dgl.DGLGraph:
+    def _stream_edges(self, session, etype: Tuple[str, str, str]) -> Tuple[np.ndarray, np.ndarray]:
+        """Streams the endpoint Neo4j IDs of one canonical edge type into compact int64 buffers."""
+        src_type, rel_type, dst_type = etype
+        query = f"""
+        MATCH (u:{src_type})-[:{rel_type}]->(v:{dst_type})
+        RETURN ID(u) AS source_id, ID(v) AS dest_id
+        """
+        src, dst = array('q'), array('q')
+        for record in session.run(query):
+            src.append(record[0])
+            dst.append(record[1])
+        return np.frombuffer(src, dtype=np.int64), np.frombuffer(dst, dtype=np.int64)
+
+    @staticmethod
+    def map_ids(neo4j_ids: np.ndarray, lookup: np.ndarray) -> np.ndarray:
+        """Vectorized Neo4j ID -> DGL index mapping (-1 for IDs not in `neo4j_ids`)."""
+        if not len(neo4j_ids):
+            return np.full(len(lookup), -1, dtype=np.int64)
+        order = np.argsort(neo4j_ids)
+        sorted_ids = neo4j_ids[order]
+        positions = np.clip(np.searchsorted(sorted_ids, lookup), 0, len(sorted_ids) - 1)
+        return np.where(sorted_ids[positions] == lookup, order[positions], -1)
+
+    def load_dgl_heterogeneous_graph(self) -> "dgl.DGLGraph":
         """
         Connects to Neo4j, fetches the heterogeneous graph, processes features,
         and returns a DGLGraph object ready for GNN.
+
+        Every canonical edge type in EDGE_TYPES is present (possibly empty) so the
+        graph schema always matches the GNN's. Node `uid`s per DGL index are kept
+        in `self.node_uids`.
         """
-        with self.driver.session() as session:
-            nodes_data, rels_data = session.execute_read(self._fetch_graph_data)
-
-        # 1. Map Neo4j IDs to continuous integer IDs (essential for DGL/PyG)
-        neo4j_to_dgl_id = {node['node_id']: i for i, node in enumerate(nodes_data)}
-        
-        # 2. Separate nodes and features by type
-        node_data_by_type = {ntype: [] for ntype in self.NODE_TYPES}
-        feature_data_by_type = {ntype: [] for ntype in self.NODE_TYPES}
-        
-        # Determine embedding dimension (e.g., 384 from BERT)
-        EMB_DIM = 384 
-
-        for node in nodes_data:
-            ntype = node['node_type']
-            
-            # --- Feature Engineering: Combine features ---
-            features = []
-            
-            # A) BERT Embedding Feature (List[Float])
-            embedding = node['embedding']
-            features.extend(embedding if embedding and len(embedding) == EMB_DIM else [0.0] * EMB_DIM)
-            
-            # B) Numerical Features (Risk Score)
-            risk_score = node.get('risk_score', 0) 
-            features.append(risk_score / 25.0) # Normalize score (Max score 5x5=25)
-
-            # Convert features list to a tensor
-            feature_data_by_type[ntype].append(torch.tensor(features, dtype=torch.float32))
-            node_data_by_type[ntype].append(neo4j_to_dgl_id[node['node_id']])
-
-        # Pad and stack features into tensors per node type
-        node_features = {
-            ntype: torch.stack(feature_data_by_type[ntype])
-            for ntype in self.NODE_TYPES if feature_data_by_type[ntype]
-        }
-
-        # 3. Prepare Edges for DGL
-        canonical_etypes = {}
-        for row in rels_data:
-            src_type = row['source_type']
-            rel_type = row['rel_type']
-            dst_type = row['dest_type']
-            
-            # DGL canonical edge type: (source_node_type, edge_type, dest_node_type)
-            canonical_etype = (src_type, rel_type, dst_type)
-
-            if canonical_etype not in canonical_etypes:
-                canonical_etypes[canonical_etype] = []
-
-            # Map Neo4j IDs to DGL IDs
-            src_dgl_id = neo44j_to_dgl_id[row['source_id']]
-            dst_dgl_id = neo44j_to_dgl_id[row['dest_id']]
-            
-            canonical_etypes[canonical_etype].append((src_dgl_id, dst_dgl_id))
-
-        # Convert edge lists to DGL format (source indices, destination indices)
-        data_dict = {}
-        for etype, edges in canonical_etypes.items():
-            if edges:
-                src_ids = torch.tensor([e[0] for e in edges])
-                dst_ids = torch.tensor([e[1] for e in edges])
-                data_dict[etype] = (src_ids, dst_ids)
-        
-        # 4. Construct Heterogeneous DGL Graph
-        if not data_dict:
-            raise ValueError("No relationships found to build the DGL Graph.")
-
-        graph = dgl.heterograph(data_dict)
-        
-        # 5. Assign Node Features to the DGL Graph
+        node_ids, node_features, node_uids = {}, {}, {}
+        edges = {}
+        with self.driver.session(fetch_size=self.FETCH_SIZE, default_access_mode='READ') as session:
+            # 1. Stream nodes per type into preallocated arrays (DGL IDs are per-type row numbers)
+            for ntype in self.NODE_TYPES:
+                count = self._count_nodes(session, ntype)
+                node_ids[ntype], node_uids[ntype], node_features[ntype] = self.fill_node_arrays(
+                    self._stream_nodes(session, ntype), count
+                )
+
+            # 2. Stream edges per canonical type and map Neo4j IDs to DGL IDs vectorized
+            for etype in self.EDGE_TYPES:
+                src, dst = self._stream_edges(session, etype)
+                src = self.map_ids(node_ids[etype[0]], src)
+                dst = self.map_ids(node_ids[etype[2]], dst)
+                valid = (src >= 0) & (dst >= 0) # Drop edges to nodes created mid-load
+                edges[etype] = (torch.from_numpy(src[valid]), torch.from_numpy(dst[valid]))
+
+        # 3. Construct Heterogeneous DGL Graph
+        graph = dgl.heterograph(edges, num_nodes_dict={ntype: len(node_ids[ntype]) for ntype in self.NODE_TYPES})
+
+        # 4. Assign Node Features to the DGL Graph (zero-copy views of the NumPy arrays)
         for ntype, features in node_features.items():
-            graph.ndata['feat'] = features
-        
+            graph.nodes[ntype].data['feat'] = torch.from_numpy(features)
+
+        self.node_uids = node_uids
         return graph
 
 # Example of use within a Django/Celery Task:
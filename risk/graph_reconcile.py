@@ -0,0 +1,172 @@
+# risk/graph_reconcile.py
+
+import hashlib
+import json
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Optional
+
+from django.apps import apps
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import connection
+from neomodel import db
+
+from risk.graph_sync import GRAPH_SYNC_SPECS, GraphSyncQueue, UPSERT_NODES_QUERY, DELETE_NODES_QUERY
+from risk.models import GraphChange, EntityEmbedding
+
+logger = logging.getLogger(__name__)
+
+RECONCILE_CHUNK_SIZE = getattr(settings, 'GRAPH_RECONCILE_CHUNK_SIZE', 5000)
+
+# Graph side of one chunk: a row per requested uid, with null properties for missing nodes
+FETCH_NODES_QUERY = """
+UNWIND $uids AS uid
+OPTIONAL MATCH (n:{label} {{uid: uid}})
+RETURN uid, properties(n) AS properties
+"""
+
+# Keyset scan over the node uids (served by the uid uniqueness constraint)
+SCAN_UIDS_QUERY = """
+MATCH (n:{label})
+WHERE n.uid > $after
+RETURN n.uid AS uid
+ORDER BY uid
+LIMIT $limit
+"""
+
+
+def content_hash(properties: Optional[dict], keys) -> Optional[str]:
+    """Order-independent hash of the synced properties (None when the node is missing)."""
+    if properties is None:
+        return None
+    canonical = json.dumps({key: properties.get(key) for key in keys}, sort_keys=True, default=str)
+    return hashlib.sha1(canonical.encode('utf-8')).hexdigest()
+
+
+def reconcile_model(model_label: str, since: Optional[datetime] = None,
+                    chunk_size: int = RECONCILE_CHUNK_SIZE, dry_run: bool = False) -> dict:
+    """
+    Compares one relational table with its Neo4j nodes and repairs the drift.
+
+    Rows are streamed in primary-key order with `iterator(chunk_size=...)`; for
+    each chunk the matching nodes are fetched in one UNWIND query, row and node
+    are compared by content hash, and only the differing rows are re-written
+    (one UNWIND MERGE per chunk). A full run (no `since`) also removes nodes
+    whose row no longer exists.
+
+    `since` selects rows by `updated_at`, which saves and the GraphSyncQuerySet
+    bulk paths (`update`, `bulk_update`, `bulk_create`) maintain; rows changed
+    by raw SQL are only caught by a full run.
+
+    Returns:
+        Stats dict: rows, created, updated, deleted, seconds.
+    """
+    model = apps.get_model(model_label)
+    spec = GRAPH_SYNC_SPECS[model_label]
+    stats = {'model': model_label, 'rows': 0, 'created': 0, 'updated': 0, 'deleted': 0}
+    started = time.perf_counter()
+
+    try:
+        queryset = model._base_manager.order_by('pk')
+        if since is not None:
+            queryset = queryset.filter(updated_at__gte=since)
+
+        # 1. Rows -> nodes: fix missing and stale nodes
+        chunk = []
+        for obj in queryset.iterator(chunk_size=chunk_size):
+            chunk.append(obj)
+            if len(chunk) == chunk_size:
+                _reconcile_chunk(spec, chunk, stats, dry_run)
+                chunk = []
+        if chunk:
+            _reconcile_chunk(spec, chunk, stats, dry_run)
+
+        # 2. Nodes -> rows: drop orphans (only a full scan can see deletions)
+        if since is None:
+            _delete_orphans(model, spec, chunk_size, stats, dry_run)
+    finally:
+        # Worker threads open their own connection; don't leak it
+        connection.close()
+
+    stats['seconds'] = round(time.perf_counter() - started, 2)
+    logger.info(f"Reconciled {model_label}: {stats}")
+    return stats
+
+
+def _reconcile_chunk(spec, chunk, stats: dict, dry_run: bool):
+    rows = {str(obj.pk): spec.properties(obj) for obj in chunk}
+    keys = next(iter(rows.values())).keys()
+    results, _ = db.cypher_query(FETCH_NODES_QUERY.format(label=spec.label), {'uids': list(rows)})
+    stored = {uid: content_hash(properties, keys) for uid, properties in results}
+
+    created = [uid for uid in rows if stored.get(uid) is None]
+    updated = [uid for uid, properties in rows.items()
+               if stored.get(uid) is not None and stored[uid] != content_hash(properties, keys)]
+    stats['rows'] += len(rows)
+    stats['created'] += len(created)
+    stats['updated'] += len(updated)
+    if dry_run or not (created or updated):
+        return
+
+    repaired = created + updated
+    db.cypher_query(
+        UPSERT_NODES_QUERY.format(label=spec.label),
+        {'rows': [{'uid': uid, 'properties': rows[uid]} for uid in repaired]},
+    )
+    GraphChange.record_many(spec.label, repaired, flushed=True)
+    if spec.embedding_type and created:
+        # Recreated nodes have no embedding, whatever the cache last recorded
+        EntityEmbedding.objects.filter(entity_type=spec.embedding_type, entity_id__in=created).delete()
+        from risk.tasks import embed_entities
+        embed_entities.delay(chunk[0]._meta.label, created)
+
+
+def _delete_orphans(model, spec, chunk_size: int, stats: dict, dry_run: bool):
+    after = ''
+    while True:
+        results, _ = db.cypher_query(
+            SCAN_UIDS_QUERY.format(label=spec.label), {'after': after, 'limit': chunk_size}
+        )
+        uids = [row[0] for row in results]
+        if not uids:
+            return
+        after = uids[-1]
+
+        existing = {str(pk) for pk in model._base_manager.filter(pk__in=_valid_pks(model, uids))
+                    .values_list('pk', flat=True)}
+        orphans = [uid for uid in uids if uid not in existing]
+        stats['deleted'] += len(orphans)
+        if orphans and not dry_run:
+            db.cypher_query(DELETE_NODES_QUERY.format(label=spec.label), {'uids': orphans})
+            GraphChange.record_many(spec.label, orphans, GraphChange.OP_DELETE, flushed=True)
+
+
+def _valid_pks(model, uids):
+    """Drops uids that are not valid primary keys (e.g. nodes created outside Django)."""
+    valid = []
+    for uid in uids:
+        try:
+            valid.append(model._meta.pk.to_python(uid))
+        except ValidationError:
+            continue
+    return valid
+
+
+def reconcile_graph(model_labels=None, since: Optional[datetime] = None,
+                    chunk_size: int = RECONCILE_CHUNK_SIZE, workers: int = None, dry_run: bool = False) -> list:
+    """
+    Reconciles every synced model (or `model_labels`), one worker thread per
+    entity type. Pending write-behind changes are flushed first so the
+    comparison does not "repair" nodes that are merely queued.
+    """
+    model_labels = list(model_labels or GRAPH_SYNC_SPECS)
+    if not dry_run:
+        GraphSyncQueue.flush()
+    with ThreadPoolExecutor(max_workers=workers or len(model_labels)) as pool:
+        return list(pool.map(
+            lambda label: reconcile_model(label, since=since, chunk_size=chunk_size, dry_run=dry_run),
+            model_labels,
+        ))
@@ -0,0 +1,397 @@
+# risk/graph_snapshot.py
+
+import fcntl
+import json
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+import numpy as np
+from django.conf import settings
+from django.utils import timezone
+from neomodel import db
+
+from core.lazy import lazy_module
+from risk.graph_loader import GRCGraphLoader
+
+dgl = lazy_module('dgl')
+torch = lazy_module('torch')
+from risk.models import GraphChange
+
+logger = logging.getLogger(__name__)
+
+
+class GraphSnapshot:
+    """An in-memory view of the persisted heterograph with its uid <-> index maps."""
+
+    def __init__(self, graph, uids: Dict[str, List[Optional[str]]], last_flush_seq: int):
+        self.graph = graph
+        self.uids = uids # Per node type, the uid of each DGL index (None for deleted nodes)
+        self.index = {
+            ntype: {uid: i for i, uid in enumerate(type_uids) if uid}
+            for ntype, type_uids in uids.items()
+        }
+        self.last_flush_seq = last_flush_seq
+
+    def index_of(self, ntype: str, uid) -> Optional[int]:
+        return self.index.get(ntype, {}).get(str(uid))
+
+    def uid_of(self, ntype: str, idx: int) -> Optional[str]:
+        return self.uids[ntype][idx]
+
+
+class GraphSnapshotStore:
+    """
+    Disk-backed snapshot of the DGL heterograph built by GRCGraphLoader.
+
+    Layout of GRAPH_SNAPSHOT_DIR:
+        graph.bin           graph structure (dgl.save_graphs, no features)
+        feat_<ntype>.f32    raw float32 feature rows, memory-mapped on load
+        uids_<ntype>.bin    fixed-width uid of each row
+        patch_<ntype>_<seq>.npz
+                            rows rewritten since the last compaction (row numbers and features)
+        meta.json           row counts, tombstones, current patch files and the last replayed flush_seq
+
+    The sync signals append to the GraphChange log (`GraphChange.record`);
+    `load()` replays only the changes flushed to Neo4j since the snapshot was written
+    (re-reading just the touched nodes and their edges from Neo4j) instead of
+    rescanning the whole graph. Changes are replayed by `flush_seq`, not id:
+    ids can commit out of order, flush sequence numbers cannot.
+    Deleted nodes are tombstoned (zero features, no edges) until the next `rebuild()`.
+
+    Existing rows are never modified in place: loaded snapshots keep copy-on-write
+    mappings of the feature files, and truncating or rewriting a mapped file
+    would crash them (SIGBUS) or tear their rows. A replay only appends rows for
+    new nodes (past the end every mapping covers) and writes the rewritten rows
+    of existing nodes to a new patch file, which is overlaid on the mapping at
+    load. Once a patch grows past COMPACT_FRACTION of its node type, the rows are
+    folded into a fresh feature file that is swapped in with `os.replace`;
+    existing mappings keep the old inode.
+    """
+
+    SNAPSHOT_DIR = getattr(settings, 'GRAPH_SNAPSHOT_DIR', os.path.join(settings.BASE_DIR, 'var', 'graph_snapshot'))
+    UID_WIDTH = 64
+    FEATURE_DIM = GRCGraphLoader.FEATURE_DIM
+    COMPACT_FRACTION = getattr(settings, 'GRAPH_SNAPSHOT_COMPACT_FRACTION', 0.1)
+    COMPACT_MIN_ROWS = 1024 # Small patches are cheaper to overlay than to compact
+    COMPACT_CHUNK_ROWS = 65536
+
+    _cached: Optional[GraphSnapshot] = None
+    _lock = threading.Lock()
+
+    # --- Public API ---
+
+    @classmethod
+    def load(cls) -> GraphSnapshot:
+        """Returns the current snapshot, applying pending changes (or building it) first."""
+        with cls._lock:
+            # Only changes already written to Neo4j can be replayed from it
+            latest_seq = GraphChange.flushed_frontier()
+            if cls._cached is not None and cls._cached.last_flush_seq >= latest_seq:
+                return cls._cached
+
+            meta = cls._read_meta()
+            if meta is None or 'last_flush_seq' not in meta:
+                cls.rebuild()
+            elif meta['last_flush_seq'] < latest_seq:
+                with cls._file_lock():
+                    # Another process may have caught up while we waited for the lock
+                    meta = cls._read_meta()
+                    pending = list(
+                        GraphChange.objects.filter(flush_seq__gt=meta['last_flush_seq'], flush_seq__lte=latest_seq)
+                        .order_by('flush_seq', 'id').values_list('flush_seq', 'label', 'uid', 'op')
+                    )
+                    if pending:
+                        cls._apply_changes(meta, pending)
+                    elif meta['last_flush_seq'] < latest_seq:
+                        # Nothing left to replay; record the frontier so later loads don't re-read the log
+                        meta['last_flush_seq'] = latest_seq
+                        cls._write_meta(meta)
+
+            cls._cached = cls._read_snapshot()
+            return cls._cached
+
+    @classmethod
+    def rebuild(cls):
+        """Rebuilds the snapshot from a full Neo4j scan (also compacts tombstones)."""
+        # Changes logged during the scan are replayed on the next load; replays are idempotent
+        last_flush_seq = GraphChange.flushed_frontier()
+        loader = GRCGraphLoader()
+        try:
+            graph = loader.load_dgl_heterogeneous_graph()
+            node_uids = loader.node_uids
+        finally:
+            loader.close()
+
+        with cls._file_lock():
+            os.makedirs(cls.SNAPSHOT_DIR, exist_ok=True)
+            meta = {'num_nodes': {}, 'deleted': {}, 'patches': {}, 'last_flush_seq': last_flush_seq}
+            staged = {}
+            for ntype in graph.ntypes:
+                features = graph.nodes[ntype].data['feat'].numpy() if graph.num_nodes(ntype) else \
+                    np.zeros((0, cls.FEATURE_DIM), dtype=np.float32)
+                cls._write_rows(cls._stage(staged, f'feat_{ntype}.f32'), 0, features, truncate=True)
+                cls._write_rows(cls._stage(staged, f'uids_{ntype}.bin'), 0,
+                                cls._encode_uids(node_uids[ntype]), truncate=True)
+                meta['num_nodes'][ntype] = graph.num_nodes(ntype)
+                meta['deleted'][ntype] = []
+            cls._swap_in(staged)
+            cls._save_graph(graph)
+            cls._write_meta(meta)
+            cls._remove_stale_patches(meta)
+        cls._cached = None
+        logger.info(f"Rebuilt graph snapshot with {graph.num_nodes()} nodes and {graph.num_edges()} edges.")
+
+    # --- Incremental maintenance ---
+
+    @classmethod
+    def _apply_changes(cls, meta: dict, changes: List[tuple]):
+        graph = dgl.load_graphs(cls._path('graph.bin'))[0][0]
+        snapshot_uids = {ntype: cls._read_uids(ntype, meta) for ntype in graph.ntypes}
+        index = {
+            ntype: {uid: i for i, uid in enumerate(type_uids) if uid}
+            for ntype, type_uids in snapshot_uids.items()
+        }
+
+        # 1. Coalesce the log: only the latest operation per node matters
+        latest = {}
+        for _, label, uid, op in changes:
+            if label in index:
+                latest[(label, uid)] = op
+        upserts, deletes = {}, {}
+        for (label, uid), op in latest.items():
+            (upserts if op == GraphChange.OP_UPSERT else deletes).setdefault(label, []).append(uid)
+
+        # 2. Re-read the upserted nodes; nodes already gone from Neo4j become deletes
+        fetched = {}
+        for label, uids in upserts.items():
+            results, _ = db.cypher_query(
+                f"UNWIND $uids AS uid MATCH (n:{label} {{uid: uid}}) "
+                f"RETURN ID(n), n.uid, n.risk_score, n.description_embedding",
+                {'uids': uids},
+            )
+            _, found_uids, features = GRCGraphLoader.fill_node_arrays(results, len(results))
+            fetched[label] = (found_uids, features)
+            gone = set(uids) - set(found_uids)
+            if gone:
+                deletes.setdefault(label, []).extend(gone)
+
+        touched = {ntype: set() for ntype in graph.ntypes}
+        patches = {} # Node type -> {row: features} for rows of existing nodes (written at step 6)
+
+        def patch(label):
+            if label not in patches:
+                patches[label] = cls._read_patch(label, meta)
+            return patches[label]
+
+        # 3. Tombstone deleted nodes
+        for label, uids in deletes.items():
+            rows = [index[label].pop(uid) for uid in set(uids) if uid in index[label]]
+            if rows:
+                meta['deleted'][label] = sorted(set(meta['deleted'][label]) | set(rows))
+                touched[label].update(rows)
+                for row in rows:
+                    patch(label)[row] = np.zeros(cls.FEATURE_DIM, dtype=np.float32)
+
+        # 4. Append rows for new nodes; rewritten rows of existing nodes go to the patch
+        for label, (found_uids, features) in fetched.items():
+            start = meta['num_nodes'][label]
+            is_new = np.array([uid not in index[label] for uid in found_uids], dtype=bool)
+            if is_new.any():
+                new_uids = [uid for uid, new in zip(found_uids, is_new) if new]
+                graph = dgl.add_nodes(graph, len(new_uids), ntype=label)
+                for offset, uid in enumerate(new_uids):
+                    index[label][uid] = start + offset
+                # Past the rows any mapping covers, and invisible until meta.json counts them
+                cls._write_rows(cls._path(f'uids_{label}.bin'), start, cls._encode_uids(new_uids))
+                cls._write_rows(cls._path(f'feat_{label}.f32'), start, features[is_new])
+                meta['num_nodes'][label] = start + len(new_uids)
+
+            rows = [index[label][uid] for uid in found_uids]
+            touched[label].update(rows)
+            for row, feature_row in zip(rows, features):
+                if row < start:
+                    patch(label)[row] = feature_row
+
+        # 5. Replace the edges incident to every touched node
+        for etype in graph.canonical_etypes:
+            src_type, rel_type, dst_type = etype
+            src_rows = torch.tensor(sorted(touched[src_type]), dtype=torch.int64)
+            dst_rows = torch.tensor(sorted(touched[dst_type]), dtype=torch.int64)
+            if not len(src_rows) and not len(dst_rows):
+                continue
+
+            stale = torch.cat([
+                graph.out_edges(src_rows, form='eid', etype=etype),
+                graph.in_edges(dst_rows, form='eid', etype=etype),
+            ]).unique()
+            if len(stale):
+                graph = dgl.remove_edges(graph, stale, etype=etype)
+
+            src_uids = [uid for uid in fetched.get(src_type, ([], None))[0]]
+            dst_uids = [uid for uid in fetched.get(dst_type, ([], None))[0]]
+            if not src_uids and not dst_uids:
+                continue
+            results, _ = db.cypher_query(
+                f"MATCH (u:{src_type})-[:{rel_type}]->(v:{dst_type}) "
+                f"WHERE u.uid IN $src_uids OR v.uid IN $dst_uids RETURN u.uid, v.uid",
+                {'src_uids': src_uids, 'dst_uids': dst_uids},
+            )
+            pairs = {
+                (index[src_type][u], index[dst_type][v])
+                for u, v in results if u in index[src_type] and v in index[dst_type]
+            }
+            if pairs:
+                src, dst = zip(*sorted(pairs))
+                graph = dgl.add_edges(graph, torch.tensor(src), torch.tensor(dst), etype=etype)
+
+        # 6. Write the patches (compacting large ones) and structure, then the meta file that makes them visible
+        meta['last_flush_seq'] = changes[-1][0]
+        meta.setdefault('patches', {})
+        staged = {} # File name -> compacted copy (swapped in before meta.json)
+        for label, rows in patches.items():
+            if len(rows) > max(cls.COMPACT_MIN_ROWS, cls.COMPACT_FRACTION * meta['num_nodes'][label]):
+                features = cls._read_features(label, meta['num_nodes'][label], rows)
+                path = cls._stage(staged, f'feat_{label}.f32')
+                cls._write_rows(path, 0, features[:0], truncate=True)
+                for start in range(0, len(features), cls.COMPACT_CHUNK_ROWS):
+                    cls._write_rows(path, start, features[start:start + cls.COMPACT_CHUNK_ROWS])
+                meta['patches'].pop(label, None)
+            elif rows:
+                meta['patches'][label] = cls._write_patch(label, meta['last_flush_seq'], rows)
+        cls._swap_in(staged)
+        cls._save_graph(graph)
+        cls._write_meta(meta)
+        cls._remove_stale_patches(meta)
+        logger.info(f"Applied {len(changes)} graph changes ({len(latest)} nodes) to the snapshot.")
+
+    # --- Files ---
+
+    @classmethod
+    def _path(cls, name: str) -> str:
+        return os.path.join(cls.SNAPSHOT_DIR, name)
+
+    @classmethod
+    @contextmanager
+    def _file_lock(cls):
+        """Serializes snapshot writers across processes."""
+        os.makedirs(cls.SNAPSHOT_DIR, exist_ok=True)
+        with open(cls._path('.lock'), 'w') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    @classmethod
+    def _read_meta(cls) -> Optional[dict]:
+        try:
+            with open(cls._path('meta.json')) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    @classmethod
+    def _write_meta(cls, meta: dict):
+        meta['written_at'] = timezone.now().isoformat()
+        tmp_path = cls._path('meta.json.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, cls._path('meta.json'))
+
+    @classmethod
+    def _save_graph(cls, graph):
+        # Features live in the .f32 files; the structure file stays small
+        structure = dgl.heterograph(
+            {etype: graph.edges(etype=etype) for etype in graph.canonical_etypes},
+            num_nodes_dict={ntype: graph.num_nodes(ntype) for ntype in graph.ntypes},
+        )
+        tmp_path = cls._path('graph.bin.tmp')
+        dgl.save_graphs(tmp_path, [structure])
+        os.replace(tmp_path, cls._path('graph.bin'))
+
+    @classmethod
+    def _read_patch(cls, ntype: str, meta: dict) -> Dict[int, np.ndarray]:
+        name = meta.get('patches', {}).get(ntype)
+        if not name:
+            return {}
+        with np.load(cls._path(name)) as data:
+            return dict(zip(data['rows'].tolist(), data['features']))
+
+    @classmethod
+    def _write_patch(cls, ntype: str, flush_seq: int, rows: Dict[int, np.ndarray]) -> str:
+        """Writes a new patch generation; the current one stays intact until meta.json stops naming it."""
+        name = f'patch_{ntype}_{flush_seq}.npz'
+        order = sorted(rows)
+        with open(cls._path(name), 'wb') as f:
+            np.savez(f, rows=np.array(order, dtype=np.int64),
+                     features=np.array([rows[row] for row in order], dtype=np.float32).reshape(-1, cls.FEATURE_DIM))
+        return name
+
+    @classmethod
+    def _remove_stale_patches(cls, meta: dict):
+        # Patches are read whole at load (never mapped), so unreferenced generations can go at once
+        current = set(meta.get('patches', {}).values())
+        for name in os.listdir(cls.SNAPSHOT_DIR):
+            if name.startswith('patch_') and name not in current:
+                os.remove(cls._path(name))
+
+    @classmethod
+    def _read_features(cls, ntype: str, count: int, patch: Dict[int, np.ndarray]) -> np.ndarray:
+        """Copy-on-write mapping of the feature rows with the patch overlaid (only patched pages are copied)."""
+        if not count:
+            return np.zeros((0, cls.FEATURE_DIM), dtype=np.float32)
+        features = np.memmap(cls._path(f'feat_{ntype}.f32'), dtype=np.float32, mode='c',
+                             shape=(count, cls.FEATURE_DIM))
+        if patch:
+            rows = np.fromiter(patch.keys(), dtype=np.int64, count=len(patch))
+            features[rows] = np.stack(list(patch.values()))
+        return features
+
+    @classmethod
+    def _stage(cls, staged: dict, name: str) -> str:
+        """Path of a private file to write the new version of `name` to (swapped in by `_swap_in`)."""
+        staged.setdefault(name, cls._path(f'{name}.tmp'))
+        return staged[name]
+
+    @classmethod
+    def _swap_in(cls, staged: dict):
+        for name, tmp_path in staged.items():
+            os.replace(tmp_path, cls._path(name))
+
+    @staticmethod
+    def _write_rows(path: str, start_row: int, rows: np.ndarray, truncate: bool = False):
+        """Writes rows at a row offset (files are fixed-width, so offset = row * row size)."""
+        mode = 'w+b' if truncate or not os.path.exists(path) else 'r+b'
+        with open(path, mode) as f:
+            f.seek(start_row * rows.dtype.itemsize * int(np.prod(rows.shape[1:], dtype=np.int64)))
+            f.write(np.ascontiguousarray(rows).tobytes())
+
+    @classmethod
+    def _encode_uids(cls, uids: List[str]) -> np.ndarray:
+        return np.array([(uid or '').encode('ascii') for uid in uids], dtype=f'S{cls.UID_WIDTH}')
+
+    @classmethod
+    def _read_uids(cls, ntype: str, meta: dict) -> List[Optional[str]]:
+        count = meta['num_nodes'][ntype]
+        if not count:
+            return []
+        raw = np.fromfile(cls._path(f'uids_{ntype}.bin'), dtype=f'S{cls.UID_WIDTH}', count=count)
+        uids = [value.decode('ascii') for value in raw.tolist()]
+        for row in meta['deleted'][ntype]:
+            uids[row] = None
+        return uids
+
+    @classmethod
+    def _read_snapshot(cls) -> GraphSnapshot:
+        with cls._file_lock():
+            meta = cls._read_meta()
+            graph = dgl.load_graphs(cls._path('graph.bin'))[0][0]
+            uids = {}
+            for ntype in graph.ntypes:
+                features = cls._read_features(ntype, meta['num_nodes'][ntype], cls._read_patch(ntype, meta))
+                graph.nodes[ntype].data['feat'] = torch.from_numpy(features)
+                uids[ntype] = cls._read_uids(ntype, meta)
+        return GraphSnapshot(graph, uids, meta['last_flush_seq'])
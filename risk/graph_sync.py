@@ -0,0 +1,280 @@
+# risk/graph_sync.py
+import logging
+from itertools import islice
+from typing import Callable, Iterable, NamedTuple, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.utils import timezone
+from neomodel import db
+
+from risk.models import GraphChange
+
+logger = logging.getLogger(__name__)
+
+
+class GraphSyncSpec(NamedTuple):
+    """How one relational model maps onto its Neo4j node."""
+    label: str                                  # Neo4j label
+    properties: Callable                        # instance -> dict of node properties
+    embedding_type: Optional[str] = None        # risk.tasks.EMBEDDING_NODE_LABELS key, if embedded
+    embedding_text: Optional[Callable] = None   # instance -> text to embed
+
+
+# Keyed by Django model label; shared by the post_save signals and the bulk paths
+GRAPH_SYNC_SPECS = {
+    'risk.Risk': GraphSyncSpec(
+        'Risk',
+        lambda risk: {
+            'title': risk.title,
+            'category': risk.category,
+            'likelihood': risk.likelihood,
+            'impact': risk.impact,
+            # risk_score is generated by the database and unset on unsaved/bulk-created instances
+            'risk_score': risk.likelihood * risk.impact,
+        },
+        'risk',
+        lambda risk: f"Title: {risk.title}. Description: {risk.description or ''}. Mitigation: {risk.mitigation_plan or ''}",
+    ),
+    'governance.Policy': GraphSyncSpec(
+        'Policy',
+        lambda policy: {'title': policy.title, 'category': policy.category, 'status': policy.status},
+        'policy',
+        lambda policy: f"Title: {policy.title}. Description: {policy.description or ''}",
+    ),
+    'governance.Control': GraphSyncSpec(
+        'Control',
+        lambda control: {
+            'control_code': control.control_code,
+            'control_type': control.control_type,
+            'status': control.status,
+        },
+        'control',
+        lambda control: f"Title: {control.title}. Description: {control.description or ''}",
+    ),
+    'governance.CorporateObjective': GraphSyncSpec(
+        'Objective',
+        lambda objective: {
+            'title': objective.title,
+            'fiscal_year': objective.fiscal_year,
+            'department': objective.department,
+        },
+    ),
+    'compliance.ComplianceRequirement': GraphSyncSpec(
+        'ComplianceRequirement',
+        lambda requirement: {
+            'requirement_code': requirement.requirement_code,
+            'source': requirement.source,
+            'category': requirement.category,
+        },
+        'requirement',
+        lambda requirement: f"Title: {requirement.title}. Description: {requirement.description or ''}",
+    ),
+}
+
+# Labels the write-behind queue may touch (Cypher labels cannot be query parameters)
+SYNC_LABELS = {spec.label for spec in GRAPH_SYNC_SPECS.values()}
+
+
+def spec_for(model) -> GraphSyncSpec:
+    return GRAPH_SYNC_SPECS[model._meta.label]
+
+
+UPSERT_NODES_QUERY = """
+UNWIND $rows AS row
+MERGE (n:{label} {{uid: row.uid}})
+SET n += row.properties
+"""
+
+DELETE_NODES_QUERY = """
+UNWIND $uids AS uid
+MATCH (n:{label} {{uid: uid}})
+DETACH DELETE n
+"""
+
+
+class GraphSyncQueue:
+    """
+    Write-behind synchronization of relational models to Neo4j.
+
+    Signals call `enqueue_upsert`/`enqueue_delete`, which only insert a
+    GraphChange row inside the caller's transaction and, once it commits,
+    schedule a single debounced flush task. The flush coalesces pending rows
+    per (label, uid) and applies them as one parameterized UNWIND statement
+    per label and operation, so N saves cost about N / FLUSH_BATCH_SIZE Bolt
+    round trips and the HTTP request never waits on Neo4j.
+    """
+
+    FLUSH_BATCH_SIZE = getattr(settings, 'GRAPH_SYNC_BATCH_SIZE', 1000)
+    FLUSH_DELAY = getattr(settings, 'GRAPH_SYNC_FLUSH_DELAY', 1.0)
+    FLUSH_SCHEDULED_KEY = 'grc:graph-sync:flush-scheduled'
+    FLUSH_LOCK_ID = 0x67726373 # pg_advisory_xact_lock key held by the running flusher
+
+    # --- Producers (signals) ---
+
+    @classmethod
+    def enqueue_upsert(cls, label: str, uid, properties: dict):
+        GraphChange.record(label, uid, GraphChange.OP_UPSERT, properties=properties)
+        transaction.on_commit(cls.schedule_flush)
+
+    @classmethod
+    def enqueue_instance(cls, instance):
+        """post_save path: queues the node upsert and, if the text changed, its embedding."""
+        from risk.tasks import collect_text_embeddings
+        from risk.embedding_cache import EmbeddingCache
+
+        spec = spec_for(type(instance))
+        uid_str = str(instance.pk)
+        cls.enqueue_upsert(spec.label, uid_str, spec.properties(instance))
+        if spec.embedding_type:
+            text_content = spec.embedding_text(instance)
+            if not EmbeddingCache.is_current(spec.embedding_type, uid_str, text_content):
+                # The consumer groups it with other pending jobs into a single forward pass
+                transaction.on_commit(lambda: collect_text_embeddings.delay(spec.embedding_type, uid_str, text_content))
+
+    @classmethod
+    def enqueue_delete(cls, label: str, uid):
+        GraphChange.record(label, uid, GraphChange.OP_DELETE)
+        transaction.on_commit(cls.schedule_flush)
+
+    @classmethod
+    def schedule_flush(cls):
+        """Queues the flush task unless one is already waiting (one task per burst of saves)."""
+        from risk.tasks import flush_graph_changes
+        if cache.add(cls.FLUSH_SCHEDULED_KEY, 1, timeout=max(60, int(cls.FLUSH_DELAY * 10))):
+            flush_graph_changes.apply_async(countdown=cls.FLUSH_DELAY)
+
+    # --- Consumer (Celery worker) ---
+
+    @classmethod
+    def flush(cls, batch_size: int = None) -> int:
+        """
+        Applies all pending GraphChange rows to Neo4j, oldest first.
+
+        Flushes are serialized by a transaction-scoped advisory lock: two
+        flushers applying overlapping batches could commit an older MERGE after
+        a newer DETACH DELETE and resurrect the node. Under the lock each batch
+        is stamped with the next `flush_seq`, which therefore commits in order
+        and is the cursor the graph snapshot replays from. If a Neo4j write
+        fails the transaction rolls back and the rows stay pending for the next
+        flush (MERGE and DETACH DELETE are idempotent).
+
+        Returns:
+            Number of change rows flushed.
+        """
+        # Saves committed from here on schedule a fresh flush
+        cache.delete(cls.FLUSH_SCHEDULED_KEY)
+        batch_size = batch_size or cls.FLUSH_BATCH_SIZE
+        flushed = 0
+        while True:
+            with transaction.atomic():
+                with connection.cursor() as cursor:
+                    cursor.execute("SELECT pg_advisory_xact_lock(%s)", [cls.FLUSH_LOCK_ID])
+                # Rows logged with flushed=True are already in Neo4j and only need their sequence number
+                changes = list(
+                    GraphChange.objects.select_for_update()
+                    .filter(flush_seq__isnull=True).order_by('id')
+                    .values_list('id', 'label', 'uid', 'op', 'properties', 'flushed_at')[:batch_size]
+                )
+                if not changes:
+                    return flushed
+                cls._apply(changes)
+                flush_seq = GraphChange.flushed_frontier() + 1
+                ids = [change[0] for change in changes]
+                GraphChange.objects.filter(id__in=ids, flushed_at__isnull=True).update(flushed_at=timezone.now())
+                GraphChange.objects.filter(id__in=ids).update(flush_seq=flush_seq)
+            flushed += len(changes)
+            logger.info(f"Flushed {len(changes)} graph changes to Neo4j (flush #{flush_seq}).")
+            if len(changes) < batch_size:
+                return flushed
+
+    @classmethod
+    def _apply(cls, changes):
+        # 1. Coalesce per node: the last operation wins, successive upserts merge their properties
+        latest = {}
+        for _, label, uid, op, properties, flushed_at in changes:
+            previous = latest.get((label, uid))
+            if op == GraphChange.OP_UPSERT and previous and previous[0] == GraphChange.OP_UPSERT:
+                properties = {**previous[1], **(properties or {})}
+            latest[(label, uid)] = (op, properties or {}, flushed_at is not None)
+
+        # 2. Group by label and operation; nodes whose last change is already in Neo4j are skipped
+        upserts, deletes = {}, {}
+        for (label, uid), (op, properties, applied) in latest.items():
+            if applied:
+                continue
+            if label not in SYNC_LABELS:
+                logger.warning(f"Skipping graph change for unknown label {label!r}.")
+                continue
+            if op == GraphChange.OP_UPSERT:
+                upserts.setdefault(label, []).append({'uid': uid, 'properties': properties})
+            else:
+                deletes.setdefault(label, []).append(uid)
+
+        # 3. One UNWIND round trip per (label, operation)
+        for label, uids in deletes.items():
+            db.cypher_query(DELETE_NODES_QUERY.format(label=label), {'uids': uids})
+        for label, rows in upserts.items():
+            db.cypher_query(UPSERT_NODES_QUERY.format(label=label), {'rows': rows})
+
+
+def _chunks(iterable: Iterable, size: int):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def sync_graph(objects, chunk_size: int = None) -> int:
+    """
+    Bulk counterpart of the post_save signals, for writes that bypass them
+    (`bulk_create`, `bulk_update`, `QuerySet.update`, raw imports).
+
+    Queues one GraphChange upsert per row, inserted CHUNK_SIZE rows per INSERT,
+    so the write-behind flush pushes them to Neo4j in UNWIND batches, and queues
+    a single embedding job for all rows of an embedded model.
+
+    Args:
+        objects: A QuerySet, or an iterable of instances of one synced model.
+        chunk_size: Rows read and logged per round trip (defaults to GRAPH_SYNC_BATCH_SIZE).
+
+    Returns:
+        Number of rows queued.
+    """
+    chunk_size = chunk_size or GraphSyncQueue.FLUSH_BATCH_SIZE
+    if hasattr(objects, 'iterator'):
+        model, rows = objects.model, objects.iterator(chunk_size=chunk_size)
+    else:
+        objects = list(objects)
+        if not objects:
+            return 0
+        model, rows = type(objects[0]), objects
+    return _sync_chunks(model, _chunks(rows, chunk_size))
+
+
+def sync_graph_pks(model, pks, chunk_size: int = None) -> int:
+    """`sync_graph` for the rows with the given primary keys, fetched chunk by chunk."""
+    chunk_size = chunk_size or GraphSyncQueue.FLUSH_BATCH_SIZE
+    return _sync_chunks(
+        model,
+        (list(model._base_manager.filter(pk__in=chunk)) for chunk in _chunks(pks, chunk_size)),
+    )
+
+
+def _sync_chunks(model, chunks) -> int:
+    from risk.tasks import embed_entities
+
+    spec = spec_for(model)
+    synced_pks = []
+    for chunk in chunks:
+        GraphChange.record_upserts(spec.label, {str(obj.pk): spec.properties(obj) for obj in chunk})
+        synced_pks.extend(str(obj.pk) for obj in chunk)
+    if not synced_pks:
+        return 0
+
+    transaction.on_commit(GraphSyncQueue.schedule_flush)
+    if spec.embedding_type:
+        # One job for the whole batch; unchanged texts are skipped by their content hash
+        transaction.on_commit(lambda: embed_entities.delay(model._meta.label, synced_pks))
+    logger.info(f"Queued graph sync of {len(synced_pks)} {spec.label} nodes.")
+    return len(synced_pks)
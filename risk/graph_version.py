@@ -0,0 +1,32 @@
+# risk/graph_version.py
+from django.core.cache import cache
+from django.db import transaction
+
+GRAPH_VERSION_KEY = 'grc:graph-version'
+
+
+def get_graph_version() -> int:
+    """Returns the current GRC graph version (a counter shared through the Django cache)."""
+    version = cache.get(GRAPH_VERSION_KEY)
+    if version is None:
+        cache.add(GRAPH_VERSION_KEY, 1, timeout=None)
+        version = cache.get(GRAPH_VERSION_KEY, 1)
+    return version
+
+
+def bump_graph_version() -> int:
+    """Marks the graph as changed, invalidating results memoized for older versions."""
+    try:
+        return cache.incr(GRAPH_VERSION_KEY)
+    except ValueError:
+        # Key missing (first change or cache flush); any fresh value differs from memoized ones
+        cache.add(GRAPH_VERSION_KEY, 1, timeout=None)
+        return cache.incr(GRAPH_VERSION_KEY)
+
+
+def bump_graph_version_on_commit():
+    """
+    Bumps the version once the current transaction commits: bumped earlier, an
+    analysis could read the old graph under the new version and memoize it.
+    """
+    transaction.on_commit(bump_graph_version)
@@ -0,0 +1,89 @@
+import time
+
+import numpy as np
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand, CommandError
+
+from risk.embedding_backends import BACKEND_ALIASES, OnnxBackend, load_backend
+from risk.nlp_service import NLPEmbeddingService
+
+# Synthetic GRC-style texts when the database has too few
+SAMPLE_TEXTS = [
+    "Unauthorized access to core pension administration systems through weak remote access controls.",
+    "The Information Security Policy requires MFA for all remote access to critical systems.",
+    "PENCOM guidelines mandate quarterly reconciliation of retirement savings accounts.",
+    "Vendor concentration risk in the custody of pension fund assets.",
+    "Annual review of the business continuity plan and disaster recovery tests.",
+    "Data protection regulation requires consent records for member personal data.",
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmarks the NLPEmbeddingService backends (torch fp32, torch-int8, onnx): load time, "
+        "texts/sec, and cosine agreement of each backend's vectors with the fp32 reference."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--backends', default=','.join(BACKEND_ALIASES), help="Comma-separated backends.")
+        parser.add_argument('--texts', type=int, default=2000, help="Texts encoded per backend.")
+        parser.add_argument('--batch-size', type=int, default=64)
+        parser.add_argument('--threads', type=int, default=None, help="Intra-op threads per backend.")
+        parser.add_argument('--from-db', action='store_true', help="Use Risk/Policy/Requirement texts.")
+        parser.add_argument('--export', action='store_true', help="Export the ONNX model first.")
+
+    def handle(self, *args, **options):
+        texts = self._texts(options['texts'], options['from_db'])
+        model_name = NLPEmbeddingService.MODEL_NAME
+        if options['export']:
+            self.stdout.write(f"Exported ONNX model to {OnnxBackend.export(model_name)}.")
+
+        backends = [name.strip() for name in options['backends'].split(',')]
+        if 'torch' not in backends:
+            backends.insert(0, 'torch') # The fp32 reference
+        self.stdout.write(f"texts={len(texts)} batch_size={options['batch_size']} model={model_name}")
+
+        reference = None
+        for name in backends:
+            try:
+                started = time.perf_counter()
+                backend = load_backend(name, model_name=model_name, threads=options['threads'])
+                load_seconds = time.perf_counter() - started
+            except ImproperlyConfigured as exc:
+                self.stderr.write(f"{name}: skipped ({exc})")
+                continue
+
+            backend.encode(texts[:options['batch_size']], options['batch_size']) # Warm-up
+            started = time.perf_counter()
+            vectors = backend.encode(texts, options['batch_size'])
+            elapsed = time.perf_counter() - started
+            vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+            if reference is None:
+                reference = vectors
+            agreement = np.einsum('ij,ij->i', vectors, reference)
+            self.stdout.write(
+                f"{name}: model_id={backend.model_id} load_seconds={load_seconds:.1f} "
+                f"texts_per_second={len(texts) / max(elapsed, 1e-9):,.0f} "
+                f"cosine_mean={agreement.mean():.5f} cosine_min={agreement.min():.5f}"
+            )
+        if reference is None:
+            raise CommandError("The fp32 reference backend could not be loaded.")
+
+    def _texts(self, count: int, from_db: bool):
+        texts = []
+        if from_db:
+            from compliance.models import ComplianceRequirement
+            from governance.models import Policy
+            from risk.models import Risk
+            for model, field in ((Risk, 'description'), (Policy, 'description'), (ComplianceRequirement, 'description')):
+                texts.extend(
+                    text for text in model.objects.exclude(**{f'{field}__isnull': True})
+                    .values_list(field, flat=True)[:count] if text
+                )
+        # Vary the samples so batches don't hit identical texts
+        i = 0
+        while len(texts) < count:
+            texts.append(f"{SAMPLE_TEXTS[i % len(SAMPLE_TEXTS)]} (item {i})")
+            i += 1
+        return texts[:count]
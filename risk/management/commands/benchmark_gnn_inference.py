@@ -0,0 +1,92 @@
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from risk.gnn_inference import GNNInferenceEngine
+from risk.gnn_model import build_model
+from risk.graph_loader import GRCGraphLoader
+from risk.graph_snapshot import GraphSnapshot
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmarks GNN recommendation inference on a synthetic graph: cold model build, "
+        "per-request forward passes, and micro-batched requests sharing one forward pass."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--nodes', type=int, default=50_000, help="Synthetic node count.")
+        parser.add_argument('--edges-per-node', type=int, default=2, help="Synthetic edges per source node.")
+        parser.add_argument('--requests', type=int, default=256, help="Recommendation requests per run.")
+        parser.add_argument('--batch-sizes', default='1,8,32,128', help="Comma-separated micro-batch sizes.")
+
+    def handle(self, *args, **options):
+        snapshot = self._synthetic_snapshot(options['nodes'], options['edges_per_node'])
+        rng = np.random.default_rng(1)
+        policies = snapshot.uids['Policy']
+        requests = [('Policy', policies[i]) for i in rng.integers(0, len(policies), options['requests'])]
+        self.stdout.write(f"nodes={snapshot.graph.num_nodes()} edges={snapshot.graph.num_edges()} "
+                          f"requests={len(requests)}")
+
+        # 1. Cold: what every process paid before (build the model at import/class definition)
+        started = time.perf_counter()
+        build_model()
+        self.stdout.write(f"model_build_ms={(time.perf_counter() - started) * 1000:.1f}")
+        GNNInferenceEngine.warm()
+
+        # 2. One forward pass per request (no batching, no embedding reuse)
+        latencies = []
+        for request in requests[:min(len(requests), 32)]:
+            GNNInferenceEngine.invalidate()
+            started = time.perf_counter()
+            GNNInferenceEngine.predict_links([request], snapshot=snapshot)
+            latencies.append(time.perf_counter() - started)
+        self._report('per_request_forward', latencies, 1)
+
+        # 3. Micro-batches: one forward pass per batch (the graph changes between batches)
+        for batch_size in [int(size) for size in options['batch_sizes'].split(',')]:
+            latencies = []
+            for start in range(0, len(requests), batch_size):
+                GNNInferenceEngine.invalidate()
+                started = time.perf_counter()
+                GNNInferenceEngine.predict_links(requests[start:start + batch_size], snapshot=snapshot)
+                latencies.append(time.perf_counter() - started)
+            self._report(f'batch_{batch_size}', latencies, batch_size)
+
+        # 4. Warm embeddings: the graph has not changed since the last forward pass
+        latencies = []
+        for start in range(0, len(requests), 32):
+            started = time.perf_counter()
+            GNNInferenceEngine.predict_links(requests[start:start + 32], snapshot=snapshot)
+            latencies.append(time.perf_counter() - started)
+        self._report('batch_32_cached_embeddings', latencies, 32)
+
+    def _report(self, name, latencies, batch_size):
+        latencies = np.array(latencies) * 1000
+        total_seconds = latencies.sum() / 1000
+        served = len(latencies) * batch_size
+        self.stdout.write(
+            f"{name}: p50_ms={np.percentile(latencies, 50):.1f} p95_ms={np.percentile(latencies, 95):.1f} "
+            f"requests_per_second={served / max(total_seconds, 1e-9):,.0f}"
+        )
+
+    def _synthetic_snapshot(self, num_nodes: int, edges_per_node: int) -> GraphSnapshot:
+        import dgl
+        import torch
+
+        rng = np.random.default_rng(0)
+        per_type = max(1, num_nodes // len(GRCGraphLoader.NODE_TYPES))
+        edges = {}
+        for etype in GRCGraphLoader.EDGE_TYPES:
+            src = np.repeat(np.arange(per_type), edges_per_node)
+            dst = rng.integers(0, per_type, len(src))
+            edges[etype] = (torch.from_numpy(src), torch.from_numpy(dst))
+        graph = dgl.heterograph(edges, num_nodes_dict={ntype: per_type for ntype in GRCGraphLoader.NODE_TYPES})
+        uids = {}
+        for ntype in GRCGraphLoader.NODE_TYPES:
+            graph.nodes[ntype].data['feat'] = torch.from_numpy(
+                rng.random((per_type, GRCGraphLoader.FEATURE_DIM), dtype=np.float32)
+            )
+            uids[ntype] = [f"{ntype}-{i}" for i in range(per_type)]
+        return GraphSnapshot(graph, uids, last_flush_seq=0)
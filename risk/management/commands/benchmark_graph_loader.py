@@ -0,0 +1,88 @@
+import resource
+import time
+import tracemalloc
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from risk.graph_loader import GRCGraphLoader
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmarks GRCGraphLoader: load time and peak memory for a synthetic graph "
+        "(default 1M nodes), or for the live Neo4j graph with --live."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--nodes', type=int, default=1_000_000, help="Synthetic node count.")
+        parser.add_argument('--edges-per-node', type=int, default=2, help="Synthetic edges per source node.")
+        parser.add_argument('--live', action='store_true', help="Load the configured Neo4j graph instead.")
+
+    def handle(self, *args, **options):
+        if options['live']:
+            self._bench_live()
+        else:
+            self._bench_synthetic(options['nodes'], options['edges_per_node'])
+
+    def _bench_live(self):
+        loader = GRCGraphLoader()
+        try:
+            started = time.perf_counter()
+            graph = loader.load_dgl_heterogeneous_graph()
+            elapsed = time.perf_counter() - started
+        finally:
+            loader.close()
+        self._report(graph.num_nodes(), graph.num_edges(), elapsed, None)
+
+    def _bench_synthetic(self, num_nodes: int, edges_per_node: int):
+        import dgl
+        import torch
+
+        rng = np.random.default_rng(0)
+        # One shared embedding list: measures the loader's own copies, not record decoding
+        embedding = rng.random(GRCGraphLoader.EMB_DIM).tolist()
+        per_type = num_nodes // len(GRCGraphLoader.NODE_TYPES)
+
+        def records(ntype_offset):
+            for i in range(per_type):
+                yield ntype_offset + i, f"uid-{ntype_offset + i}", i % 25, embedding
+
+        tracemalloc.start()
+        started = time.perf_counter()
+
+        node_ids, node_features = {}, {}
+        for t, ntype in enumerate(GRCGraphLoader.NODE_TYPES):
+            node_ids[ntype], _, node_features[ntype] = GRCGraphLoader.fill_node_arrays(
+                records(t * per_type), per_type
+            )
+
+        edges = {}
+        for src_type, rel_type, dst_type in GRCGraphLoader.EDGE_TYPES:
+            src = np.repeat(node_ids[src_type], edges_per_node)
+            dst = rng.choice(node_ids[dst_type], len(src))
+            edges[(src_type, rel_type, dst_type)] = (
+                torch.from_numpy(GRCGraphLoader.map_ids(node_ids[src_type], src)),
+                torch.from_numpy(GRCGraphLoader.map_ids(node_ids[dst_type], dst)),
+            )
+        graph = dgl.heterograph(edges, num_nodes_dict={ntype: per_type for ntype in GRCGraphLoader.NODE_TYPES})
+        for ntype, features in node_features.items():
+            graph.nodes[ntype].data['feat'] = torch.from_numpy(features)
+
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        self._report(graph.num_nodes(), graph.num_edges(), elapsed, peak)
+
+    def _report(self, num_nodes, num_edges, elapsed, traced_peak):
+        feature_bytes = num_nodes * GRCGraphLoader.FEATURE_DIM * 4
+        self.stdout.write(f"nodes={num_nodes} edges={num_edges}")
+        self.stdout.write(f"load_seconds={elapsed:.2f} nodes_per_second={num_nodes / max(elapsed, 1e-9):,.0f}")
+        self.stdout.write(f"feature_matrix_mb={feature_bytes / 2**20:.1f}")
+        if traced_peak is not None:
+            self.stdout.write(
+                f"traced_peak_mb={traced_peak / 2**20:.1f} "
+                f"(x{traced_peak / max(feature_bytes, 1):.2f} of the feature matrix)"
+            )
+        # ru_maxrss is reported in KiB on Linux
+        self.stdout.write(f"max_rss_mb={resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.1f}")
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.7 on 2026-10-17 05:41
+
+from django.db import migrations, models
+
+
+def mark_existing_flushed(apps, schema_editor):
+    # Changes logged before the write-behind queue were written to Neo4j synchronously
+    GraphChange = apps.get_model("risk", "GraphChange")
+    GraphChange.objects.filter(flushed_at__isnull=True).update(flushed_at=models.F("created_at"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("risk", "0003_graph_change"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="graphchange",
+            name="properties",
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="graphchange",
+            name="flushed_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(mark_existing_flushed, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="graphchange",
+            index=models.Index(
+                condition=models.Q(("flushed_at__isnull", True)),
+                fields=["id"],
+                name="risk_graphchange_pending_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.7 on 2026-10-17 07:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("risk", "0004_graph_change_write_behind"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="risk",
+            index=models.Index(fields=["created_at", "id"], name="risk_risk_created_idx"),
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.2.7 on 2026-10-17 07:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("risk", "0005_risk_created_idx"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="risk",
+            name="risk_score",
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=models.F("likelihood") * models.F("impact"),
+                output_field=models.IntegerField(),
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="risk",
+            constraint=models.CheckConstraint(
+                condition=models.Q(
+                    ("impact__gte", 1),
+                    ("impact__lte", 5),
+                    ("likelihood__gte", 1),
+                    ("likelihood__lte", 5),
+                ),
+                name="risk_likelihood_impact_range",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="risk",
+            index=models.Index(fields=["status", "-risk_score"], name="risk_status_score_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="risk",
+            index=models.Index(fields=["category", "-risk_score"], name="risk_category_score_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="risk",
+            index=models.Index(fields=["-risk_score", "-created_at"], name="risk_score_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="risk",
+            index=models.Index(fields=["likelihood", "impact"], name="risk_heat_map_idx"),
+        ),
+    ]
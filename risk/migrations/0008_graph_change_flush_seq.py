@@ -0,0 +1,41 @@
+# Generated by Django 5.2.7 on 2026-10-17 17:02
+
+from django.db import migrations, models
+
+
+def number_flushed_changes(apps, schema_editor):
+    # Already-flushed rows keep their id as sequence number, so existing snapshot cursors stay valid
+    GraphChange = apps.get_model("risk", "GraphChange")
+    GraphChange.objects.filter(flushed_at__isnull=False).update(flush_seq=models.F("id"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("risk", "0007_search_vectors"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="graphchange",
+            name="risk_graphchange_pending_idx",
+        ),
+        migrations.AddField(
+            model_name="graphchange",
+            name="flush_seq",
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.RunPython(number_flushed_changes, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="graphchange",
+            index=models.Index(
+                condition=models.Q(("flush_seq__isnull", True)),
+                fields=["id"],
+                name="risk_graphchange_pending_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="graphchange",
+            index=models.Index(fields=["flush_seq"], name="risk_graphchange_flush_seq_idx"),
+        ),
+    ]
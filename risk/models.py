@@ -1,19 +1,26 @@
 # risk/models.py
+from django.contrib.postgres.indexes import GinIndex
 from django.db import models
 from governance.models import CorporateObjective
 from core.models import Profile
 from uuid import uuid4
+from core.managers import GraphSyncSearchManager, SearchManager, search_vector_field
 
 class Risk(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid4, editable=False)
     title = models.CharField(max_length=200)
     description = models.TextField(null=True, blank=True)
     category = models.CharField(max_length=100)
-    likelihood = models.IntegerField() # CHECK (likelihood >= 1 AND likelihood <= 5)
+    likelihood = models.IntegerField() # CHECK (likelihood >= 1 AND likelihood <= 5), see Meta.constraints
     impact = models.IntegerField()     # CHECK (impact >= 1 AND impact <= 5)
     
-    # risk_score calculated field can be implemented as a property in Django or calculated before save
-    # risk_score = models.IntegerField(editable=False) # GENERATED ALWAYS AS (likelihood * impact) STORED
+    # GENERATED ALWAYS AS (likelihood * impact) STORED: filterable, sortable and indexable in SQL.
+    # Computed by the database, so an instance only has it after being read back (e.g. refresh_from_db()).
+    risk_score = models.GeneratedField(
+        expression=models.F('likelihood') * models.F('impact'),
+        output_field=models.IntegerField(),
+        db_persist=True,
+    )
     
     status = models.CharField(max_length=50, default='open')
     mitigation_plan = models.TextField(null=True, blank=True)
@@ -29,9 +36,30 @@ class Risk(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
-    @property
-    def risk_score(self):
-        return self.likelihood * self.impact
+    # Weighted tsvector maintained by the database (core.managers.SearchQuerySet)
+    search_vector = search_vector_field('title', 'description', 'mitigation_plan')
+
+    objects = GraphSyncSearchManager() # bulk writes are synced to Neo4j too; .search() / .ranked()
+
+    class Meta:
+        indexes = [
+            # Keyset pagination of the register API (core.pagination.KeysetPagination)
+            models.Index(fields=['created_at', 'id'], name='risk_risk_created_idx'),
+            # Threshold and top-N queries per status / category, and the overall ranking
+            models.Index(fields=['status', '-risk_score'], name='risk_status_score_idx'),
+            models.Index(fields=['category', '-risk_score'], name='risk_category_score_idx'),
+            models.Index(fields=['-risk_score', '-created_at'], name='risk_score_idx'),
+            # Heat map: GROUP BY likelihood, impact as an index-only scan
+            models.Index(fields=['likelihood', 'impact'], name='risk_heat_map_idx'),
+            # Full-text search
+            GinIndex(fields=['search_vector'], name='risk_search_idx'),
+        ]
+        constraints = [
+            models.CheckConstraint(
+                condition=models.Q(likelihood__gte=1, likelihood__lte=5, impact__gte=1, impact__lte=5),
+                name='risk_likelihood_impact_range',
+            ),
+        ]
 
     def __str__(self):
         return self.title
@@ -63,6 +91,15 @@ class Incident(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    search_vector = search_vector_field('title', 'description', 'root_cause', 'corrective_action')
+
+    objects = SearchManager()
+
+    class Meta:
+        indexes = [
+            GinIndex(fields=['search_vector'], name='risk_incident_search_idx'),
+        ]
+
     def __str__(self):
         return self.title
 
@@ -83,4 +120,120 @@ class AIRecommendation(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
-        return self.title
\ No newline at end of file
+        return self.title
+
+class CachedEmbedding(models.Model):
+    """
+    Persistent tier of the embedding cache: one vector per distinct
+    (normalized text, model) pair, keyed by its content hash.
+    """
+    content_hash = models.CharField(max_length=64, primary_key=True) # sha256 hex digest
+    model_name = models.CharField(max_length=255)
+    vector = models.BinaryField() # float32 bytes, L2-normalized
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.model_name}:{self.content_hash[:12]}"
+
+class EntityEmbedding(models.Model):
+    """Records which content hash is currently embedded on an entity's Neo4j node."""
+    id = models.UUIDField(primary_key=True, default=uuid4, editable=False)
+    entity_type = models.CharField(max_length=100)
+    entity_id = models.UUIDField()
+    content_hash = models.CharField(max_length=64)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('entity_type', 'entity_id')
+
+    def __str__(self):
+        return f"{self.entity_type} {self.entity_id}"
+
+class GraphChange(models.Model):
+    """
+    Append-only log of GRC graph node changes, written by the sync signals.
+
+    It doubles as the write-behind outbox for Neo4j: rows are created with
+    `flushed_at` unset, in the same transaction as the ORM write, and
+    `risk.graph_sync.GraphSyncQueue.flush` applies them to Neo4j in batches.
+    The graph snapshot store replays flushed rows to update its DGL heterograph,
+    in `flush_seq` order: ids are allocated when a row is inserted but commit in
+    any order, while flush sequence numbers are assigned by the (single) flusher
+    and commit in the order they are handed out.
+    """
+    OP_UPSERT = 'upsert'
+    OP_DELETE = 'delete'
+    OP_CHOICES = [(OP_UPSERT, 'Upsert'), (OP_DELETE, 'Delete')]
+
+    id = models.BigAutoField(primary_key=True) # Monotonic cursor for consumers
+    label = models.CharField(max_length=50) # Neo4j label, e.g. 'Risk', 'Policy'
+    uid = models.CharField(max_length=64)
+    op = models.CharField(max_length=10, choices=OP_CHOICES, default=OP_UPSERT)
+    properties = models.JSONField(null=True, blank=True) # Node properties to SET (upserts only)
+    flushed_at = models.DateTimeField(null=True, blank=True) # Set once applied to Neo4j
+    flush_seq = models.BigIntegerField(null=True, blank=True) # Flush batch number, the snapshot's replay cursor
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # Keeps the flusher's "oldest pending" scan small however long the log grows
+            models.Index(fields=['id'], condition=models.Q(flush_seq__isnull=True), name='risk_graphchange_pending_idx'),
+            models.Index(fields=['flush_seq'], name='risk_graphchange_flush_seq_idx'),
+        ]
+
+    @classmethod
+    def record(cls, label: str, uid, op: str = OP_UPSERT, properties: dict = None, flushed: bool = False):
+        """
+        Logs a node change and, on commit, bumps the graph version (invalidating memoized analyses).
+        Pass `flushed=True` when the caller has already written the change to Neo4j;
+        the next flush still assigns it a `flush_seq` so the snapshot replays it.
+        """
+        from django.utils import timezone
+        from risk.graph_version import bump_graph_version_on_commit
+        cls.objects.create(
+            label=label, uid=str(uid), op=op, properties=properties,
+            flushed_at=timezone.now() if flushed else None
+        )
+        bump_graph_version_on_commit()
+        if flushed:
+            cls._schedule_flush()
+
+    @classmethod
+    def record_many(cls, label: str, uids, op: str = OP_UPSERT, flushed: bool = False):
+        from django.utils import timezone
+        from risk.graph_version import bump_graph_version_on_commit
+        flushed_at = timezone.now() if flushed else None
+        changes = cls.objects.bulk_create([cls(label=label, uid=str(uid), op=op, flushed_at=flushed_at) for uid in uids])
+        if changes:
+            bump_graph_version_on_commit()
+            if flushed:
+                cls._schedule_flush()
+
+    @classmethod
+    def record_upserts(cls, label: str, properties_by_uid: dict):
+        """Queues one pending upsert per uid with a single INSERT (bulk sync path)."""
+        from risk.graph_version import bump_graph_version_on_commit
+        changes = cls.objects.bulk_create([
+            cls(label=label, uid=uid, op=cls.OP_UPSERT, properties=properties)
+            for uid, properties in properties_by_uid.items()
+        ])
+        if changes:
+            bump_graph_version_on_commit()
+
+    @staticmethod
+    def _schedule_flush():
+        from django.db import transaction
+        from risk.graph_sync import GraphSyncQueue
+        transaction.on_commit(GraphSyncQueue.schedule_flush)
+
+    @classmethod
+    def flushed_frontier(cls) -> int:
+        """
+        Highest committed `flush_seq`. Sequence numbers are handed out under the
+        flusher's advisory lock, so every change at or below it is visible.
+        """
+        return cls.objects.order_by('-flush_seq').filter(flush_seq__isnull=False) \
+            .values_list('flush_seq', flat=True).first() or 0
+
+    def __str__(self):
+        return f"#{self.id} {self.op} {self.label} {self.uid}"
@@ -1,32 +1,45 @@
 # risk/nlp_service.py
 
 import numpy as np
-from sentence_transformers import SentenceTransformer
 from typing import List
 
+from django.conf import settings
+
+from risk.embedding_backends import BaseEmbeddingBackend, get_backend_class, load_backend
+
 class NLPEmbeddingService:
     """
     Utility class to load a Sentence Transformer model and generate 
     L2-normalized embeddings for GRC text data (Policies, Risks, Requirements).
+
+    The model runs on the backend configured by settings.NLP_EMBEDDING_BACKEND
+    (fp32 PyTorch, int8-quantized PyTorch or ONNX Runtime; see
+    risk.embedding_backends), loaded on first use.
     """
 
     # Using a model optimized for high-quality sentence embeddings, suitable
     # for similarity calculations (e.g., auto-mapping regulations).
-    MODEL_NAME = 'all-MiniLM-L6-v2' 
+    MODEL_NAME = getattr(settings, 'NLP_EMBEDDING_BACKEND', {}).get('MODEL_NAME', 'all-MiniLM-L6-v2')
     MODEL = None
     
     @classmethod
-    def initialize_model(cls) -> SentenceTransformer:
+    def initialize_model(cls) -> BaseEmbeddingBackend:
         """Loads the model into memory (lazy loading and singleton pattern)."""
         if cls.MODEL is None:
-            print(f"Loading SentenceTransformer model: {cls.MODEL_NAME}...")
-            # Loads the model from Hugging Face/disk
-            cls.MODEL = SentenceTransformer(cls.MODEL_NAME)
-            # Set model to evaluation mode (important for production efficiency)
-            cls.MODEL.eval()
-            print("BERT-based model loaded successfully.")
+            cls.MODEL = load_backend(model_name=cls.MODEL_NAME)
         return cls.MODEL
 
+    @classmethod
+    def model_id(cls) -> str:
+        """
+        Model name plus backend variant (e.g. 'all-MiniLM-L6-v2+int8'), without
+        loading the model. Keys the embedding cache.
+        """
+        if cls.MODEL is not None:
+            return cls.MODEL.model_id
+        variant = get_backend_class().VARIANT
+        return f"{cls.MODEL_NAME}+{variant}" if variant else cls.MODEL_NAME
+
     @classmethod
     def get_embedding(cls, text: str) -> List[float]:
         """
@@ -42,26 +55,38 @@ class NLPEmbeddingService:
             # Returns an empty vector if input is empty
             return []
 
+        # Single texts go through the batch path so both share the same normalization
+        return cls.get_embeddings([text])[0].tolist()
+
+    @classmethod
+    def get_embeddings(cls, texts: List[str], batch_size: int = 64) -> np.ndarray:
+        """
+        Generates L2-normalized embeddings for a batch of texts in a single
+        vectorized forward pass.
+
+        Args:
+            texts: The GRC texts to embed (empty strings should be filtered out by the caller).
+            batch_size: Number of texts the model encodes per forward pass.
+
+        Returns:
+            A float32 array of shape (len(texts), dimension), one normalized row per text.
+        """
         model = cls.initialize_model()
-        
-        # 1. Encode text to get embedding (returns a numpy array)
-        embedding: np.ndarray = model.encode(text, convert_to_tensor=False)
-        
-        # 2. Apply L2 Normalization
-        # L2 normalization ensures all vectors lie on a unit sphere, making 
-        # cosine similarity calculation direct and accurate.
-        norm = np.linalg.norm(embedding)
-        if norm > 0:
-            embedding = embedding / norm
+        if not texts:
+            return np.zeros((0, model.dimension), dtype=np.float32)
 
-        # 3. Convert to a list of floats for easy JSON/PostgreSQL/Neo4j storage
-        return embedding.tolist()
+        # 1. Encode all texts at once (the backend batches internally)
+        embeddings: np.ndarray = model.encode(list(texts), batch_size=batch_size)
+
+        # 2. Row-wise L2 Normalization (rows with a zero norm are left untouched)
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        np.divide(embeddings, norms, out=embeddings, where=norms > 0)
+        return embeddings
 
     @classmethod
     def get_dimension(cls) -> int:
         """Returns the fixed dimension of the embedding vector (384 for this model)."""
-        model = cls.initialize_model()
-        return model.get_sentence_embedding_dimension()
+        return cls.initialize_model().dimension
 
 
 # Example Usage (for testing/demonstration)
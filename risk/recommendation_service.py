@@ -1,66 +1,117 @@
 from risk.models import AIRecommendation, Risk
+from risk.gnn_inference import GNNInferenceEngine
 from governance.models import Policy, Control
-from governance.graph_models import PolicyNode, ControlNode, RiskNode
-from risk.gnn_model import GRCGNN # Import your GNN model
-from risk.graph_loader import GRCGraphLoader
-from django.db.models import Count
+from django.db.models import Count, Exists, OuterRef
 from uuid import uuid4
-import torch
 import random
 
+# Graph label of each entity type accepted by the service
+GRAPH_LABELS = {
+    'policy': 'Policy',
+    'control': 'Control',
+    'risk': 'Risk',
+    'requirement': 'ComplianceRequirement',
+    'compliancerequirement': 'ComplianceRequirement',
+}
+
 class RecommendationService:
     """
     Analyzes the GRC graph to find structural gaps (missing links) and generates
     AI recommendations based on GNN link prediction scores.
+
+    Inference runs in risk.gnn_inference (warm model, one forward pass per graph
+    snapshot); web processes queue `risk.tasks.generate_recommendations` on the
+    GNN worker queue instead of calling this service directly.
     """
-    
-    # Mock loaded model and loader instance for simulation
-    GNN_MODEL = GRCGNN(meta_paths=[('Risk', 'Risk', 'Risk')],
-                       in_feats={'Risk': 386}, 
-                       num_classes=5, 
-                       num_heads=2)
-    GRAPH_LOADER = GRCGraphLoader()
 
     @classmethod
     def generate_recommendations(cls, entity_type: str, entity_id: str):
         """
         Orchestrates the GNN analysis and insertion of AIRecommendation records.
         """
-        # 1. Load the current graph (GNN-ready DGL/PyG format)
-        g = cls.GRAPH_LOADER.load_full_graph()
-        
-        # 2. Perform GNN inference to get node embeddings and link predictions
-        # NOTE: This uses the link_prediction_head defined in risk/gnn_model.py
-        cls.GNN_MODEL.eval()
-        
-        # Extract features (mock: in a real scenario, features are tensors from the graph object)
-        risk_features = g.nodes['Risk'].data['feat'] 
-        policy_features = g.nodes['Policy'].data['feat']
+        return cls.generate_recommendations_batch([(entity_type, entity_id)])[0]
 
-        # Mock: Generate high-potential missing links via link prediction
-        high_potential_gaps = cls._mock_link_prediction(entity_type, entity_id)
+    @classmethod
+    def generate_recommendations_batch(cls, requests):
+        """
+        Generates recommendations for a batch of (entity_type, entity_id)
+        requests with a single GNN inference call and a single INSERT.
 
-        recommendations_list = []
+        Returns:
+            The number of recommendations created for each request.
+        """
+        # 1. Score the missing links of every entity in one batch (trained model only;
+        #    untrained scores would be noise, so the heuristics below are used instead)
+        predictions = [[] for _ in requests]
+        if GNNInferenceEngine.has_trained_weights():
+            predictions = GNNInferenceEngine.predict_links([
+                (GRAPH_LABELS.get(entity_type.lower(), entity_type), str(entity_id))
+                for entity_type, entity_id in requests
+            ])
 
-        for gap in high_potential_gaps:
-            # 3. Use LLM/Heuristic to generate rationale and final title
-            rationale_text = cls._generate_rationale(gap['source_type'], gap['target_type'], gap['score'])
-            
-            recommendations_list.append(AIRecommendation(
-                id=uuid4(),
-                recommendation_type=gap['recommendation_type'],
-                entity_type=entity_type,
-                entity_id=entity_id,
-                title=gap['title'],
-                description=gap['description'],
-                rationale=rationale_text,
-                confidence_score=gap['score'],
-                priority=gap['priority']
-            ))
+        # 2. Predicted links become gaps; entities without predictions fall back to the heuristics
+        recommendations_list, counts = [], []
+        for (entity_type, entity_id), predicted in zip(requests, predictions):
+            high_potential_gaps = cls._gnn_link_gaps(predicted) if predicted else \
+                cls._mock_link_prediction(entity_type, entity_id)
+
+            for gap in high_potential_gaps:
+                # 3. Use LLM/Heuristic to generate rationale and final title
+                rationale_text = cls._generate_rationale(gap['source_type'], gap['target_type'], gap['score'])
+
+                recommendations_list.append(AIRecommendation(
+                    id=uuid4(),
+                    recommendation_type=gap['recommendation_type'],
+                    entity_type=entity_type,
+                    entity_id=entity_id,
+                    title=gap['title'],
+                    description=gap['description'],
+                    rationale=rationale_text,
+                    confidence_score=round(gap['score'], 2),
+                    priority=gap['priority']
+                ))
+            counts.append(len(high_potential_gaps))
 
         # 4. Bulk insert into PostgreSQL (ai_recommendations table)
         AIRecommendation.objects.bulk_create(recommendations_list)
-        return len(recommendations_list)
+        return counts
+
+    @classmethod
+    def _gnn_link_gaps(cls, predicted):
+        """Turns link predictions [(candidate label, uid, probability)] into gap dicts."""
+        from compliance.models import ComplianceRequirement
+
+        models = {'Control': Control, 'Policy': Policy, 'ComplianceRequirement': ComplianceRequirement}
+        target_label = predicted[0][0]
+        targets = models[target_label].objects.in_bulk([uid for _, uid, _ in predicted])
+
+        gaps = []
+        for _, uid, score in predicted:
+            target = targets.get(models[target_label]._meta.pk.to_python(uid))
+            if target is None:
+                continue # Deleted since the snapshot was taken
+            priority = 'critical' if score >= 0.9 else 'high' if score >= 0.75 else 'medium'
+            if target_label == 'Control':
+                gaps.append({
+                    'recommendation_type': 'control_gap',
+                    'source_type': 'Policy',
+                    'target_type': 'Control',
+                    'title': f"Link Control {target.control_code} to this Policy",
+                    'description': f"GNN link prediction suggests Control '{target.title}' should cover this Policy.",
+                    'score': score,
+                    'priority': priority,
+                })
+            else:
+                gaps.append({
+                    'recommendation_type': 'compliance_gap',
+                    'source_type': 'Requirement',
+                    'target_type': 'Policy',
+                    'title': f"Map Requirement to Policy: {target.title[:40]}",
+                    'description': f"GNN link prediction suggests Policy '{target.title}' addresses this Requirement.",
+                    'score': score,
+                    'priority': priority,
+                })
+        return gaps
 
     @classmethod
     def _mock_link_prediction(cls, target_type, target_id):
@@ -70,9 +121,10 @@ class RecommendationService:
         """
         
         # --- A. Find Missing Controls for High-Risk Policies ---
-        # Logic: Find policies that don't cover any controls but are related to a high-score risk
+        # Logic: Find policies that don't cover any controls but share their category with a high-score risk
+        # (Policy has no relational link to Risk; the EXISTS runs on the (category, risk_score) index)
         high_risk_policies = Policy.objects.filter(
-            risk__risk_score__gte=15  # Risks with score >= 15
+            Exists(Risk.objects.filter(category=OuterRef('category'), risk_score__gte=15))  # Risks with score >= 15
         ).annotate(
             num_controls=Count('policycontrolmapping')
         ).filter(
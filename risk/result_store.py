@@ -0,0 +1,220 @@
+# risk/result_store.py
+
+import fcntl
+import hashlib
+import json
+import os
+import tempfile
+import time
+import zlib
+from contextlib import contextmanager
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.module_loading import import_string
+
+
+class ResultTooLarge(Exception):
+    """Raised when an encoded result exceeds the store's MAX_PAYLOAD_BYTES."""
+
+
+class BaseResultStore:
+    """
+    Key/value store for long-running analysis results, shared by all web and
+    worker processes.
+
+    Values are JSON documents. Payloads above COMPRESS_MIN_BYTES are zlib
+    compressed, every entry expires after a TTL, and payloads larger than
+    MAX_PAYLOAD_BYTES are rejected so one result cannot exhaust the store.
+    """
+
+    # Leading byte of every stored payload
+    RAW, ZLIB = b'0', b'z'
+
+    def __init__(self, ttl: int = 3600, max_payload_bytes: int = 5 * 1024 * 1024,
+                 compress_min_bytes: int = 1024, **options):
+        self.ttl = ttl
+        self.max_payload_bytes = max_payload_bytes
+        self.compress_min_bytes = compress_min_bytes
+
+    def get(self, key: str) -> Optional[dict]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: dict, ttl: Optional[int] = None):
+        raise NotImplementedError
+
+    def add(self, key: str, value: dict, ttl: Optional[int] = None) -> bool:
+        """Atomically stores the value only if the key is absent; returns whether it was stored."""
+        raise NotImplementedError
+
+    def delete(self, key: str):
+        raise NotImplementedError
+
+    def encode(self, value: dict) -> bytes:
+        raw = json.dumps(value, separators=(',', ':'), default=str).encode('utf-8')
+        payload = self.ZLIB + zlib.compress(raw, 6) if len(raw) >= self.compress_min_bytes else self.RAW + raw
+        if len(payload) > self.max_payload_bytes:
+            raise ResultTooLarge(f"Encoded result is {len(payload)} bytes (limit {self.max_payload_bytes}).")
+        return payload
+
+    def decode(self, payload: bytes) -> dict:
+        marker, body = payload[:1], payload[1:]
+        if marker == self.ZLIB:
+            body = zlib.decompress(body)
+        return json.loads(body)
+
+
+class DjangoCacheResultStore(BaseResultStore):
+    """
+    Stores results in a Django cache, e.g. the Redis cache configured in CACHES,
+    so every gunicorn worker sees the same entries. Eviction beyond the TTL is
+    left to the cache server (Redis `maxmemory-policy`).
+    """
+
+    def __init__(self, cache_alias: str = 'default', key_prefix: str = 'analysis-result:', **options):
+        super().__init__(**options)
+        self.cache = caches[cache_alias]
+        self.key_prefix = key_prefix
+
+    def get(self, key: str) -> Optional[dict]:
+        payload = self.cache.get(self.key_prefix + key)
+        return None if payload is None else self.decode(payload)
+
+    def set(self, key: str, value: dict, ttl: Optional[int] = None):
+        self.cache.set(self.key_prefix + key, self.encode(value), timeout=ttl or self.ttl)
+
+    def add(self, key: str, value: dict, ttl: Optional[int] = None) -> bool:
+        return self.cache.add(self.key_prefix + key, self.encode(value), timeout=ttl or self.ttl)
+
+    def delete(self, key: str):
+        self.cache.delete(self.key_prefix + key)
+
+
+class FileResultStore(BaseResultStore):
+    """
+    Stores one file per result in a local directory; suitable for tests and
+    single-host deployments. Each file starts with its expiry timestamp, and
+    the directory is culled back under MAX_ENTRIES on writes.
+
+    Entries are written to a temporary file first and then published under
+    their key in one step (`os.replace` for set, `os.link` for add), so readers
+    never see a partial entry. Writers serialize on a directory lock; readers
+    don't lock.
+    """
+
+    CULL_FREQUENCY = 3 # Fraction (1/n) of the oldest entries removed when the cap is hit
+
+    def __init__(self, location: str, max_entries: int = 1000, **options):
+        super().__init__(**options)
+        self.location = str(location)
+        self.max_entries = max_entries
+        os.makedirs(self.location, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.location, hashlib.sha1(key.encode('utf-8')).hexdigest() + '.res')
+
+    def get(self, key: str) -> Optional[dict]:
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                expires_at = float(f.readline())
+                payload = f.read()
+        except (FileNotFoundError, ValueError):
+            return None
+        if expires_at < time.time():
+            with self._locked():
+                self._remove_expired(path) # Rechecked under the lock: the key may have been rewritten since
+            return None
+        return self.decode(payload)
+
+    def set(self, key: str, value: dict, ttl: Optional[int] = None):
+        path = self._path(key)
+        tmp_path = self._write_tmp(self.encode(value), ttl)
+        with self._locked():
+            self._cull()
+            os.replace(tmp_path, path)
+
+    def add(self, key: str, value: dict, ttl: Optional[int] = None) -> bool:
+        path = self._path(key)
+        tmp_path = self._write_tmp(self.encode(value), ttl)
+        try:
+            with self._locked():
+                self._remove_expired(path) # Expired entries do not block the key
+                try:
+                    os.link(tmp_path, path) # Fails if the key exists, so the claim is atomic
+                except FileExistsError:
+                    return False
+                return True
+        finally:
+            self._remove(tmp_path)
+
+    def delete(self, key: str):
+        self._remove(self._path(key))
+
+    def _write_tmp(self, payload: bytes, ttl: Optional[int]) -> str:
+        fd, tmp_path = tempfile.mkstemp(dir=self.location, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(f"{time.time() + (ttl or self.ttl)}\n".encode('ascii'))
+            f.write(payload)
+        return tmp_path
+
+    @contextmanager
+    def _locked(self):
+        """Serializes writers (publishing, reaping and culling entries) across processes."""
+        with open(os.path.join(self.location, '.lock'), 'w') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _remove_expired(self, path: str):
+        """Removes the entry at `path` only if its parsed expiry has passed (call under `_locked`)."""
+        try:
+            with open(path, 'rb') as f:
+                expires_at = float(f.readline())
+        except (FileNotFoundError, ValueError):
+            return # Missing, or unreadable: never treated as expired
+        if expires_at < time.time():
+            self._remove(path)
+
+    def _cull(self):
+        entries = [entry for entry in os.scandir(self.location) if entry.name.endswith('.res')]
+        if len(entries) < self.max_entries:
+            return
+        now = time.time()
+        live = []
+        for entry in entries:
+            try:
+                with open(entry.path, 'rb') as f:
+                    expired = float(f.readline()) < now
+            except (FileNotFoundError, ValueError):
+                continue
+            if expired:
+                self._remove(entry.path)
+            else:
+                live.append(entry)
+        if len(live) >= self.max_entries:
+            live.sort(key=lambda entry: entry.stat().st_mtime)
+            for entry in live[:max(1, len(live) // self.CULL_FREQUENCY)]:
+                self._remove(entry.path)
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+_store = None
+
+def get_result_store() -> BaseResultStore:
+    """Returns the process-wide store configured by settings.ANALYSIS_RESULT_STORE."""
+    global _store
+    if _store is None:
+        config = getattr(settings, 'ANALYSIS_RESULT_STORE', {})
+        backend = import_string(config.get('BACKEND', 'risk.result_store.DjangoCacheResultStore'))
+        _store = backend(**{key.lower(): value for key, value in config.get('OPTIONS', {}).items()})
+    return _store
@@ -0,0 +1,29 @@
+# risk/serializers.py
+from rest_framework import serializers
+from core.serializers import ProfileSummarySerializer
+from .models import Risk
+
+
+class RiskListSerializer(serializers.ModelSerializer):
+    owner = ProfileSummarySerializer(read_only=True)
+    risk_champion = ProfileSummarySerializer(read_only=True)
+    approved_by = ProfileSummarySerializer(read_only=True)
+    objective = serializers.SerializerMethodField()
+    risk_score = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = Risk
+        fields = [
+            'id', 'title', 'category', 'likelihood', 'impact', 'risk_score', 'status',
+            'approval_status', 'approved_at', 'owner', 'risk_champion', 'approved_by', 'objective',
+            'created_at', 'updated_at',
+        ]
+
+    def get_objective(self, risk):
+        objective = risk.objective
+        return None if objective is None else {'id': str(objective.id), 'title': objective.title}
+
+
+class RiskDetailSerializer(RiskListSerializer):
+    class Meta(RiskListSerializer.Meta):
+        fields = RiskListSerializer.Meta.fields + ['description', 'mitigation_plan']
@@ -1,50 +1,138 @@
 from celery import shared_task
+from celery.signals import celeryd_init, worker_process_init
+from celery_batches import Batches
 import logging
+from django.conf import settings
+from neomodel import db
 from neomodel.exceptions import DoesNotExist
 from risk.nlp_service import NLPEmbeddingService
+from risk.embedding_cache import EmbeddingCache
+from risk.vector_index import VectorIndexRegistry
+from risk.models import GraphChange
 
-# Import PostgreSQL Models and Neo4j Models from their respective locations
-from governance.models import Policy
-from risk.models import Risk
-from governance.graph_models import PolicyNode, RiskNode 
 # Note: You should update risk.graph_models if you follow best practices and separate graph models
 
 logger = logging.getLogger(__name__)
 
+# Neo4j labels of the nodes that carry a `description_embedding` property
+EMBEDDING_NODE_LABELS = {
+    'policy': 'Policy',
+    'risk': 'Risk',
+    'requirement': 'ComplianceRequirement',
+    'control': 'Control',
+}
+
+# Micro-batching bounds: a batch is flushed when it is full or when its oldest job has waited long enough
+EMBEDDING_BATCH_SIZE = getattr(settings, 'EMBEDDING_BATCH_SIZE', 64)
+EMBEDDING_BATCH_MAX_WAIT = getattr(settings, 'EMBEDDING_BATCH_MAX_WAIT', 2.0)
+
+# GNN inference worker: requests queued within GNN_BATCH_MAX_WAIT seconds share one inference call
+GNN_QUEUE = getattr(settings, 'GNN_QUEUE', 'gnn')
+GNN_BATCH_SIZE = getattr(settings, 'GNN_BATCH_SIZE', 32)
+GNN_BATCH_MAX_WAIT = getattr(settings, 'GNN_BATCH_MAX_WAIT', 0.05)
+
+# Lifetime of an analysis' in-flight marker, renewed by every progress report: a
+# dead worker only blocks identical requests for this long
+ANALYSIS_INFLIGHT_TTL = getattr(settings, 'ANALYSIS_INFLIGHT_TTL', 120)
+
+# One round trip per label: updates every node of the batch and reports which ones exist
+UPDATE_EMBEDDINGS_QUERY = """
+UNWIND $rows AS row
+MATCH (n:{label} {{uid: row.uid}})
+SET n.description_embedding = row.embedding
+RETURN n.uid AS uid
+"""
+
+
+def embed_and_store(jobs):
+    """
+    Embeds a batch of texts with a single forward pass and writes the vectors
+    to Neo4j with one UNWIND query per node label.
+
+    Texts whose content hash is already stored on the node are skipped, and
+    vectors for previously seen texts come from the EmbeddingCache instead of
+    the model.
+
+    Args:
+        jobs: Iterable of (entity_type, entity_pk, text_content) tuples.
+
+    Returns:
+        The list of jobs whose Neo4j node could not be found.
+    """
+    # 1. Keep only the latest text per entity (a bulk import may save the same row twice)
+    latest = {}
+    for entity_type, entity_pk, text_content in jobs:
+        if entity_type not in EMBEDDING_NODE_LABELS:
+            logger.error(f"Unknown entity type: {entity_type}")
+            continue
+        if not text_content:
+            logger.warning(f"Skipping embedding for {entity_type} {entity_pk}: No text content.")
+            continue
+        latest[(entity_type, str(entity_pk))] = text_content
+
+    # 2. Drop entities whose node already holds the embedding of this exact text
+    hashes = {key: EmbeddingCache.content_hash(text) for key, text in latest.items()}
+    stored = EmbeddingCache.current_hashes(hashes.keys())
+    keys = [key for key, content_hash in hashes.items() if stored.get(key) != content_hash]
+    if not keys:
+        return []
+
+    # 3. Reuse cached vectors and encode the remaining distinct texts in one vectorized call
+    vectors = EmbeddingCache.get_many(hashes[key] for key in keys)
+    to_encode = {}
+    for key in keys:
+        if hashes[key] not in vectors:
+            to_encode.setdefault(hashes[key], EmbeddingCache.normalize_text(latest[key]))
+    if to_encode:
+        encoded = NLPEmbeddingService.get_embeddings(list(to_encode.values()))
+        fresh = dict(zip(to_encode.keys(), encoded))
+        EmbeddingCache.set_many(fresh)
+        vectors.update(fresh)
+
+    # 4. Group rows per label and write each group in a single round trip
+    rows_by_type = {}
+    for entity_type, entity_pk in keys:
+        vector = vectors[hashes[(entity_type, entity_pk)]]
+        rows_by_type.setdefault(entity_type, []).append({'uid': entity_pk, 'embedding': vector.tolist()})
+
+    missing = []
+    for entity_type, rows in rows_by_type.items():
+        query = UPDATE_EMBEDDINGS_QUERY.format(label=EMBEDDING_NODE_LABELS[entity_type])
+        results, _ = db.cypher_query(query, {'rows': rows})
+        found = {record[0] for record in results}
+        EmbeddingCache.mark_current({
+            (entity_type, uid): hashes[(entity_type, uid)] for uid in found
+        })
+        # New embeddings change node features in the GNN graph snapshot
+        GraphChange.record_many(EMBEDDING_NODE_LABELS[entity_type], found, flushed=True)
+        VectorIndexRegistry.upsert(
+            entity_type,
+            [row['uid'] for row in rows if row['uid'] in found],
+            [vectors[hashes[(entity_type, row['uid'])]] for row in rows if row['uid'] in found],
+        )
+        missing.extend(
+            (entity_type, row['uid'], latest[(entity_type, row['uid'])])
+            for row in rows if row['uid'] not in found
+        )
+        logger.info(f"Updated {len(found)} Neo4j {entity_type} nodes ({len(to_encode)} texts encoded).")
+
+    return missing
+
+
 @shared_task(bind=True, default_retry_delay=300, max_retries=3)
 def process_text_embedding(self, entity_type: str, entity_pk: str, text_content: str):
     """
     Generates BERT embeddings for the given text and updates the corresponding Neo4j node.
-    
+
     Args:
-        entity_type (str): The type of entity ('policy' or 'risk').
+        entity_type (str): The type of entity ('policy', 'risk', 'requirement' or 'control').
         entity_pk (str): The UUID of the entity from PostgreSQL.
         text_content (str): The text content (title + description) to embed.
     """
     try:
-        if not text_content:
-            logger.warning(f"Skipping embedding for {entity_type} {entity_pk}: No text content.")
-            return
-
-        # 1. Generate Embedding
-        embedding_vector = NLPEmbeddingService.get_embedding(text_content)
-        
-        # 2. Find and Update Neo4j Node
-        if entity_type == 'policy':
-            NodeClass = PolicyNode
-        elif entity_type == 'risk':
-            NodeClass = RiskNode
-        else:
-            logger.error(f"Unknown entity type: {entity_type}")
-            return
-
-        node = NodeClass.nodes.get(uid=entity_pk)
-        
-        # Update the dedicated embedding property
-        node.description_embedding = embedding_vector
-        node.save()
-        
-        logger.info(f"Successfully updated Neo4j {entity_type} {entity_pk} with {len(embedding_vector)}-dim embedding.")
+        missing = embed_and_store([(entity_type, entity_pk, text_content)])
+        if missing:
+            raise DoesNotExist(f"No Neo4j node with uid {entity_pk}")
 
     except DoesNotExist:
         logger.error(f"Neo4j Node for {entity_type} {entity_pk} not found. Retrying in 5 mins.")
@@ -53,3 +141,175 @@ def process_text_embedding(self, entity_type: str, entity_pk: str, text_content:
         logger.error(f"Error processing embedding for {entity_type} {entity_pk}: {exc}")
         # Use exponential backoff or similar strategy for retries on transient errors
         raise self.retry(exc=exc)
+
+
+@shared_task(
+    base=Batches,
+    flush_every=EMBEDDING_BATCH_SIZE,
+    flush_interval=EMBEDDING_BATCH_MAX_WAIT,
+    ignore_result=True,
+)
+def collect_text_embeddings(requests):
+    """
+    Micro-batching consumer for embedding jobs queued by the model signals.
+
+    Called with the same (entity_type, entity_pk, text_content) arguments as
+    `process_text_embedding`, but the worker buffers the calls and runs them as
+    one batch once EMBEDDING_BATCH_SIZE jobs are pending or EMBEDDING_BATCH_MAX_WAIT
+    seconds have passed. The worker must prefetch at least a full batch
+    (e.g. `worker_prefetch_multiplier = 0`).
+    """
+    jobs = [tuple(request.args) for request in requests]
+    try:
+        missing = embed_and_store(jobs)
+    except Exception as exc:
+        # Fall back to the per-item task, which owns the retry policy
+        logger.error(f"Error processing embedding batch of {len(jobs)} jobs: {exc}")
+        missing = jobs
+
+    # Nodes that are not in Neo4j yet are retried individually
+    for job in missing:
+        process_text_embedding.apply_async(args=list(job), countdown=300)
+
+
+@shared_task(ignore_result=True)
+def embed_entities(model_label: str, entity_pks):
+    """
+    Batch embedding job queued by `risk.graph_sync.sync_graph` for bulk writes.
+    Re-reads the rows, so the texts embedded are the committed ones.
+    """
+    from django.apps import apps
+    from risk.graph_sync import GraphSyncQueue, spec_for
+
+    # The nodes may still be waiting in the write-behind queue; embeddings need them in Neo4j
+    GraphSyncQueue.flush()
+
+    model = apps.get_model(model_label)
+    spec = spec_for(model)
+    missing = 0
+    for start in range(0, len(entity_pks), GraphSyncQueue.FLUSH_BATCH_SIZE):
+        chunk = model._base_manager.filter(pk__in=entity_pks[start:start + GraphSyncQueue.FLUSH_BATCH_SIZE])
+        missing += len(embed_and_store(
+            (spec.embedding_type, str(obj.pk), spec.embedding_text(obj)) for obj in chunk.iterator()
+        ))
+    if missing:
+        logger.warning(f"{missing} {model_label} rows had no Neo4j node (deleted since the bulk write?).")
+
+
+@shared_task
+def flush_graph_changes():
+    """Write-behind consumer: applies pending GraphChange rows to Neo4j in UNWIND batches."""
+    from risk.graph_sync import GraphSyncQueue
+    return GraphSyncQueue.flush()
+
+
+@shared_task
+def refresh_graph_snapshot(full: bool = False):
+    """
+    Brings the GNN graph snapshot up to date: replays the GraphChange log, or
+    rebuilds it from a full Neo4j scan (compacting deleted nodes) when `full` is set.
+    """
+    from risk.graph_snapshot import GraphSnapshotStore
+    if full:
+        GraphSnapshotStore.rebuild()
+    snapshot = GraphSnapshotStore.load()
+    logger.info(f"Graph snapshot is current up to flush #{snapshot.last_flush_seq}.")
+
+
+@shared_task(bind=True)
+def perform_cognitive_analysis_task(self, analysis_type: str, request_id: str,
+                                    memo_key: str = None, inflight_key: str = None):
+    """
+    Runs a Cognitive Risk Radar analysis and publishes its status and payload
+    to the shared result store under `request_id`.
+
+    On success the result is also memoized under `memo_key` (analysis type +
+    graph version); `inflight_key` is renewed with every progress report and
+    released either way, so identical requests stop attaching to this run.
+    """
+    from risk.cognitive_analysis import CognitiveAnalysisService
+    from risk.result_store import get_result_store
+
+    store = get_result_store()
+
+    def report_progress(stage: str, fraction: float):
+        # Picked up by the SSE stream (risk.views.cognitive_radar_stream)
+        store.set(request_id, {"status": "running", "task_id": self.request.id, "stage": stage, "progress": fraction})
+        if inflight_key:
+            store.set(inflight_key, {"request_id": request_id, "task_id": self.request.id}, ttl=ANALYSIS_INFLIGHT_TTL)
+
+    report_progress('started', 0.0)
+    try:
+        result = CognitiveAnalysisService.run(analysis_type, on_progress=report_progress)
+        store.set(request_id, {"status": "completed", "task_id": self.request.id, "progress": 1.0, "result": result})
+        if memo_key:
+            store.set(memo_key, {"request_id": request_id})
+    except Exception as exc:
+        logger.error(f"Cognitive analysis {request_id} failed: {exc}")
+        store.set(request_id, {"status": "failed", "task_id": self.request.id, "error": str(exc)})
+        raise
+    finally:
+        # Unless it expired and another request has taken it over
+        if inflight_key and (store.get(inflight_key) or {}).get("request_id") == request_id:
+            store.delete(inflight_key)
+
+
+# --- GNN inference worker ---
+
+_gnn_warmed = False
+
+
+@celeryd_init.connect
+def warm_gnn_model(sender=None, conf=None, options=None, **kwargs):
+    """
+    Loads the GNN weights in the worker's main process when it consumes the GNN
+    queue (`celery worker -Q gnn`), before the pool forks: the pool processes
+    then share the weights instead of each loading its own copy.
+    """
+    global _gnn_warmed
+    queues = (options or {}).get('queues') or []
+    if isinstance(queues, str):
+        queues = queues.split(',')
+    if GNN_QUEUE in queues:
+        from risk.gnn_inference import GNNInferenceEngine
+        GNNInferenceEngine.warm()
+        _gnn_warmed = True
+
+
+@worker_process_init.connect
+def init_gnn_process(**kwargs):
+    if _gnn_warmed:
+        from risk.gnn_inference import GNNInferenceEngine
+        GNNInferenceEngine.after_fork()
+
+
+@shared_task(
+    base=Batches,
+    flush_every=GNN_BATCH_SIZE,
+    flush_interval=GNN_BATCH_MAX_WAIT,
+    queue=GNN_QUEUE,
+)
+def generate_recommendations(requests):
+    """
+    Micro-batching GNN recommendation consumer.
+
+    Called as `generate_recommendations.delay(entity_type, entity_id)`; the
+    worker collects concurrent calls and serves them with a single inference
+    call (see GNNInferenceEngine). Each call's result is the number of
+    recommendations created for its entity.
+    """
+    from risk.recommendation_service import RecommendationService
+
+    backend = generate_recommendations.backend
+    try:
+        counts = RecommendationService.generate_recommendations_batch(
+            [tuple(request.args) for request in requests]
+        )
+    except Exception as exc:
+        logger.error(f"GNN recommendation batch of {len(requests)} requests failed: {exc}")
+        for request in requests:
+            backend.mark_as_failure(request.id, exc, request=request)
+        return
+
+    for request, count in zip(requests, counts):
+        backend.mark_as_done(request.id, count, request=request)
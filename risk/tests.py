@@ -1,3 +1,284 @@
-from django.test import TestCase
+import os
+import re
+import tempfile
+import threading
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from core.models import Profile
+from governance.models import CorporateObjective
+from .graph_loader import GRCGraphLoader
+from .graph_snapshot import GraphSnapshotStore
+from .graph_sync import GraphSyncQueue
+from .models import GraphChange, Risk
+from .result_store import FileResultStore
+from .vector_index import EMBEDDING_DIM, IVFIndex, VectorIndexRegistry, load_embeddings
+
+# Graph-version bumps from the sync signals go to a local cache instead of Redis
+LOCMEM_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class RiskAPIQueryBudgetTests(APITestCase):
+    """The register API must cost a fixed number of queries per page, whatever the page holds."""
+
+    LIST_QUERIES = 1 # Risks joined with owner, champion, approver and objective
+
+    @classmethod
+    def setUpTestData(cls):
+        profiles = [
+            Profile.objects.create(user=User.objects.create(username=f"user{i}"), full_name=f"User {i}")
+            for i in range(3)
+        ]
+        objective = CorporateObjective.objects.create(title="Grow", department="Ops", fiscal_year="2026")
+        Risk.objects.bulk_create([
+            Risk(
+                title=f"Risk {i}", category="Operational", likelihood=1 + i % 5, impact=1 + i % 3,
+                owner=profiles[0], risk_champion=profiles[1], approved_by=profiles[2], objective=objective,
+            )
+            for i in range(30)
+        ])
+
+    def test_list_query_budget(self):
+        url = reverse('risk-list')
+        with self.assertNumQueries(self.LIST_QUERIES):
+            response = self.client.get(url, {'page_size': 10})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), 10)
+        self.assertEqual(response.data['results'][0]['owner']['full_name'], "User 0")
+
+        with self.assertNumQueries(self.LIST_QUERIES):
+            response = self.client.get(url, {'page_size': 30})
+        self.assertEqual(len(response.data['results']), 30)
+
+    def test_detail_query_budget(self):
+        risk = Risk.objects.first()
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('risk-detail', args=[risk.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['risk_score'], risk.likelihood * risk.impact)
+
+    def test_keyset_pages_cover_register_once(self):
+        seen, url = [], reverse('risk-list') + '?page_size=7'
+        while url:
+            with self.assertNumQueries(self.LIST_QUERIES):
+                response = self.client.get(url)
+            seen.extend(row['id'] for row in response.data['results'])
+            url = response.data['next']
+        self.assertEqual(len(seen), 30)
+        self.assertEqual(len(set(seen)), 30)
+
+
+class FakeNeo4j:
+    """Stands in for `neomodel.db`: tracks the uids of the nodes the flusher MERGEs and DETACH DELETEs."""
+
+    def __init__(self):
+        self.nodes = set()
+
+    def cypher_query(self, query, params):
+        label = re.search(r'\(n:(\w+)', query).group(1)
+        if 'DETACH DELETE' in query:
+            self.nodes -= {(label, uid) for uid in params['uids']}
+        else:
+            self.nodes |= {(label, row['uid']) for row in params['rows']}
+        return [], []
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class GraphSyncFlushTests(TestCase):
+
+    def setUp(self):
+        self.neo4j = FakeNeo4j()
+        patcher = mock.patch('risk.graph_sync.db', self.neo4j)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_delete_after_upsert_leaves_node_absent(self):
+        for batch_size in (1, 100): # One change per flush, then both in one batch
+            GraphSyncQueue.enqueue_upsert('Risk', 'r1', {'title': "Fraud"})
+            GraphSyncQueue.enqueue_delete('Risk', 'r1')
+            GraphSyncQueue.flush(batch_size=batch_size)
+            self.assertNotIn(('Risk', 'r1'), self.neo4j.nodes)
+        self.assertFalse(GraphChange.objects.filter(flush_seq__isnull=True).exists())
+
+    def test_flush_sequence_orders_batches(self):
+        GraphSyncQueue.enqueue_upsert('Risk', 'r1', {'title': "Fraud"})
+        GraphSyncQueue.enqueue_upsert('Risk', 'r2', {'title': "Theft"})
+        GraphSyncQueue.flush(batch_size=1)
+        self.assertEqual(GraphChange.flushed_frontier(), 2)
+
+        # Already written to Neo4j: numbered by the next flush without being applied again
+        GraphChange.record('Risk', 'r3', flushed=True)
+        GraphSyncQueue.flush()
+        self.assertNotIn(('Risk', 'r3'), self.neo4j.nodes)
+        self.assertEqual(
+            list(GraphChange.objects.order_by('id').values_list('uid', 'flush_seq')),
+            [('r1', 1), ('r2', 2), ('r3', 3)],
+        )
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class GraphVersionTests(TestCase):
+
+    def test_version_is_bumped_after_commit(self):
+        from .graph_version import get_graph_version
+        version = get_graph_version()
+        with self.captureOnCommitCallbacks(execute=True):
+            GraphChange.record('Risk', 'r1', properties={'title': "Fraud"})
+            # Analyses started before the commit must not see the new version with the old graph
+            self.assertEqual(get_graph_version(), version)
+        self.assertEqual(get_graph_version(), version + 1)
+
+
+class GraphLoaderArrayTests(SimpleTestCase):
+    """Node arrays grow when more nodes stream in than were counted."""
+
+    def records(self, count):
+        return [(100 + i, f"uid-{i}", i % 25, [float(i)] * GRCGraphLoader.EMB_DIM) for i in range(count)]
+
+    def test_arrays_grow_past_underestimated_capacity(self):
+        for capacity in (0, 1, 3):
+            with self.subTest(capacity=capacity):
+                ids, uids, features = GRCGraphLoader.fill_node_arrays(self.records(7), capacity)
+                self.assertEqual(ids.tolist(), list(range(100, 107)))
+                self.assertEqual(uids, [f"uid-{i}" for i in range(7)])
+                self.assertEqual(features.shape, (7, GRCGraphLoader.FEATURE_DIM))
+                self.assertEqual(features[6, 0], 6.0)
+                self.assertAlmostEqual(features[6, GRCGraphLoader.EMB_DIM], 6 / 25.0)
+
+    def test_empty_stream_with_zero_capacity(self):
+        ids, uids, features = GRCGraphLoader.fill_node_arrays([], 0)
+        self.assertEqual((len(ids), uids, features.shape), (0, [], (0, GRCGraphLoader.FEATURE_DIM)))
+
+
+class GraphSnapshotPatchTests(SimpleTestCase):
+    """Rewritten rows go to patch files overlaid at load; the mapped feature file is left alone."""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        patcher = mock.patch.object(GraphSnapshotStore, 'SNAPSHOT_DIR', tmp.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.base = np.arange(4 * GraphSnapshotStore.FEATURE_DIM, dtype=np.float32).reshape(4, -1)
+        GraphSnapshotStore._write_rows(GraphSnapshotStore._path('feat_Risk.f32'), 0, self.base, truncate=True)
+
+    def test_patch_is_overlaid_without_touching_the_file(self):
+        live = GraphSnapshotStore._read_features('Risk', 4, {})
+        row = np.full(GraphSnapshotStore.FEATURE_DIM, -1, dtype=np.float32)
+        meta = {'patches': {'Risk': GraphSnapshotStore._write_patch('Risk', 7, {2: row})}}
+
+        features = GraphSnapshotStore._read_features('Risk', 4, GraphSnapshotStore._read_patch('Risk', meta))
+        np.testing.assert_array_equal(features[2], row)
+        np.testing.assert_array_equal(features[1], self.base[1])
+        np.testing.assert_array_equal(live[2], self.base[2]) # Existing mappings keep the old rows
+        on_disk = np.fromfile(GraphSnapshotStore._path('feat_Risk.f32'), dtype=np.float32)
+        np.testing.assert_array_equal(on_disk.reshape(4, -1), self.base)
+
+    def test_superseded_patches_are_removed(self):
+        row = np.zeros(GraphSnapshotStore.FEATURE_DIM, dtype=np.float32)
+        GraphSnapshotStore._write_patch('Risk', 7, {0: row})
+        meta = {'patches': {'Risk': GraphSnapshotStore._write_patch('Risk', 9, {0: row, 1: row})}}
+        GraphSnapshotStore._remove_stale_patches(meta)
+        self.assertEqual(sorted(name for name in os.listdir(GraphSnapshotStore.SNAPSHOT_DIR) if name.startswith('patch_')),
+                         ['patch_Risk_9.npz'])
+        self.assertEqual(sorted(GraphSnapshotStore._read_patch('Risk', meta)), [0, 1])
+
+
+class FileResultStoreTests(SimpleTestCase):
+    """add() claims a key atomically and only frees keys whose expiry has passed."""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.store = FileResultStore(tmp.name, ttl=60)
+
+    def entries(self):
+        return sorted(name for name in os.listdir(self.store.location) if name != '.lock')
+
+    def test_add_only_stores_absent_keys(self):
+        self.assertTrue(self.store.add('job', {'status': 'PENDING'}))
+        self.assertFalse(self.store.add('job', {'status': 'OTHER'}))
+        self.assertEqual(self.store.get('job'), {'status': 'PENDING'})
+        self.assertEqual(len(self.entries()), 1) # No temporary files left behind
+
+    def test_add_replaces_expired_entry(self):
+        self.store.add('job', {'status': 'OLD'}, ttl=-1)
+        self.assertTrue(self.store.add('job', {'status': 'NEW'}))
+        self.assertEqual(self.store.get('job'), {'status': 'NEW'})
+
+    def test_add_never_reaps_unreadable_entry(self):
+        with open(self.store._path('job'), 'wb') as f:
+            f.write(b'not-a-timestamp')
+        self.assertFalse(self.store.add('job', {'status': 'PENDING'}))
+        self.assertEqual(self.entries(), [os.path.basename(self.store._path('job'))])
+
+
+class VectorIndexRefreshTests(SimpleTestCase):
+    """Stale indexes are reloaded off the request thread and swapped in whole."""
+
+    def setUp(self):
+        self.addCleanup(VectorIndexRegistry.invalidate)
+        VectorIndexRegistry.invalidate()
+
+    def vectors(self, count, seed=0):
+        vectors = np.random.default_rng(seed).standard_normal((count, EMBEDDING_DIM)).astype(np.float32)
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    def test_stale_index_is_served_while_reloading(self):
+        release, loads = threading.Event(), []
+
+        def load(label):
+            loads.append(threading.current_thread().name)
+            if len(loads) > 1:
+                release.wait(5) # Reload blocked until the test lets it finish
+            return ['a', 'b'], self.vectors(2)
+
+        with mock.patch('risk.vector_index.load_embeddings', side_effect=load):
+            first = VectorIndexRegistry.get('Policy')
+            VectorIndexRegistry._loaded_at['Policy'] = float('-inf')
+
+            self.assertIs(VectorIndexRegistry.get('Policy'), first) # Returns at once, reload runs behind
+            VectorIndexRegistry.upsert('policy', ['c'], self.vectors(1, seed=1))
+            release.set()
+            while 'Policy' in VectorIndexRegistry._refreshing:
+                threading.Event().wait(0.01)
+
+        reloaded = VectorIndexRegistry.get('Policy')
+        self.assertIsNot(reloaded, first)
+        self.assertEqual(loads[1], 'vector-index-Policy')
+        self.assertIn('c', reloaded) # Upsert made during the reload was replayed
+
+    def test_ivf_search_matches_exact_scores_after_upserts(self):
+        vectors = self.vectors(IVFIndex.EXACT_SEARCH_THRESHOLD)
+        index = IVFIndex(nprobe=4)
+        index.build([f"uid-{i}" for i in range(len(vectors))], vectors)
+        index.upsert(['uid-7', 'new'], self.vectors(2, seed=1)) # Moves rows out of their contiguous lists
+        index.remove(['uid-8'])
+
+        for query in (vectors[7], vectors[8], self.vectors(1, seed=1)[0]):
+            for uid, score in index.search(query, k=5):
+                self.assertNotEqual(uid, 'uid-8')
+                self.assertAlmostEqual(score, float(index.get_vector(uid) @ query), places=5)
+        self.assertEqual(index.search(self.vectors(1, seed=1)[0], k=1)[0][0], 'uid-7')
+
+    def test_load_embeddings_pages_into_float32(self):
+        nodes = {f"uid-{i:03d}": vector.tolist() for i, vector in enumerate(self.vectors(25))}
+
+        def cypher_query(query, params):
+            if 'count(n)' in query:
+                return [[len(nodes) - 5]], None # Five nodes embedded after the count
+            page = sorted(uid for uid in nodes if uid > params['after'])[:params['limit']]
+            return [[uid, nodes[uid]] for uid in page], None
+
+        with mock.patch('risk.vector_index.db', mock.Mock(cypher_query=cypher_query)):
+            uids, matrix = load_embeddings('Policy', page_size=10)
+        self.assertEqual(uids, sorted(nodes))
+        self.assertEqual((matrix.shape, matrix.dtype), ((25, EMBEDDING_DIM), np.float32))
+        np.testing.assert_allclose(matrix[24], nodes['uid-024'], rtol=1e-6)
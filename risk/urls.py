@@ -1,7 +1,14 @@
 from django.urls import path
-from .views import CognitiveRadarAPI
+from rest_framework.routers import SimpleRouter
+from .views import CognitiveRadarAPI, cognitive_radar_stream, RiskViewSet
+
+router = SimpleRouter()
+# Matches /api/risk/risks/ and /api/risk/risks/<id>/
+router.register('risks', RiskViewSet, basename='risk')
 
 urlpatterns = [
     # Matches /api/cognitive-radar/analyze/
     path('analyze/', CognitiveRadarAPI.as_view(), name='cognitive-radar-analyze'),
-]
+    # Server-Sent Events: progress and the final payload, pushed as they are written
+    path('analyze/stream/', cognitive_radar_stream, name='cognitive-radar-stream'),
+] + router.urls
@@ -0,0 +1,402 @@
+# risk/vector_index.py
+
+import heapq
+import logging
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from django.conf import settings
+from neomodel import db
+
+logger = logging.getLogger(__name__)
+
+# Matches NLPEmbeddingService (all-MiniLM-L6-v2); kept as a constant so the index
+# can be built without loading the SentenceTransformer model.
+EMBEDDING_DIM = 384
+
+# Maps the entity types used by the embedding tasks to their Neo4j labels
+INDEXED_LABELS = {
+    'policy': 'Policy',
+    'requirement': 'ComplianceRequirement',
+    'risk': 'Risk',
+    'control': 'Control',
+}
+
+LOAD_PAGE_SIZE = 10000 # Nodes per Neo4j read when (re)loading an index
+
+
+def load_embeddings(label: str, page_size: int = LOAD_PAGE_SIZE) -> Tuple[List[str], np.ndarray]:
+    """
+    Fetches every embedded node of the given label from Neo4j.
+
+    Nodes are read in pages ordered by uid, each page copied straight into a
+    float32 matrix preallocated from a count, so only one page of Bolt float
+    lists is alive at a time.
+
+    Returns:
+        The node uids and a C-contiguous float32 matrix with one row per uid.
+    """
+    match = f"MATCH (n:{label}) WHERE size(coalesce(n.description_embedding, [])) = $dim"
+    results, _ = db.cypher_query(f"{match} RETURN count(n)", {'dim': EMBEDDING_DIM})
+    matrix = np.empty((results[0][0], EMBEDDING_DIM), dtype=np.float32)
+    uids: List[str] = []
+    while True:
+        results, _ = db.cypher_query(
+            f"{match} AND n.uid > $after RETURN n.uid, n.description_embedding ORDER BY n.uid LIMIT $limit",
+            {'dim': EMBEDDING_DIM, 'after': uids[-1] if uids else '', 'limit': page_size},
+        )
+        if not results:
+            break
+        start, end = len(uids), len(uids) + len(results)
+        if end > len(matrix):
+            # Nodes embedded since the count
+            matrix = np.concatenate([matrix, np.empty((end - len(matrix), EMBEDDING_DIM), dtype=np.float32)])
+        matrix[start:end] = [row[1] for row in results]
+        uids.extend(row[0] for row in results)
+        if len(results) < page_size:
+            break
+    return uids, matrix[:len(uids)]
+
+
+class IVFIndex:
+    """
+    Inverted-file approximate nearest neighbour index over L2-normalized vectors.
+
+    Vectors are partitioned into `nlist` clusters with spherical k-means; a query
+    only scores the members of its `nprobe` closest clusters, so search cost grows
+    with n / nlist * nprobe instead of n. Small indexes are searched exactly.
+    Scores are dot products, i.e. cosine similarities for normalized vectors.
+
+    Training stores the rows grouped by cluster, so a probed list is scored
+    straight from a slice of the matrix instead of a gathered copy; lists
+    changed by later upserts are gathered until the next retrain.
+    """
+
+    # Below this size a brute-force matrix product is faster than probing
+    EXACT_SEARCH_THRESHOLD = 4096
+    KMEANS_ITERATIONS = 10
+    KMEANS_MAX_SAMPLES = 50000
+
+    def __init__(self, dim: int = EMBEDDING_DIM, nprobe: int = 8):
+        self.dim = dim
+        self.nprobe = nprobe
+        self._vectors = np.zeros((0, dim), dtype=np.float32)
+        self._size = 0                      # Rows in use (deleted rows are tombstoned)
+        self._uids: List[Optional[str]] = []
+        self._rows: Dict[str, int] = {}
+        self._centroids: Optional[np.ndarray] = None
+        self._assignment = np.zeros(0, dtype=np.int32)
+        self._lists: List[Optional[np.ndarray]] = []
+        self._trained_size = 0
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __contains__(self, uid):
+        return uid in self._rows
+
+    # --- Mutation ---
+
+    def build(self, uids: List[str], vectors: np.ndarray):
+        """Replaces the index contents and (re)trains the clustering."""
+        with self._lock:
+            self._vectors = np.ascontiguousarray(vectors, dtype=np.float32).copy()
+            self._size = len(uids)
+            self._uids = list(uids)
+            self._rows = {uid: row for row, uid in enumerate(self._uids)}
+            self._train()
+
+    def upsert(self, uids: Iterable[str], vectors: np.ndarray):
+        """Inserts new vectors or overwrites existing ones, keeping cluster lists current."""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        with self._lock:
+            rows = []
+            for uid, vector in zip(uids, vectors):
+                row = self._rows.get(uid)
+                if row is None:
+                    row = self._append_row(uid)
+                self._vectors[row] = vector
+                rows.append(row)
+
+            if self._centroids is None or len(self) > 2 * max(self._trained_size, self.EXACT_SEARCH_THRESHOLD // 2):
+                # The clustering no longer reflects the data; retrain it
+                self._train()
+            elif rows:
+                self._assign(np.asarray(rows, dtype=np.int64))
+
+    def remove(self, uids: Iterable[str]):
+        """Tombstones the rows of the given uids."""
+        with self._lock:
+            for uid in uids:
+                row = self._rows.pop(uid, None)
+                if row is not None:
+                    self._uids[row] = None
+                    self._invalidate_list(self._assignment[row])
+                    self._assignment[row] = -1
+
+    def _append_row(self, uid: str) -> int:
+        if self._size == len(self._vectors):
+            # Grow geometrically so repeated upserts stay amortized O(1)
+            capacity = max(1024, 2 * len(self._vectors))
+            grown = np.zeros((capacity, self.dim), dtype=np.float32)
+            grown[:self._size] = self._vectors[:self._size]
+            self._vectors = grown
+            assignment = np.full(capacity, -1, dtype=np.int32)
+            assignment[:len(self._assignment)] = self._assignment
+            self._assignment = assignment
+        row = self._size
+        self._size += 1
+        self._uids.append(uid)
+        self._rows[uid] = row
+        return row
+
+    # --- Clustering ---
+
+    def _train(self):
+        live_rows = np.fromiter(self._rows.values(), dtype=np.int64, count=len(self._rows))
+        self._assignment = np.full(len(self._vectors), -1, dtype=np.int32)
+        self._trained_size = len(live_rows)
+        if len(live_rows) < self.EXACT_SEARCH_THRESHOLD:
+            self._centroids = None
+            self._lists = []
+            return
+
+        nlist = int(np.sqrt(len(live_rows)))
+        rng = np.random.default_rng(0)
+        sample = self._vectors[rng.choice(live_rows, min(len(live_rows), self.KMEANS_MAX_SAMPLES), replace=False)]
+        centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+        for _ in range(self.KMEANS_ITERATIONS):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            counts = np.bincount(labels, minlength=nlist)
+            starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+            sums = np.zeros_like(centroids)
+            sums[counts > 0] = np.add.reduceat(sample[np.argsort(labels, kind='stable')], starts[counts > 0], axis=0)
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            # Empty clusters keep their previous centroid
+            centroids = np.where(norms > 0, sums / np.maximum(norms, 1e-12), centroids)
+
+        self._centroids = np.ascontiguousarray(centroids, dtype=np.float32)
+        self._lists = [None] * nlist
+        self._assign(live_rows)
+
+        # Renumber the rows in cluster order (dropping tombstones), so every inverted list is one contiguous run
+        order = live_rows[np.argsort(self._assignment[live_rows], kind='stable')]
+        assignment = self._assignment[order]
+        self._vectors = self._vectors[order]
+        self._assignment = assignment
+        self._size = len(order)
+        self._uids = [self._uids[row] for row in order.tolist()]
+        self._rows = {uid: row for row, uid in enumerate(self._uids)}
+        bounds = np.searchsorted(assignment, np.arange(nlist + 1))
+        self._lists = [np.arange(bounds[i], bounds[i + 1]) for i in range(nlist)]
+
+    def _assign(self, rows: np.ndarray):
+        if self._centroids is None:
+            return
+        for start in range(0, len(rows), 65536):
+            block = rows[start:start + 65536]
+            for cluster in set(self._assignment[block].tolist()):
+                self._invalidate_list(cluster)
+            labels = np.argmax(self._vectors[block] @ self._centroids.T, axis=1)
+            self._assignment[block] = labels
+            for cluster in set(labels.tolist()):
+                self._invalidate_list(cluster)
+
+    def _invalidate_list(self, cluster: int):
+        if 0 <= cluster < len(self._lists):
+            self._lists[cluster] = None
+
+    def _row_vectors(self, rows: np.ndarray) -> np.ndarray:
+        # Rows are sorted and unique, so a run as long as its span is contiguous
+        if len(rows) and rows[-1] - rows[0] + 1 == len(rows):
+            return self._vectors[rows[0]:rows[-1] + 1]
+        return self._vectors[rows]
+
+    def _list_rows(self, cluster: int) -> np.ndarray:
+        members = self._lists[cluster]
+        if members is None:
+            members = np.flatnonzero(self._assignment[:self._size] == cluster)
+            self._lists[cluster] = members
+        return members
+
+    # --- Search ---
+
+    def search(self, query: np.ndarray, k: int = 10, nprobe: Optional[int] = None,
+               exclude: Iterable[str] = ()) -> List[Tuple[str, float]]:
+        """
+        Returns up to k (uid, similarity) pairs for the query vector, best first.
+        """
+        query = np.asarray(query, dtype=np.float32)
+        exclude = set(exclude)
+        with self._lock:
+            if not self._rows:
+                return []
+            if self._centroids is None:
+                candidates = np.fromiter(self._rows.values(), dtype=np.int64, count=len(self._rows))
+                scores = self._vectors[candidates] @ query
+            else:
+                probes = min(nprobe or self.nprobe, len(self._centroids))
+                closest = np.argpartition(-(self._centroids @ query), probes - 1)[:probes]
+                lists = [self._list_rows(cluster) for cluster in closest]
+                candidates = np.concatenate(lists)
+                scores = np.concatenate([self._row_vectors(rows) @ query for rows in lists])
+            if not len(candidates):
+                return []
+
+            wanted = min(k + len(exclude), len(candidates))
+            top = np.argpartition(-scores, wanted - 1)[:wanted]
+            top = top[np.argsort(-scores[top])]
+
+            hits = []
+            for position in top:
+                uid = self._uids[candidates[position]]
+                if uid is None or uid in exclude:
+                    continue
+                hits.append((uid, float(scores[position])))
+                if len(hits) == k:
+                    break
+            return hits
+
+    def get_vector(self, uid: str) -> Optional[np.ndarray]:
+        with self._lock:
+            row = self._rows.get(uid)
+            return None if row is None else self._vectors[row].copy()
+
+
+class VectorIndexRegistry:
+    """
+    Process-wide IVF indexes over the embeddings stored in Neo4j, one per label.
+
+    Indexes are loaded on first use, kept current by `upsert` calls from the
+    embedding tasks running in this process, and reloaded from Neo4j once they
+    are older than VECTOR_INDEX_REFRESH_SECONDS so that other processes' writes
+    are picked up as well. A reload runs in a background thread and builds a
+    new index, which replaces the live one in a single assignment; requests
+    keep searching the old index meanwhile, and upserts/removes made during the
+    reload are replayed onto the new index before the swap.
+    """
+
+    REFRESH_SECONDS = getattr(settings, 'VECTOR_INDEX_REFRESH_SECONDS', 600)
+
+    _indexes: Dict[str, IVFIndex] = {}
+    _loaded_at: Dict[str, float] = {}
+    _refreshing: Dict[str, list] = {} # Label -> (method, args) applied to the live index during its reload
+    _load_locks: Dict[str, threading.Lock] = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def get(cls, label: str) -> IVFIndex:
+        index = cls._indexes.get(label)
+        if index is None:
+            # First use: nothing to serve yet, so load in the caller (once per label)
+            with cls._lock:
+                load_lock = cls._load_locks.setdefault(label, threading.Lock())
+            with load_lock:
+                index = cls._indexes.get(label)
+                if index is None:
+                    index = IVFIndex()
+                    index.build(*load_embeddings(label))
+                    with cls._lock:
+                        cls._indexes[label] = index
+                        cls._loaded_at[label] = time.monotonic()
+        elif time.monotonic() - cls._loaded_at.get(label, 0) > cls.REFRESH_SECONDS:
+            cls._schedule_refresh(label)
+        return index
+
+    @classmethod
+    def _schedule_refresh(cls, label: str):
+        with cls._lock:
+            if label in cls._refreshing:
+                return
+            cls._refreshing[label] = []
+        threading.Thread(target=cls._refresh, args=(label,), name=f'vector-index-{label}', daemon=True).start()
+
+    @classmethod
+    def _refresh(cls, label: str):
+        started = time.perf_counter()
+        try:
+            index = IVFIndex()
+            index.build(*load_embeddings(label))
+            with cls._lock:
+                for method, args in cls._refreshing[label]:
+                    getattr(index, method)(*args)
+                cls._indexes[label] = index
+                cls._loaded_at[label] = time.monotonic()
+            logger.info(f"Reloaded the {label} vector index ({len(index)} vectors) in {time.perf_counter() - started:.1f}s.")
+        except Exception as exc:
+            # Keep serving the current index; retried after another REFRESH_SECONDS
+            logger.error(f"Reloading the {label} vector index failed: {exc}")
+            with cls._lock:
+                cls._loaded_at[label] = time.monotonic()
+        finally:
+            with cls._lock:
+                cls._refreshing.pop(label, None)
+
+    @classmethod
+    def _live_index(cls, label: str, method: str, *args) -> Optional[IVFIndex]:
+        """The loaded index of `label`, recording the change for replay if a reload is running."""
+        with cls._lock:
+            pending = cls._refreshing.get(label)
+            if pending is not None:
+                pending.append((method, args))
+            return cls._indexes.get(label)
+
+    @classmethod
+    def upsert(cls, entity_type: str, uids: List[str], vectors: np.ndarray):
+        """Applies freshly written embeddings to the already-loaded index of this process."""
+        if not len(uids):
+            return
+        label = INDEXED_LABELS.get(entity_type)
+        index = cls._live_index(label, 'upsert', uids, vectors)
+        if index is not None:
+            index.upsert(uids, vectors)
+
+    @classmethod
+    def remove(cls, entity_type: str, uids: List[str]):
+        label = INDEXED_LABELS.get(entity_type)
+        index = cls._live_index(label, 'remove', uids)
+        if index is not None:
+            index.remove(uids)
+
+    @classmethod
+    def invalidate(cls):
+        with cls._lock:
+            cls._indexes.clear()
+            cls._loaded_at.clear()
+
+    @classmethod
+    def search(cls, vector: np.ndarray, labels: Iterable[str] = None, k: int = 10,
+               nprobe: Optional[int] = None) -> List[Tuple[str, str, float]]:
+        """
+        Searches the indexes of several labels (all of INDEXED_LABELS by default)
+        as one: the per-label top-k lists are merged by similarity.
+
+        Returns:
+            Up to k (label, uid, similarity) triples, best first.
+        """
+        hits = []
+        for label in labels or INDEXED_LABELS.values():
+            hits.extend((label, uid, score) for uid, score in cls.get(label).search(vector, k=k, nprobe=nprobe))
+        return heapq.nlargest(k, hits, key=lambda hit: hit[2])
+
+    @classmethod
+    def nearest(cls, source_label: str, uid: str, target_label: str, k: int = 10) -> List[Tuple[str, float]]:
+        """Returns the k target nodes whose embeddings are most similar to the source node's."""
+        vector = cls.get(source_label).get_vector(str(uid))
+        if vector is None:
+            return []
+        exclude = [str(uid)] if source_label == target_label else []
+        return cls.get(target_label).search(vector, k=k, exclude=exclude)
+
+
+def top_requirements_for_policy(policy_id, k: int = 10) -> List[Tuple[str, float]]:
+    """Top-k ComplianceRequirement uids (with cosine similarity) for a Policy."""
+    return VectorIndexRegistry.nearest('Policy', policy_id, 'ComplianceRequirement', k)
+
+
+def top_policies_for_requirement(requirement_id, k: int = 10) -> List[Tuple[str, float]]:
+    """Top-k Policy uids (with cosine similarity) for a ComplianceRequirement."""
+    return VectorIndexRegistry.nearest('ComplianceRequirement', requirement_id, 'Policy', k)
@@ -1,7 +1,23 @@
+import asyncio
+import json
+import time
+from uuid import uuid4
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_GET
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework import status
-from .tasks import perform_cognitive_analysis_task, analysis_cache # Import the task and mock cache
+from rest_framework import status, viewsets
+from .tasks import ANALYSIS_INFLIGHT_TTL, perform_cognitive_analysis_task
+from audit.ingest import audit_log
+from audit.middleware import client_ip
+from .result_store import get_result_store
+from .graph_version import get_graph_version
+from .models import Risk
+from .serializers import RiskListSerializer, RiskDetailSerializer
+from core.pagination import KeysetPagination
+from core.serializers import ProfileSummarySerializer
 
 class CognitiveRadarAPI(APIView):
     """
@@ -16,33 +32,156 @@ class CognitiveRadarAPI(APIView):
         
         # In a real app, you would pass the current user's ID/context
         
-        # 1. Trigger the asynchronous GNN/LLM task
-        task = perform_cognitive_analysis_task.delay(analysis_type)
-        
-        # 2. Store the task ID so the frontend can poll for the result
-        # We use a unique ID for the analysis request.
-        request_id = f"analysis_{task.id}" 
-        analysis_cache[request_id] = {"status": "pending", "task_id": task.id}
-        
+        store = get_result_store()
+        graph_version = get_graph_version()
+        memo_key = f"analysis_memo:{analysis_type}:v{graph_version}"
+        inflight_key = f"analysis_inflight:{analysis_type}:v{graph_version}"
+
+        # 1. Memoized: the same analysis already ran against this graph version
+        memo = store.get(memo_key)
+        completed = store.get(memo["request_id"]) if memo else None
+        if completed and completed.get("status") == "completed":
+            return Response({**completed, "request_id": memo["request_id"], "cached": True}, status=status.HTTP_200_OK)
+
+        # 2. Register the request in the shared result store *before* dispatching,
+        #    so a fast task can never be overwritten by this "pending" entry
+        task_id = str(uuid4())
+        request_id = f"analysis_{task_id}"
+        store.set(request_id, {"status": "pending", "task_id": task_id})
+
+        # 3. Coalesce: only the first of concurrent identical requests starts a task. The marker
+        #    is short-lived and renewed by the running task, so a dead worker cannot hold it for long
+        if not store.add(inflight_key, {"request_id": request_id, "task_id": task_id}, ttl=ANALYSIS_INFLIGHT_TTL):
+            inflight = store.get(inflight_key)
+            if inflight:
+                store.delete(request_id)
+                return Response({
+                    "status": "Analysis already running",
+                    "request_id": inflight["request_id"],
+                    "task_id": inflight["task_id"]
+                }, status=status.HTTP_202_ACCEPTED)
+
+        # 4. Trigger the asynchronous GNN/LLM task; it publishes its result under request_id
+        perform_cognitive_analysis_task.apply_async(
+            args=[analysis_type, request_id], kwargs={"memo_key": memo_key, "inflight_key": inflight_key},
+            task_id=task_id
+        )
+        audit_log(
+            'analyze', 'cognitive_analysis', user=request.user, ip_address=client_ip(request),
+            details={'analysis_type': analysis_type, 'request_id': request_id},
+        )
+
         return Response({
             "status": "Analysis started", 
             "request_id": request_id,
-            "task_id": task.id
+            "task_id": task_id
         }, status=status.HTTP_202_ACCEPTED)
 
     def get(self, request, *args, **kwargs):
         """Polls for the result of a long-running analysis task."""
         request_id = request.query_params.get('request_id')
         
-        if not request_id or request_id not in analysis_cache:
+        # Single key lookup in the store shared by all workers
+        task_info = get_result_store().get(request_id) if request_id else None
+        if task_info is None:
             return Response({"error": "Analysis not found or expired"}, status=status.HTTP_404_NOT_FOUND)
         
-        task_info = analysis_cache[request_id]
-        
-        if task_info.get("status") == "completed":
-            # The result is stored in the task's cache.
-            # In a real system, you might fetch the result from a distributed cache (Redis/Memcached)
-            # For this mock, we assume the task returns the data directly on completion.
+        if task_info.get("status") in ("completed", "failed"):
             return Response(task_info, status=status.HTTP_200_OK)
         
         return Response(task_info, status=status.HTTP_202_ACCEPTED) # Still pending
+
+
+FINAL_STATUSES = ("completed", "failed")
+
+
+def _sse(event: str, data: dict) -> str:
+    """Formats one Server-Sent Event frame."""
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'), default=str)}\n\n"
+
+
+async def _analysis_events(store, request_id: str, task_info: dict):
+    """
+    Yields an SSE frame whenever the stored entry for `request_id` changes,
+    ending with a `completed`/`failed` frame carrying the final payload.
+    """
+    poll_interval = getattr(settings, 'ANALYSIS_STREAM_POLL_INTERVAL', 0.25)
+    heartbeat = getattr(settings, 'ANALYSIS_STREAM_HEARTBEAT', 15)
+    deadline = time.monotonic() + getattr(settings, 'ANALYSIS_STREAM_TIMEOUT', 600)
+    get = sync_to_async(store.get, thread_sensitive=False)
+
+    yield f"retry: {int(poll_interval * 4000)}\n\n" # Client reconnect delay (ms)
+    last_info, last_sent = None, time.monotonic()
+    while True:
+        if task_info is None:
+            yield _sse("failed", {"status": "failed", "request_id": request_id, "error": "Analysis not found or expired"})
+            return
+        if task_info != last_info:
+            status_name = task_info.get("status")
+            event = status_name if status_name in FINAL_STATUSES else "progress"
+            yield _sse(event, {**task_info, "request_id": request_id})
+            if event != "progress":
+                return
+            last_info, last_sent = task_info, time.monotonic()
+        elif time.monotonic() - last_sent >= heartbeat:
+            yield ": keep-alive\n\n" # Keeps proxies from closing an idle stream
+            last_sent = time.monotonic()
+        if time.monotonic() >= deadline:
+            yield _sse("timeout", {"request_id": request_id})
+            return
+        # The store is read in-process here; the client holds a single open connection
+        await asyncio.sleep(poll_interval)
+        task_info = await get(request_id)
+
+
+@require_GET
+async def cognitive_radar_stream(request):
+    """
+    Streams analysis progress as Server-Sent Events, replacing client polling of
+    `GET analyze/?request_id=`. Served without blocking a worker under ASGI
+    (grc_pfa.asgi.application).
+
+    Events: `progress` (pending/running, with stage and progress fraction),
+    then one of `completed` (with the result), `failed` or `timeout`.
+    """
+    request_id = request.GET.get('request_id')
+    store = get_result_store()
+    task_info = await sync_to_async(store.get, thread_sensitive=False)(request_id) if request_id else None
+    if task_info is None:
+        return JsonResponse({"error": "Analysis not found or expired"}, status=404)
+
+    response = StreamingHttpResponse(_analysis_events(store, request_id, task_info), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no' # Disable nginx response buffering
+    return response
+
+
+class RiskViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Read API for the risk register: keyset-paginated list and detail.
+
+    Every page is a single SQL query: the profile and objective relations are
+    joined (select_related) and only the serialized columns are selected.
+    `?search=` narrows the list through the full-text index.
+    """
+    pagination_class = KeysetPagination
+
+    RELATIONS = ('owner', 'risk_champion', 'approved_by', 'objective')
+    LIST_FIELDS = (
+        'id', 'title', 'category', 'likelihood', 'impact', 'risk_score', 'status', 'approval_status', 'approved_at',
+        'created_at', 'updated_at', 'objective__id', 'objective__title',
+        *ProfileSummarySerializer.only('owner'),
+        *ProfileSummarySerializer.only('risk_champion'),
+        *ProfileSummarySerializer.only('approved_by'),
+    )
+    DETAIL_FIELDS = LIST_FIELDS + ('description', 'mitigation_plan')
+
+    def get_queryset(self):
+        fields = self.DETAIL_FIELDS if self.action == 'retrieve' else self.LIST_FIELDS
+        queryset = Risk.objects.select_related(*self.RELATIONS).only(*fields)
+        term = self.request.query_params.get('search')
+        # Full-text match on the GIN-indexed search_vector (core.managers.SearchQuerySet)
+        return queryset.search(term) if term else queryset
+
+    def get_serializer_class(self):
+        return RiskDetailSerializer if self.action == 'retrieve' else RiskListSerializer